@@ -0,0 +1,42 @@
+"""The concurrency helpers. Copyright (C) 2024 SynaLinks. License: GPL-3.0"""
+
+import asyncio
+import dspy
+from typing import Any, Callable
+
+def bind_settings(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Bind the DSPy settings of the calling thread to a function run in another thread.
+
+    DSPy keeps a separate configuration per thread, so without it the settings set
+    with `dspy.context` (e.g. the LM) would not be seen by the worker threads.
+
+    Parameters:
+        func (Callable[..., Any]): The function to bind.
+
+    Returns:
+        Callable[..., Any]: The function running with the current DSPy settings.
+    """
+    config = dict(dspy.settings.config)
+
+    def run(*args, **kwargs):
+        with dspy.settings.context(**config):
+            return func(*args, **kwargs)
+
+    return run
+
+async def run_in_thread(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking function in a worker thread without blocking the event loop.
+
+    The DSPy settings of the calling thread are used by the worker thread (see `bind_settings`).
+
+    Parameters:
+        func (Callable[..., Any]): The blocking function to run.
+        *args: The positional arguments of the function.
+        **kwargs: The keyword arguments of the function.
+
+    Returns:
+        Any: The result of the function.
+    """
+    return await asyncio.to_thread(bind_settings(func), *args, **kwargs)
@@ -9,6 +9,7 @@ from enum import Enum
 from uuid import UUID, uuid4
 from hybridagi.core.graph_program import (
     GraphProgram,
+    CompiledGraphProgram,
     Control,
     Action,
     Decision,
@@ -405,7 +406,7 @@ class ToolInput(BaseModel):
     disable_inference: bool = Field(description="Weither or not to disable inference (default False)", default=False)
 
 class ProgramState(BaseModel):
-    current_program: GraphProgram = Field(description="The current program")
+    current_program: Union[CompiledGraphProgram, GraphProgram] = Field(description="The current program")
     current_step: Union[Control, Action, Decision, Program] = Field(description="The current step")
 
 class AgentState(BaseModel):
@@ -424,7 +425,7 @@ class AgentState(BaseModel):
             return self.program_stack[-1]
         return None
     
-    def get_current_program(self) -> Optional[GraphProgram]:
+    def get_current_program(self) -> Optional[CompiledGraphProgram]:
         """Method to retreive the current program from the stack"""
         if len(self.program_stack) > 0:
             return self.program_stack[-1].current_program
@@ -443,8 +444,10 @@ class AgentState(BaseModel):
         else:
             raise ValueError("Cannot set the current step when program finished")
     
-    def call_program(self, program: GraphProgram):
-        """Method to call a program"""
+    def call_program(self, program: Union[GraphProgram, CompiledGraphProgram]):
+        """Method to call a program, the graph programs are executed in their compiled form"""
+        if isinstance(program, GraphProgram):
+            program = program.compiled()
         self.program_stack.append(
             ProgramState(
                 current_program = program,
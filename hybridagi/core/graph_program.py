@@ -2,14 +2,17 @@ import dspy
 import json
 import re
 import os
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Union
+import warnings
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List, Dict, Any, Union, Tuple, NamedTuple, FrozenSet
+from functools import lru_cache
 from enum import Enum
 from urllib.parse import quote
 from uuid import UUID, uuid4
 from collections import OrderedDict
 import pyjson5
 import networkx as nx
+from jinja2 import Environment, Template, meta
 
 def isolate(html_code: str) -> str:
     """
@@ -30,6 +33,146 @@ def isolate(html_code: str) -> str:
     ></iframe>
     """.format(content=content)
 
+_JINJA_ENVIRONMENT = Environment()
+
+# The names provided by Jinja when rendering, not by the var_in of the actions
+_JINJA_RUNTIME_NAMES = frozenset(_JINJA_ENVIRONMENT.globals) | frozenset({"loop", "self", "caller", "varargs", "kwargs"})
+
+@lru_cache(maxsize=4096)
+def compile_prompt(prompt: str) -> Template:
+    """
+    Compile a Jinja prompt template, the templates are cached by prompt so each prompt is only compiled once.
+
+    Args:
+        prompt (str): The prompt template.
+
+    Returns:
+        Template: The compiled template.
+    """
+    return Template(prompt)
+
+@lru_cache(maxsize=4096)
+def prompt_variables(prompt: str) -> FrozenSet[str]:
+    """
+    Get the variables used by a Jinja prompt template, cached by prompt.
+
+    Args:
+        prompt (str): The prompt template.
+
+    Returns:
+        FrozenSet[str]: The names of the undeclared variables of the template, without the Jinja runtime names.
+    """
+    return frozenset(meta.find_undeclared_variables(_JINJA_ENVIRONMENT.parse(prompt))) - _JINJA_RUNTIME_NAMES
+
+_CYPHER_SKIP_REGEX = re.compile(r'[\s,;]+')
+_CYPHER_COMMENT_REGEX = re.compile(r'//([^\n]*)')
+_CYPHER_CREATE_REGEX = re.compile(r'CREATE\b')
+_CYPHER_NODE_REGEX = re.compile(r'\(\s*([^\s:(){}]+)\s*:\s*([^\s(){}]+)\s*\{')
+_CYPHER_RELATION_REGEX = re.compile(
+    r'\(\s*([^\s:(){}]+)\s*\)\s*-\s*\[\s*:?\s*([^\]]*?)\s*\]\s*->\s*\(\s*([^\s:(){}]+)\s*\)'
+)
+_CYPHER_NODE_END_REGEX = re.compile(r'\s*\)')
+_CYPHER_PROPS_TOKEN_REGEX = re.compile(r'["\'{}\[\]]')
+_CYPHER_STRING_END_REGEX = {
+    '"': re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL),
+    "'": re.compile(r"(?:[^'\\]|\\.)*'", re.DOTALL),
+}
+
+class ParsedCypher(NamedTuple):
+    """The result of `parse_cypher`"""
+    description: Optional[str]
+    has_create: bool
+    nodes: Tuple[Tuple[str, str, Dict[str, Any]], ...]
+    relations: Tuple[Tuple[str, str, str], ...]
+
+def _props_end(cypher_query: str, start: int) -> int:
+    """Get the position after the properties object starting at the given position (just after its opening brace)"""
+    depth = 1
+    pos = start
+    while depth > 0:
+        token = _CYPHER_PROPS_TOKEN_REGEX.search(cypher_query, pos)
+        if token is None:
+            return -1
+        pos = token.end()
+        char = token.group()
+        if char in _CYPHER_STRING_END_REGEX:
+            string_end = _CYPHER_STRING_END_REGEX[char].match(cypher_query, pos)
+            if string_end is None:
+                return -1
+            pos = string_end.end()
+        elif char in "{[":
+            depth += 1
+        else:
+            depth -= 1
+    return pos
+
+@lru_cache(maxsize=1024)
+def parse_cypher(cypher_query: str) -> ParsedCypher:
+    """
+    Parse the description, nodes and relations of a Cypher graph program in a single pass.
+
+    The parsed programs are cached by content, so parsing an unchanged program again
+    only costs a dict lookup. The node properties of the program are decoded together
+    with one JSON5 call.
+
+    Args:
+        cypher_query (str): The Cypher query to parse.
+
+    Returns:
+        ParsedCypher: The description, whether a CREATE command was found, the nodes
+            (id, type, properties) and the relations (source, label, target).
+    """
+    description = None
+    has_create = False
+    nodes = []
+    props = []
+    relations = []
+    pos = 0
+    length = len(cypher_query)
+    while pos < length:
+        match = _CYPHER_SKIP_REGEX.match(cypher_query, pos)
+        if match:
+            pos = match.end()
+            continue
+        match = _CYPHER_COMMENT_REGEX.match(cypher_query, pos)
+        if match:
+            comment = match.group(1)
+            if description is None and "@desc:" in comment:
+                description = comment.split("@desc:", 1)[1].strip()
+            pos = match.end()
+            continue
+        if not has_create:
+            match = _CYPHER_CREATE_REGEX.match(cypher_query, pos)
+            if match:
+                has_create = True
+                pos = match.end()
+            else:
+                pos += 1
+            continue
+        match = _CYPHER_NODE_REGEX.match(cypher_query, pos)
+        if match:
+            props_end = _props_end(cypher_query, match.end())
+            if props_end > 0:
+                node_end = _CYPHER_NODE_END_REGEX.match(cypher_query, props_end)
+                if node_end:
+                    nodes.append((match.group(1), match.group(2)))
+                    props.append(cypher_query[match.end()-1:props_end])
+                    pos = node_end.end()
+                    continue
+        match = _CYPHER_RELATION_REGEX.match(cypher_query, pos)
+        if match:
+            relations.append(match.groups())
+            pos = match.end()
+            continue
+        pos += 1
+    props = pyjson5.loads("[" + ",".join(props) + "]") if len(props) > 0 else []
+    return ParsedCypher(
+        description = description,
+        has_create = has_create,
+        nodes = tuple((step_id, step_type, step_props) for (step_id, step_type), step_props in zip(nodes, props)),
+        relations = tuple(relations),
+    )
+
 class ControlType(str, Enum):
     Start = "start"
     end = "end"
@@ -57,6 +200,70 @@ class Program(BaseModel):
     purpose: str = Field(description="The program call purpose")
     program: str = Field(description="The program to call")
 
+class CompiledGraphProgram(BaseModel):
+    """
+    The immutable execution form of a graph program.
+
+    The steps are stored in an array indexed by integer ids, with a precomputed
+    next step table and a choice to target dict per decision, so the control flow
+    lookups of the interpreter do not go through the networkx graph.
+    """
+    model_config = ConfigDict(frozen=True)
+    name: Optional[str] = Field(description="Unique identifier for the cypher program")
+    description: Optional[str] = Field(description="The natural language description of the cypher program", default=None)
+    steps: Tuple[Union[Control, Action, Decision, Program], ...] = Field(description="The steps indexed by their integer id")
+    index: Dict[str, int] = Field(description="The integer id of each step id")
+    next_steps: Tuple[Optional[int], ...] = Field(description="The integer id of the next step of each step, None if any")
+    decision_next_steps: Tuple[Optional[Dict[str, int]], ...] = Field(description="The integer id of the next step for each choice of the decisions, None for the other steps")
+
+    def _step_index(self, step_id: str) -> int:
+        index = self.index.get(step_id)
+        if index is None:
+            raise ValueError(f"Step {step_id} does not exist.")
+        return index
+
+    def get_decision_choices(self, step_id: str) -> List[str]:
+        """
+        Get the choices for a decision step.
+
+        Args:
+            step_ids (str): The id of the decision step.
+
+        Returns:
+            List[str]: A list of the choices for the decision step.
+
+        Raises:
+            ValueError: If the decision step does not exist.
+        """
+        choices = self.decision_next_steps[self._step_index(step_id)]
+        if choices is None:
+            raise ValueError(f"Step {step_id} is not a Decision.")
+        return list(choices)
+
+    def get_next_step(self, step_id: str) -> Optional[Union[Action, Decision, Program, Control]]:
+        index = self._step_index(step_id)
+        if self.decision_next_steps[index] is not None:
+            raise ValueError("Cannot get the next step of a Decision")
+        next_index = self.next_steps[index]
+        if next_index is None:
+            return None
+        return self.steps[next_index]
+
+    def get_decision_next_step(self, step_id: str, choice: str) -> Union[Action, Decision, Program, Control]:
+        choices = self.decision_next_steps[self._step_index(step_id)]
+        if choices is None:
+            raise ValueError(f"Step {step_id} is not a Decision")
+        next_index = choices.get(choice)
+        if next_index is None:
+            raise ValueError(f"Next Step for {step_id} with label {choice} not found")
+        return self.steps[next_index]
+
+    def get_starting_step(self):
+        return self.get_next_step("start")
+
+    def get(self, step_id: str) -> Union[Action, Decision, Program, Control]:
+        return self.steps[self._step_index(step_id)]
+
 class GraphProgram(BaseModel, dspy.Prediction):
     """
     A class representing a graph program.
@@ -68,6 +275,7 @@ class GraphProgram(BaseModel, dspy.Prediction):
     steps: Optional[Dict[str, Optional[Union[Control, Action, Decision, Program]]]] = Field(description="Steps of the cypher program", default={})
     dependencies: Optional[List[str]] = Field(description="Dependencies of the cypher program", default=[])
     _graph = None
+    _compiled = None
     
     def __init__(
             self,
@@ -110,6 +318,7 @@ class GraphProgram(BaseModel, dspy.Prediction):
             else:
                 raise ValueError(f"Invalid step type for {step.id} should be between: Control, Action, Decision, Program")
             self.steps[step.id] = step
+            self._compiled = None
         else:
             raise ValueError(f"Step {step.id} already exist.")
 
@@ -154,6 +363,7 @@ class GraphProgram(BaseModel, dspy.Prediction):
         if isinstance(self.steps[source], Control) and self.steps[source].id == "end":
             raise ValueError("No output edge authorized for the end Step.")
         self._graph.add_edge(source, target, label=label)
+        self._compiled = None
 
     def get_decision_choices(self, step_id: str) -> List[str]:
         """
@@ -174,10 +384,15 @@ class GraphProgram(BaseModel, dspy.Prediction):
             raise ValueError(f"Step {step_id} is not a Decision.")
         return [self._graph.get_edge_data(*edge)["label"] for edge in self._graph.out_edges(step_id)]
 
-    def build(self):
+    def build(self, strict: bool = False):
         """
         Verify the graph program.
 
+        Args:
+            strict (bool): Whether the invalid prompt templates and the prompt variables not declared in the var_in
+                of their action are errors, otherwise they only raise a warning (the undeclared variables are rendered
+                as empty strings and the invalid templates fail when executed). Defaults to False.
+
         Raises:
             ValueError: If the graph program is not valid.
         """
@@ -185,15 +400,75 @@ class GraphProgram(BaseModel, dspy.Prediction):
         for step_id, step in self.steps.items():
             if self._graph.degree(step_id) == 0:
                 errors.append(f"Step {step_id} is not connected to any Step.")
+            if isinstance(step, Action) and step.prompt:
+                try:
+                    missing_variables = prompt_variables(step.prompt) - set(step.var_in or [])
+                    if missing_variables:
+                        message = f"Action {step_id} prompt uses variables not declared in its var_in: {', '.join(sorted(missing_variables))}."
+                        if strict:
+                            errors.append(message)
+                        else:
+                            warnings.warn(message, stacklevel=2)
+                except Exception as e:
+                    message = f"Action {step_id} prompt is not a valid template: {e}"
+                    if strict:
+                        errors.append(message)
+                    else:
+                        warnings.warn(message, stacklevel=2)
+        # One forward traversal from the start and one backward traversal from the end
+        reachable_from_start = nx.descendants(self._graph, "start") if "start" in self.steps else set()
+        reaching_end = nx.ancestors(self._graph, "end") if "end" in self.steps else set()
         for step_id, step in self.steps.items():
             if step_id != "start":
-                if not self._is_reacheable("start", step_id):
+                if step_id not in reachable_from_start:
                     errors.append(f"There is no path from the Start Step to {step_id} Step.")
             if step_id != "end":
-                if not self._is_reacheable(step_id, "end"):
+                if step_id not in reaching_end:
                     errors.append(f"There is no path from {step_id} Step to the End Step.")
         if errors:
             raise ValueError("\n".join(errors))
+        self._compiled = self.compile()
+
+    def compile(self) -> CompiledGraphProgram:
+        """
+        Compile the graph program into its execution form.
+
+        Returns:
+            CompiledGraphProgram: The compiled graph program.
+        """
+        index = {step_id: i for i, step_id in enumerate(self.steps)}
+        next_steps = []
+        decision_next_steps = []
+        for step_id, step in self.steps.items():
+            if isinstance(step, Decision):
+                targets = {}
+                for source, target in self._graph.out_edges(step_id):
+                    targets.setdefault(self._graph.get_edge_data(source, target)["label"], index[target])
+                next_steps.append(None)
+                decision_next_steps.append(targets)
+            else:
+                successors = list(self._graph.successors(step_id))
+                next_steps.append(index[successors[0]] if len(successors) > 0 else None)
+                decision_next_steps.append(None)
+        return CompiledGraphProgram(
+            name = self.name,
+            description = self.description,
+            steps = tuple(self.steps.values()),
+            index = index,
+            next_steps = tuple(next_steps),
+            decision_next_steps = tuple(decision_next_steps),
+        )
+
+    def compiled(self) -> CompiledGraphProgram:
+        """
+        Get the compiled graph program, compiled on the first call after a modification.
+
+        Returns:
+            CompiledGraphProgram: The compiled graph program.
+        """
+        if self._compiled is None:
+            self._compiled = self.compile()
+        return self._compiled
     
     def _is_reacheable(self, source_step: str, target_step: str) -> bool:
         """
@@ -249,6 +524,7 @@ class GraphProgram(BaseModel, dspy.Prediction):
         """
         self.steps = {}
         self._graph = nx.DiGraph()
+        self._compiled = None
         self.dependencies = []
         
     def from_cypher(self, cypher_query: str) -> Optional["GraphProgram"]:
@@ -264,26 +540,15 @@ class GraphProgram(BaseModel, dspy.Prediction):
         Raises:
             ValueError: If the Cypher query is invalid.
         """
-        # Get description
         errors = []
-        description = re.search(r'// @desc:(.*)', cypher_query)
-        if description:
-            self.description = description.group().replace("// @desc:","").strip()
-        create_command = re.search(r'CREATE(.*)', cypher_query, re.DOTALL)
-        if create_command:
+        parsed = parse_cypher(cypher_query)
+        if parsed.description is not None:
+            self.description = parsed.description
+        if parsed.has_create:
             self.clear()
-            # Remove comments
-            cleaned_query = re.sub(r'//.*?\n', '', create_command.group(1))
-            # Parse steps
-            steps = re.findall(r'\(([^:]+):([^ ]+)\s*\{(.*?)\}\)', cleaned_query, re.DOTALL)
             correct_steps = []
             nodes_error = False
-            for step in steps:
-                step_id, step_type, step_props = step
-                step_id = step_id.strip()
-                step_type = step_type.strip()
-                step_props = '{' + step_props.strip() + '}'
-                step_props = pyjson5.loads(step_props)
+            for step_id, step_type, step_props in parsed.nodes:
                 if step_type == "Control":
                     self.add(Control(id=step_props["id"]))
                 elif step_type == "Action":
@@ -359,10 +624,7 @@ class GraphProgram(BaseModel, dspy.Prediction):
                     errors.append(f"Invalid step type for {step_id} should be between: Control, Action, Decision, Program")
             # Parse relations
             if not nodes_error:
-                relations = re.findall(r'\((.*?)\)-(\[.*?\])\s*->\s*\((.*?)\)', cleaned_query)
-                for relation in relations:
-                    source_name, label, target_name = relation
-                    label = label.strip("[:]")
+                for source_name, label, target_name in parsed.relations:
                     try:
                         self.connect(source_name, target_name, label=label)
                     except Exception as e:
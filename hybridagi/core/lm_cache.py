@@ -0,0 +1,217 @@
+"""The cached language model. Copyright (C) 2024 SynaLinks. License: GPL-3.0"""
+
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import dspy
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+class CachedLM(dspy.LM):
+    """
+    Language model wrapper caching the completions of any DSPy language model.
+
+    The completions are keyed by the model, the prompt (which contains the signature
+    instructions and the inputs), with its whitespaces normalized, and the generation
+    parameters (temperature, max tokens, number of generations...). They are cached
+    in an in-memory LRU and, if a path is given, in an on-disk SQLite database shared
+    across runs, so replaying an evaluation or an extraction over an unchanged corpus
+    does not call the model again.
+
+    Wrap the LM given to the tools, the extractors or the `decision_lm` of the agents,
+    or configure it as the default DSPy LM.
+
+    Attributes:
+        lm (dspy.LM): The wrapped language model.
+        path (Optional[str]): The path of the SQLite database, None for an in-memory only cache.
+        max_size (int): The maximum number of cached completions.
+        ttl (Optional[float]): The time to live of the cached completions in seconds, None for no expiration.
+        bypass (bool): Whether to call the wrapped model without reading nor writing the cache.
+        hits (int): The number of calls answered from the cache.
+        misses (int): The number of calls sent to the wrapped model.
+    """
+
+    def __init__(
+            self,
+            lm: dspy.LM,
+            path: Optional[str] = None,
+            max_size: int = 10000,
+            ttl: Optional[float] = None,
+            bypass: bool = False,
+        ):
+        """
+        Initialize the cached language model.
+
+        Parameters:
+            lm (dspy.LM): The language model to wrap.
+            path (Optional[str]): The path of the SQLite database, None to only cache in memory. Defaults to None.
+            max_size (int): The maximum number of cached completions, in memory and on disk. Defaults to 10000.
+            ttl (Optional[float]): The time to live of the cached completions in seconds. Defaults to None (no expiration).
+            bypass (bool): Whether to call the wrapped model without reading nor writing the cache. Defaults to False.
+        """
+        if max_size < 1:
+            raise ValueError("Invalid max size provided, should be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Invalid ttl provided, should be positive")
+        super().__init__(model=lm.kwargs.get("model"))
+        self.lm = lm
+        # Share the parameters with the wrapped model, DSPy modules read them (e.g. the temperature)
+        self.kwargs = lm.kwargs
+        self.provider = getattr(lm, "provider", "default")
+        self.history = lm.history
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, model TEXT, completions TEXT NOT NULL, "
+                "created_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+
+    def cache_key(self, prompt: str, **kwargs) -> str:
+        """
+        Compute the cache key of a call.
+
+        Parameters:
+            prompt (str): The prompt of the call.
+            **kwargs: The generation parameters of the call, merged with the ones of the model.
+
+        Returns:
+            str: The SHA-256 hex digest of the model, the normalized prompt and the parameters.
+        """
+        normalized_prompt = re.sub(r"[ \t]+\n", "\n", prompt.strip())
+        parameters = {**self.lm.kwargs, **kwargs}
+        data = json.dumps(
+            {"model": str(parameters.pop("model", None)), "prompt": normalized_prompt, "parameters": parameters},
+            sort_keys = True,
+            default = str,
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _load(self, key: str) -> Optional[List[Any]]:
+        """Read the completions of the given key from the in-memory LRU or the SQLite database"""
+        entry = self._cache.get(key)
+        if entry is not None:
+            if not self._expired(entry[0]):
+                self._cache.move_to_end(key)
+                return entry[1]
+            del self._cache[key]
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT completions, created_at FROM completions WHERE key=?", [key]
+        ).fetchone()
+        if row is None:
+            return None
+        completions, created_at = json.loads(row[0]), row[1]
+        with self._connection:
+            if self._expired(created_at):
+                self._connection.execute("DELETE FROM completions WHERE key=?", [key])
+                return None
+            self._connection.execute("UPDATE completions SET used_at=? WHERE key=?", [time.time(), key])
+        self._remember(key, created_at, completions)
+        return completions
+
+    def _remember(self, key: str, created_at: float, completions: List[Any]):
+        """Put completions in the in-memory LRU, evicting the least recently used ones"""
+        self._cache[key] = (created_at, completions)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def _store(self, key: str, completions: List[Any]):
+        """Write completions into both tiers, evicting the least recently used ones from the database"""
+        now = time.time()
+        self._remember(key, now, completions)
+        if self._connection is None:
+            return
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO completions (key, model, completions, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                [key, str(self.lm.kwargs.get("model")), json.dumps(completions), now, now],
+            )
+            self._connection.execute(
+                "DELETE FROM completions WHERE key IN "
+                "(SELECT key FROM completions ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                [self.max_size],
+            )
+
+    def __call__(self, prompt: str, only_completed: bool = True, return_sorted: bool = False, **kwargs) -> List[Any]:
+        """
+        Generate the completions of a prompt, only calling the wrapped model on a cache miss.
+
+        Parameters:
+            prompt (str): The prompt.
+            only_completed (bool): Whether to only return the completed generations. Defaults to True.
+            return_sorted (bool): Whether to sort the generations. Defaults to False.
+            **kwargs: The generation parameters.
+
+        Returns:
+            List[Any]: The completions.
+        """
+        if self.bypass:
+            return self.lm(prompt, only_completed=only_completed, return_sorted=return_sorted, **kwargs)
+        key = self.cache_key(prompt, only_completed=only_completed, return_sorted=return_sorted, **kwargs)
+        with self._lock:
+            completions = self._load(key)
+            if completions is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if completions is not None:
+            return copy.deepcopy(completions)
+        completions = self.lm(prompt, only_completed=only_completed, return_sorted=return_sorted, **kwargs)
+        try:
+            json.dumps(completions)
+        except TypeError:
+            # The completions of this model can not be serialized, do not cache them
+            return completions
+        with self._lock:
+            self._store(key, copy.deepcopy(completions))
+        return completions
+
+    def basic_request(self, prompt: str, **kwargs) -> Any:
+        """The raw requests are not cached, they are sent to the wrapped model"""
+        return self.lm.basic_request(prompt, **kwargs)
+
+    def inspect_history(self, n: int = 1, skip: int = 0):
+        """Prints the last n prompts and their completions of the wrapped model"""
+        return self.lm.inspect_history(n=n, skip=skip)
+
+    def copy(self, **kwargs) -> "CachedLM":
+        """Returns a copy of the cached model wrapping a copy of the model with the given parameters, sharing the same cache"""
+        cpy = copy.copy(self)
+        cpy.lm = self.lm.copy(**kwargs)
+        cpy.kwargs = cpy.lm.kwargs
+        cpy.history = cpy.lm.history
+        return cpy
+
+    def clear(self):
+        """Remove all the cached completions from both tiers"""
+        with self._lock:
+            self._cache.clear()
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute("DELETE FROM completions")
+
+    def close(self):
+        """Close the SQLite database"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
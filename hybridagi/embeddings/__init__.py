@@ -1,11 +1,13 @@
 from hybridagi.embeddings.ollama import OllamaEmbeddings
 from .embeddings import Embeddings
 from .fake import FakeEmbeddings
+from .cached import CachedEmbeddings
 from .sentence_transformer import SentenceTransformerEmbeddings
 
 __all__ = [
     'Embeddings',
     'FakeEmbeddings',
     'SentenceTransformerEmbeddings',
-    'OllamaEmbeddings'
+    'OllamaEmbeddings',
+    'CachedEmbeddings',
 ]
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""The cached embeddings. Copyright (C) 2024 SynaLinks. License: GPL-3.0"""
+
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Union, List, Optional, Dict
+from hybridagi.embeddings.embeddings import Embeddings
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper caching the text embeddings of any Embeddings backend.
+
+    The vectors are keyed by (model name, dim, text hash) and cached in two tiers:
+    an in-memory LRU and, if a path is given, an on-disk SQLite database shared
+    across runs. Only the texts missing from both tiers are sent to the backend,
+    in a single `embed_text` call, so re-embedding a mostly unchanged corpus
+    only costs the changed texts.
+
+    Attributes:
+        embeddings (Embeddings): The wrapped embeddings backend.
+        model_name (str): The model name used in the cache keys.
+        path (Optional[str]): The path of the SQLite database, None for an in-memory only cache.
+        max_size (int): The maximum number of vectors kept in the in-memory LRU.
+        hits (int): The number of texts found in the cache.
+        misses (int): The number of texts sent to the backend.
+    """
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            path: Optional[str] = None,
+            max_size: int = 10000,
+            model_name: Optional[str] = None,
+        ):
+        """
+        Initialize the cached embeddings.
+
+        Parameters:
+            embeddings (Embeddings): The embeddings backend to wrap.
+            path (Optional[str]): The path of the SQLite database, None to only cache in memory. Defaults to None.
+            max_size (int): The maximum number of vectors kept in memory. Defaults to 10000.
+            model_name (Optional[str]): The model name used in the cache keys. Defaults to the model name of the backend.
+        """
+        super().__init__(dim=embeddings.dim)
+        self.embeddings = embeddings
+        if model_name is None:
+            model_name = getattr(embeddings, "model_name", None) \
+                or getattr(embeddings, "model_name_or_path", None) \
+                or type(embeddings).__name__
+        self.model_name = model_name
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, dim INTEGER NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, dim, hash))"
+            )
+            self._connection.commit()
+
+    def text_hash(self, text: str) -> str:
+        """
+        Hash a text for the cache keys.
+
+        Parameters:
+            text (str): The text to hash.
+
+        Returns:
+            str: The SHA-256 hex digest of the text.
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Put a vector in the in-memory LRU, evicting the least recently used ones"""
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def _load(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Read the vectors of the given keys from the SQLite database"""
+        found = {}
+        if self._connection is None:
+            return found
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i+500]
+            rows = self._connection.execute(
+                "SELECT hash, vector FROM embeddings WHERE model=? AND dim=? AND hash IN ("+",".join("?"*len(batch))+")",
+                [self.model_name, self.dim, *batch],
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _store(self, vectors: Dict[str, np.ndarray]):
+        """Write the vectors into the SQLite database in a single transaction"""
+        if self._connection is None or len(vectors) == 0:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dim, hash, vector) VALUES (?, ?, ?, ?)",
+                [(self.model_name, self.dim, key, vector.tobytes()) for key, vector in vectors.items()],
+            )
+
+    def embed_text(self, query_or_queries: Union[str, List[str]]) -> np._typing.NDArray:
+        """
+        Embed a text or a list of texts, only computing the vectors missing from the cache.
+
+        Parameters:
+            query_or_queries (Union[str, List[str]]): The text or texts to embed.
+
+        Returns:
+            np.ndarray: The vector of the text, or the matrix of the vectors of the texts.
+        """
+        if isinstance(query_or_queries, str) and query_or_queries == "":
+            raise ValueError("Input cannot be an empty string.")
+        if isinstance(query_or_queries, list) and len(query_or_queries) == 0:
+            return self.embeddings.embed_text(query_or_queries)
+        texts = [query_or_queries] if not isinstance(query_or_queries, list) else query_or_queries
+        keys = [self.text_hash(text) for text in texts]
+        with self._lock:
+            vectors = {}
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    vectors[key] = self._cache[key]
+            missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+            for key, vector in self._load(missing).items():
+                self._remember(key, vector)
+                vectors[key] = vector
+            to_embed = {}
+            for key, text in zip(keys, texts):
+                if key not in vectors:
+                    to_embed.setdefault(key, text)
+            self.hits += len(keys) - sum(1 for key in keys if key in to_embed)
+            self.misses += sum(1 for key in keys if key in to_embed)
+        if len(to_embed) > 0:
+            embedded = np.asarray(self.embeddings.embed_text(list(to_embed.values())), dtype=np.float32)
+            embedded = embedded.reshape(len(to_embed), self.dim)
+            new_vectors = dict(zip(to_embed.keys(), embedded))
+            with self._lock:
+                self._store(new_vectors)
+                for key, vector in new_vectors.items():
+                    self._remember(key, vector)
+            vectors.update(new_vectors)
+        # The cached vectors are shared (and read-only when read from the database), return copies
+        if not isinstance(query_or_queries, list):
+            return vectors[keys[0]].copy()
+        return np.stack([vectors[key] for key in keys])
+
+    def embed_image(self, image_or_images: Union[np._typing.NDArray, List[np._typing.NDArray]]) -> np._typing.NDArray:
+        """The image embeddings are not cached, they are computed by the wrapped backend"""
+        return self.embeddings.embed_image(image_or_images)
+
+    def clear(self):
+        """Remove the cached vectors of the model from both tiers"""
+        with self._lock:
+            self._cache.clear()
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute(
+                        "DELETE FROM embeddings WHERE model=? AND dim=?",
+                        [self.model_name, self.dim],
+                    )
+
+    def close(self):
+        """Close the SQLite database"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
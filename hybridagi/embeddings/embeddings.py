@@ -1,5 +1,6 @@
 """The embeddings. Copyright (C) 2024 SynaLinks. License: GPL-3.0"""
 
+import asyncio
 from abc import ABC, abstractmethod
 import numpy as np
 from typing import Union, List
@@ -15,6 +16,10 @@ class Embeddings(ABC):
             f"Embeddings {type(self).__name__} is missing the required 'embed_text' method."
         )
     
+    async def aembed_text(self, query_or_queries: Union[str, List[str]]) -> np._typing.NDArray:
+        """Asynchronous version of `embed_text`, run in a worker thread unless overridden"""
+        return await asyncio.to_thread(self.embed_text, query_or_queries)
+
     @abstractmethod
     def embed_image(self, image_or_images: Union[np._typing.NDArray, List[np._typing.NDArray]]) -> np._typing.NDArray:
         raise NotImplementedError(
@@ -1,5 +1,9 @@
+import time
+import asyncio
+import weakref
 import numpy as np
-from typing import Union, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, List, Optional
 from hybridagi.embeddings.embeddings import Embeddings
 
 class OllamaEmbeddings(Embeddings):
@@ -8,6 +12,11 @@ class OllamaEmbeddings(Embeddings):
             model_name: str = "mxbai-embed-large:latest",
             dim: int = 1024,  # Adjust default dimension based on your model
             batch_size: int = 32,
+            host: Optional[str] = None,
+            max_concurrency: int = 1,
+            max_retries: int = 3,
+            retry_delay: float = 0.5,
+            timeout: Optional[float] = None,
         ):
         """Initialize the Ollama embeddings class.
         
@@ -15,10 +24,22 @@ class OllamaEmbeddings(Embeddings):
             model_name: Name of the Ollama model to use for embeddings
             dim: Dimension of the embedding vectors
             batch_size: Number of texts to process at once
+            host: URL of the Ollama server, defaults to the OLLAMA_HOST environment variable or the local server
+            max_concurrency: Maximum number of batches sent to the server at the same time, 1 to send them one after the other
+            max_retries: Number of retries of a batch on connection errors, timeouts and server errors
+            retry_delay: Delay before the first retry in seconds, doubled after each retry
+            timeout: Timeout of the requests in seconds, None to wait indefinitely
         """
         super().__init__(dim=dim)
+        if max_concurrency < 1:
+            raise ValueError("Invalid max concurrency provided, should be at least 1")
         self.model_name = model_name
         self.batch_size = batch_size
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
         
         try:
             import ollama
@@ -28,9 +49,56 @@ class OllamaEmbeddings(Embeddings):
                 "Please run `pip install ollama`"
             )
         self.ollama = ollama
+        self.client = ollama.Client(host=host, timeout=timeout)
+        # The async clients are bound to the event loop they are used in, one per loop
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Whether a request failed because of a transient error (connection, timeout, overload or server error)"""
+        if isinstance(error, self.ollama.ResponseError):
+            return error.status_code == 429 or error.status_code >= 500
+        try:
+            import httpx
+            if isinstance(error, httpx.TransportError):
+                return True
+        except ImportError:
+            pass
+        return isinstance(error, (ConnectionError, TimeoutError))
+
+    def _embed(self, input: Union[str, List[str]]) -> np.ndarray:
+        """Send one embedding request to Ollama, retrying with exponential backoff on transient errors.
+        
+        Args:
+            input: String or list of strings to embed
+            
+        Returns:
+            numpy.ndarray: Array of embeddings, one row per input string
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.embed(model=self.model_name, input=input)
+                return np.array(response['embeddings'], dtype=np.float32)
+            except Exception as error:
+                if attempt == self.max_retries or not self._is_retryable(error):
+                    raise
+                time.sleep(self.retry_delay * 2 ** attempt)
+
+    async def _aembed(self, client, input: Union[str, List[str]]) -> np.ndarray:
+        """Asynchronous version of `_embed`"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.embed(model=self.model_name, input=input)
+                return np.array(response['embeddings'], dtype=np.float32)
+            except Exception as error:
+                if attempt == self.max_retries or not self._is_retryable(error):
+                    raise
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
 
     def _batch_embed(self, texts: List[str]) -> np.ndarray:
         """Embed a batch of texts using Ollama.
+
+        The texts are sent in batches of `batch_size`, with at most `max_concurrency`
+        batches in flight at the same time. The embeddings are kept in the order of the texts.
         
         Args:
             texts: List of strings to embed
@@ -38,23 +106,44 @@ class OllamaEmbeddings(Embeddings):
         Returns:
             numpy.ndarray: Array of embeddings
         """
-        all_embeddings = []
-        
-        # Process in batches
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-            # Get embeddings for the entire batch at once
-            response = self.ollama.embed(
-                model=self.model_name,
-                input=batch
-            )
-            # Convert the embeddings list to numpy array
-            batch_embeddings = np.array(response['embeddings'], dtype=np.float32)
-            all_embeddings.append(batch_embeddings)
-            
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.max_concurrency > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                all_embeddings = list(executor.map(self._embed, batches))
+        else:
+            all_embeddings = [self._embed(batch) for batch in batches]
         # Concatenate all batches
         return np.concatenate(all_embeddings) if len(all_embeddings) > 1 else all_embeddings[0]
 
+    def _async_client(self):
+        """Get the async client of the running event loop, created on first use and reused by the next calls"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self.ollama.AsyncClient(host=self.host, timeout=self.timeout)
+            self._async_clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """Close the async client of the running event loop"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            # The ollama versions before 0.4 have no close method, close the underlying httpx client
+            await client._client.aclose()
+
+    async def _abatch_embed(self, texts: List[str]) -> np.ndarray:
+        """Asynchronous version of `_batch_embed`"""
+        client = self._async_client()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_batch(batch: List[str]) -> np.ndarray:
+            async with semaphore:
+                return await self._aembed(client, batch)
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        all_embeddings = await asyncio.gather(*[embed_batch(batch) for batch in batches])
+        return np.concatenate(all_embeddings) if len(all_embeddings) > 1 else all_embeddings[0]
+
     def embed_text(self, query_or_queries: Union[str, List[str]]) -> np.ndarray:
         """Embed text or list of texts using Ollama.
         
@@ -72,17 +161,34 @@ class OllamaEmbeddings(Embeddings):
                 raise ValueError("Input cannot be an empty string.")
             
             # Single string case
-            response = self.ollama.embed(
-                model=self.model_name,
-                input=query_or_queries
-            )
-            return np.array(response['embeddings'][0], dtype=np.float32)
+            return self._embed(query_or_queries)[0]
         else:
             # List of strings case
             if not query_or_queries:  # Empty list check
                 raise ValueError("Input cannot be an empty list.")
                 
             return self._batch_embed(query_or_queries)
+
+    async def aembed_text(self, query_or_queries: Union[str, List[str]]) -> np.ndarray:
+        """Asynchronous version of `embed_text`, with at most `max_concurrency` batches in flight.
+        
+        Args:
+            query_or_queries: Single string or list of strings to embed
+            
+        Returns:
+            numpy.ndarray: Array of embeddings
+            
+        Raises:
+            ValueError: If input is an empty string
+        """
+        if isinstance(query_or_queries, str):
+            if query_or_queries == "":
+                raise ValueError("Input cannot be an empty string.")
+            return (await self._abatch_embed([query_or_queries]))[0]
+        else:
+            if not query_or_queries:
+                raise ValueError("Input cannot be an empty list.")
+            return await self._abatch_embed(query_or_queries)
     
     def embed_image(self, image_or_images: Union[np.ndarray, List[np.ndarray]]) -> np.ndarray:
         """Not implemented for Ollama embeddings."""
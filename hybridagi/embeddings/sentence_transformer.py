@@ -2,10 +2,18 @@
 # Modified from dspy vectorizer
 
 import numpy as np
-from typing import Union, List
+from typing import Union, List, Optional, Dict, Any
 from hybridagi.embeddings.embeddings import Embeddings
 
 class SentenceTransformerEmbeddings(Embeddings):
+    """
+    The embeddings computed by a SentenceTransformer model.
+
+    When several GPUs are available, or when `num_workers` CPU workers are requested,
+    the inputs larger than `batch_size` are sharded across a pool of worker processes.
+    The pool is started on first use and reused by the following calls, it is stopped
+    with `stop_pool` (or `close`) or when leaving the `with` block of the embeddings.
+    """
 
     def __init__(
             self,
@@ -15,6 +23,8 @@ class SentenceTransformerEmbeddings(Embeddings):
             batch_size: int = 256,
             max_seq_length: int = 256,
             normalize_embeddings: bool = True,
+            num_workers: int = 0,
+            chunk_size: Optional[int] = None,
         ):
         super().__init__(dim=dim)
         self.model_name_or_path = model_name_or_path
@@ -22,6 +32,9 @@ class SentenceTransformerEmbeddings(Embeddings):
         self.batch_size = batch_size
         self.max_seq_length= max_seq_length
         self.normalize_embeddings = normalize_embeddings
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.pool: Optional[Dict[str, Any]] = None
         try:
             from sentence_transformers import SentenceTransformer
         except ImportError:
@@ -48,19 +61,17 @@ class SentenceTransformerEmbeddings(Embeddings):
         
         text_to_vectorize = [query_or_queries] if not isinstance(query_or_queries, list) else query_or_queries
 
-        if self.is_gpu and self.num_devices > 1:
-            target_devices = list(range(self.num_devices))
-            pool = self.model.start_multi_process_pool(target_devices=target_devices)
-            # Compute the embeddings using the multi-process pool
+        if len(text_to_vectorize) > self.batch_size and len(self.target_devices()) > 1:
+            # Compute the embeddings using the persistent multi-process pool
             emb = self.model.encode_multi_process(
                 sentences=text_to_vectorize,
-                pool=pool,
+                pool=self.start_pool(),
                 batch_size=self.batch_size,
+                chunk_size=self.chunk_size,
             )
-            self.model.stop_multi_process_pool(pool)
-            # for some reason, multi-GPU setup doesn't accept normalize_embeddings parameter
+            # for some reason, multi-process setup doesn't accept normalize_embeddings parameter
             if self.normalize_embeddings:
-                emb = emb / np.linalg.norm(emb)
+                emb = emb / np.linalg.norm(emb, axis=1, keepdims=True)
         else:
             emb = self.model.encode(
                 sentences=text_to_vectorize,
@@ -72,5 +83,44 @@ class SentenceTransformerEmbeddings(Embeddings):
         else:
             return emb
     
+    def target_devices(self) -> List[str]:
+        """
+        The devices of the worker processes: one per GPU, or `num_workers` CPU workers without GPUs.
+
+        Returns:
+            List[str]: The device of each worker process.
+        """
+        if self.is_gpu and self.num_devices > 1:
+            return [f"cuda:{i}" for i in range(self.num_devices)]
+        return ["cpu"] * self.num_workers
+
+    def start_pool(self) -> Dict[str, Any]:
+        """
+        Start the pool of worker processes, if not already started.
+        Each worker loads the model once and is reused across the calls to `embed_text`.
+
+        Returns:
+            Dict[str, Any]: The SentenceTransformer multi-process pool.
+        """
+        if self.pool is None:
+            self.pool = self.model.start_multi_process_pool(target_devices=self.target_devices())
+        return self.pool
+
+    def stop_pool(self):
+        """Stop the pool of worker processes, if started"""
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+            self.pool = None
+
+    def close(self):
+        """Release the worker processes"""
+        self.stop_pool()
+
+    def __enter__(self) -> "SentenceTransformerEmbeddings":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop_pool()
+
     def embed_image(self, image_or_images: Union[np._typing.NDArray, List[np._typing.NDArray]]) -> np._typing.NDArray:
         raise NotImplementedError("SentenceTransformer does not support image embeddings")
@@ -2,10 +2,14 @@ from .document_memory import DocumentMemory
 from .program_memory import ProgramMemory
 from .fact_memory import FactMemory
 from .trace_memory import TraceMemory
+from .trace_writer import TraceWriter
+from .program_cache import ProgramCache
 
 __all__ = [
     DocumentMemory,
     ProgramMemory,
     FactMemory,
     TraceMemory,
+    TraceWriter,
+    ProgramCache,
 ]
\ No newline at end of file
@@ -2,10 +2,13 @@ from .falkordb_fact_memory import FalkorDBFactMemory
 from .falkordb_program_memory import FalkorDBProgramMemory
 from .falkordb_document_memory import FalkorDBDocumentMemory
 from .falkordb_trace_memory import FalkorDBTraceMemory
+from .falkordb_pool import FalkorDBConnectionPool, GraphPipeline
 
 __all__ = [
     FalkorDBFactMemory,
     FalkorDBDocumentMemory,
     FalkorDBProgramMemory,
-    FalkorDBTraceMemory
+    FalkorDBTraceMemory,
+    FalkorDBConnectionPool,
+    GraphPipeline,
 ]
\ No newline at end of file
@@ -3,12 +3,26 @@ from uuid import UUID
 from collections import OrderedDict
 import json
 from .falkordb_memory import FalkorDBMemory
+from .falkordb_pool import FalkorDBConnectionPool
 from ....embeddings.embeddings import Embeddings
 from ....memory.document_memory import DocumentMemory
 from ....core.datatypes import DocumentList, Document
 from ....core.datatypes import GraphProgramList
 from falkordb import Node, Graph
 
+# The document properties returned by the read queries (the node is bound to `d`)
+DOCUMENT_PROPERTIES = ", ".join([
+    "d.id AS id",
+    "d.text AS text",
+    "d.parent_id AS parent_id",
+    "d.metadata AS metadata",
+    "d.vector AS vector",
+])
+
+GET_DOCUMENTS_QUERY = "MATCH (d:Document) WHERE d.id IN $ids RETURN "+DOCUMENT_PROPERTIES
+
+REMOVE_DOCUMENTS_QUERY = "UNWIND $rows AS id MATCH (n:Document {id: id}) DETACH DELETE n"
+
 class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
     """
     A class used to manage and store documents using FalkorDB.
@@ -28,6 +42,8 @@ class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
         username: str = "",
         password: str = "",
         wipe_on_start: bool = False,
+        batch_size: int = 1000,
+        pool: Optional[FalkorDBConnectionPool] = None,
     ):
         super().__init__(
             index_name = index_name,
@@ -37,6 +53,8 @@ class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
             username = username,
             password = password,
             wipe_on_start = wipe_on_start,
+            batch_size = batch_size,
+            pool = pool,
         )
         if wipe_on_start:
             self.clear()
@@ -59,6 +77,21 @@ class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
 
         This method updates existing documents or creates new ones if they don't exist.
         It handles both individual Document objects and DocumentList objects.
+        The documents and their PART_OF relationships are written with batched
+        `UNWIND` queries of at most `batch_size` rows.
+
+        Args:
+            doc_or_docs (Union[Document, DocumentList]): The document(s) to update or create.
+
+        Raises:
+            ValueError: If the input is neither a Document nor a DocumentList.
+        """
+        for query, rows in self._update_queries(doc_or_docs):
+            self._query_batches(query, rows)
+
+    async def aupdate(self, doc_or_docs: Union[Document, DocumentList]) -> None:
+        """
+        Asynchronous version of `update`.
 
         Args:
             doc_or_docs (Union[Document, DocumentList]): The document(s) to update or create.
@@ -66,6 +99,11 @@ class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
         Raises:
             ValueError: If the input is neither a Document nor a DocumentList.
         """
+        for query, rows in self._update_queries(doc_or_docs):
+            await self._aquery_batches(query, rows)
+
+    def _update_queries(self, doc_or_docs: Union[Document, DocumentList]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Build the batched queries of `update` as (query, rows) pairs"""
         if not isinstance(doc_or_docs, (Document, DocumentList)):
             raise ValueError("Invalid datatype provided must be Document or DocumentList")
         if isinstance(doc_or_docs, Document):
@@ -73,44 +111,37 @@ class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
             documents.docs = [doc_or_docs]
         else:
             documents = doc_or_docs
+        rows = []
         for doc in documents.docs:
-            doc_id = str(doc.id)
-            params = {
-                "id": doc_id,
+            rows.append({
+                "id": str(doc.id),
                 "parent_id": str(doc.parent_id) if doc.parent_id else None,
                 "text": doc.text,
                 "vector": list(doc.vector) if doc.vector is not None else None,
                 "metadata": json.dumps(doc.metadata)
-            }
-            self._graph.query(
-                " ".join([
-                "MERGE (d:Document {id: $id})",
-                "SET",
-                "d.text=$text,",
-                "d.parent_id=$parent_id,",
-                "d.metadata=$metadata,",
-                "d.vector=vecf32($vector)"]),
-                params = params,
-            )
-            params = {
-                "id": doc_id,
-            }
-            self._graph.query(
-                "MATCH (:Document {id: $id})-[r]->() DELETE r",
-                params=params,
-            )
-            if doc.parent_id is not None:
-                parent_id = str(doc.parent_id)
-                params = {
-                    "id": doc_id,
-                    "parent_id": parent_id,
-                }
-                self._graph.query(
-                    " ".join([
-                    "MATCH (d:Document {id: $id})",
-                    "MERGE (d)-[:PART_OF]->(:Document {id: $parent_id})"]),
-                    params = params,
-                )
+            })
+        return [(
+            " ".join([
+            "UNWIND $rows AS row",
+            "MERGE (d:Document {id: row.id})",
+            "SET",
+            "d.text=row.text,",
+            "d.parent_id=row.parent_id,",
+            "d.metadata=row.metadata,",
+            "d.vector=vecf32(row.vector)"]),
+            rows,
+        ), (
+            "UNWIND $rows AS row MATCH (:Document {id: row.id})-[r]->() DELETE r",
+            rows,
+        ), (
+            " ".join([
+            "UNWIND $rows AS row",
+            "WITH row WHERE row.parent_id IS NOT NULL",
+            "MATCH (d:Document {id: row.id})",
+            "MERGE (p:Document {id: row.parent_id})",
+            "MERGE (d)-[:PART_OF]->(p)"]),
+            [row for row in rows if row["parent_id"] is not None],
+        )]
 
     def remove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
         """
@@ -123,16 +154,16 @@ class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
             doc_or_docs (Union[UUID, str, List[Union[UUID, str]]]): The ID(s) of the document(s) to remove.
                 Can be a single UUID, string, or a list of UUIDs or strings.
         """
-        if not isinstance(id_or_ids, list):
-            documents_ids = [id_or_ids]
-        else:
-            documents_ids = id_or_ids
-        for doc_id in documents_ids:
-            doc_id = str(doc_id)
-            self._graph.query(
-                "MATCH (n:Document {id: $id}) DETACH DELETE n",
-                params={"id": doc_id}
-            )
+        self._query_batches(REMOVE_DOCUMENTS_QUERY, self._ids(id_or_ids))
+
+    async def aremove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
+        """
+        Asynchronous version of `remove`.
+
+        Args:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): The ID(s) of the document(s) to remove.
+        """
+        await self._aquery_batches(REMOVE_DOCUMENTS_QUERY, self._ids(id_or_ids))
 
     def get(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> DocumentList:
         """
@@ -151,46 +182,59 @@ class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
         Note:
             - If a document with a given ID doesn't exist, it will not be included in the result.
             - The method returns all available fields for each document (id, text, parent_id, vector, metadata).
+            - All the documents are fetched with a single query.
         """
-        if not isinstance(id_or_ids, list):
-            documents_ids = [id_or_ids]
-        else:
-            documents_ids = id_or_ids
+        ids = self._ids(id_or_ids)
+        query_result = self._graph.query(GET_DOCUMENTS_QUERY, params={"ids": ids})
+        return self._to_documents(ids, query_result.result_set)
+
+    async def aget(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> DocumentList:
+        """
+        Asynchronous version of `get`.
+
+        Args:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): The ID(s) of the document(s) to retrieve.
+
+        Returns:
+            DocumentList: A list of Document objects matching the given ID(s).
+        """
+        ids = self._ids(id_or_ids)
+        query_result = await self.get_async_graph().query(GET_DOCUMENTS_QUERY, params={"ids": ids})
+        return self._to_documents(ids, query_result.result_set)
+
+    def _to_documents(self, ids: List[str], rows: List[List[Any]]) -> DocumentList:
+        """Build the documents from the rows of `GET_DOCUMENTS_QUERY`, in the order of the given ids"""
+        documents = {row[0]: self._to_document(row) for row in rows}
         result = DocumentList()
-        for doc_id in documents_ids:
-            doc_id = str(doc_id)
-            if self.exist(doc_id):
-                query_result = self._graph.query(
-                    " ".join(
-                        [
-                            "MATCH (d:Document {id: $id})",
-                            "RETURN d.text as text,",
-                            "d.parent_id as parent_id,",
-                            "d.metadata as metadata,",
-                            "d.vector as vector",
-                        ]
-                    ),
-                    params={"id": doc_id},
-                )
-                text = query_result.result_set[0][0]
-                parent_id = query_result.result_set[0][1]
-                metadata = query_result.result_set[0][2]
-                if parent_id:
-                    try:
-                        parent_id = UUID(parent_id)
-                    except Exception:
-                        pass
-                try:
-                    doc_id = UUID(doc_id)
-                except Exception:
-                    pass
-                doc = Document(id=doc_id, parent_id=parent_id, text=text)
-                doc.metadata = json.loads(metadata)
-                if query_result.result_set[0][3]:
-                    doc.vector = query_result.result_set[0][3]
-                result.docs.append(doc)
+        result.docs = [documents[doc_id] for doc_id in ids if doc_id in documents]
         return result
 
+    def _to_document(self, row: List[Any]) -> Document:
+        """
+        Build a document from a row of the properties returned by `DOCUMENT_PROPERTIES`.
+
+        Args:
+            row (List[Any]): The row (id, text, parent_id, metadata, vector).
+
+        Returns:
+            Document: The corresponding document.
+        """
+        doc_id, text, parent_id, metadata, vector = row[:5]
+        if parent_id:
+            try:
+                parent_id = UUID(parent_id)
+            except Exception:
+                pass
+        try:
+            doc_id = UUID(doc_id)
+        except Exception:
+            pass
+        doc = Document(id=doc_id, parent_id=parent_id, text=text)
+        doc.metadata = json.loads(metadata) if metadata else {}
+        if vector:
+            doc.vector = vector
+        return doc
+
     def get_parents(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> DocumentList:
         """
         Retrieve the parent documents of one or more documents from the database.
@@ -211,9 +255,15 @@ class FalkorDBDocumentMemory(FalkorDBMemory, DocumentMemory):
         """
         if not isinstance(id_or_ids, list):
             documents_ids = [id_or_ids]
+        else:
+            documents_ids = id_or_ids
+        query_result = self._graph.query(
+            " ".join([
+                "MATCH (c:Document)-[:PART_OF]->(d:Document) WHERE c.id IN $ids",
+                "RETURN DISTINCT "+DOCUMENT_PROPERTIES,
+            ]),
+            params={"ids": [str(doc_id) for doc_id in documents_ids]},
+        )
         result = DocumentList()
-        parent_ids = []
-        for doc in self.get(documents_ids):
-            if doc.parent_id:
-                parent_ids.append(doc.parent_id)
-        return self.get(parent_ids)
\ No newline at end of file
+        result.docs = [self._to_document(row) for row in query_result.result_set]
+        return result
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Union, List, Optional, Dict
+from typing import Union, List, Optional, Dict, Any, Tuple
 import json
 from uuid import UUID
 from collections import OrderedDict
@@ -6,6 +6,53 @@ from hybridagi.memory.fact_memory import FactMemory
 from hybridagi.core.datatypes import Entity, EntityList, Fact, FactList, Relationship, GraphProgram
 from hybridagi.embeddings.embeddings import Embeddings
 from .falkordb_memory import FalkorDBMemory
+from .falkordb_pool import FalkorDBConnectionPool
+
+def entity_properties(var: str) -> str:
+    """The entity properties returned by the read queries for the entity bound to `var`"""
+    return ", ".join([
+        var+".id",
+        var+".name",
+        var+".label",
+        var+".description",
+        var+".metadata",
+        var+".vector",
+    ])
+
+# The entity properties returned by the read queries (the node is bound to `e`)
+ENTITY_PROPERTIES = entity_properties("e")
+
+# The fact properties returned by the read queries (the relationship is bound to `r`,
+# its subject to `s` and its object to `o`)
+FACT_PROPERTIES = ", ".join([
+    "r._id_",
+    "r.relationship",
+    "r.metadata",
+    "r.vector",
+    entity_properties("s"),
+    entity_properties("o"),
+])
+
+GET_ENTITIES_QUERY = "MATCH (e:Entity) WHERE e.id IN $ids RETURN "+ENTITY_PROPERTIES
+
+# The existing entities whose label is changed by an update, with their previous label
+CHANGED_LABELS_QUERY = " ".join([
+    "UNWIND $rows AS row",
+    "MATCH (e:Entity {id: row.id})",
+    "WHERE e.label <> row.label",
+    "RETURN e.id, e.label",
+])
+
+GET_FACTS_QUERY = " ".join([
+    "MATCH (s:Entity)-[r:FACT]->(o:Entity) WHERE r._id_ IN $ids",
+    "RETURN "+FACT_PROPERTIES,
+])
+
+# The batched queries removing the entities then the facts with the given ids
+REMOVE_QUERIES = [
+    "MATCH (e:Entity) WHERE e.id IN $rows DETACH DELETE e",
+    "MATCH ()-[r:FACT]->() WHERE r._id_ IN $rows DELETE r",
+]
 
 class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
     """
@@ -26,6 +73,8 @@ class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
         username: str = "",
         password: str = "",
         wipe_on_start: bool = False,
+        batch_size: int = 1000,
+        pool: Optional[FalkorDBConnectionPool] = None,
     ):
         super().__init__(
             index_name = index_name,
@@ -35,6 +84,8 @@ class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
             username = username,
             password = password,
             wipe_on_start = wipe_on_start,
+            batch_size = batch_size,
+            pool = pool,
         )
 
     def exist(self, entity_or_fact_id: Union[UUID, str]) -> bool:
@@ -61,6 +112,9 @@ class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
     def update(self, entities_or_facts: Union[Entity, EntityList, Fact, FactList]) -> None:
         """
         Update the FalkorDB fact memory with new entities or facts.
+        The entities (one query per label) and facts are written with batched
+        `UNWIND` queries of at most `batch_size` rows. The previous label of the
+        updated entities whose label changed is removed first.
 
         Parameters:
             entities_or_facts (Union[Entity, EntityList, Fact, FactList]): An entity or a list of entities, or a fact or a list of facts to be added to the memory.
@@ -68,6 +122,64 @@ class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
         Raises:
             ValueError: If the input is not an Entity, EntityList, Fact, or FactList.
         """
+        queries = self._update_queries(entities_or_facts)
+        changed_labels = []
+        for rows in self._batches(self._labels_rows(entities_or_facts)):
+            changed_labels.extend(self._graph.query(CHANGED_LABELS_QUERY, params={"rows": rows}).result_set)
+        for query, rows in self._remove_labels_queries(changed_labels) + queries:
+            self._query_batches(query, rows)
+
+    async def aupdate(self, entities_or_facts: Union[Entity, EntityList, Fact, FactList]) -> None:
+        """
+        Asynchronous version of `update`.
+
+        Parameters:
+            entities_or_facts (Union[Entity, EntityList, Fact, FactList]): An entity or a list of entities, or a fact or a list of facts to be added to the memory.
+
+        Raises:
+            ValueError: If the input is not an Entity, EntityList, Fact, or FactList.
+        """
+        queries = self._update_queries(entities_or_facts)
+        changed_labels = []
+        for rows in self._batches(self._labels_rows(entities_or_facts)):
+            result = await self.get_async_graph().query(CHANGED_LABELS_QUERY, params={"rows": rows})
+            changed_labels.extend(result.result_set)
+        for query, rows in self._remove_labels_queries(changed_labels) + queries:
+            await self._aquery_batches(query, rows)
+
+    def _labels_rows(self, entities_or_facts: Union[Entity, EntityList, Fact, FactList]) -> List[Dict[str, str]]:
+        """The (id, label) rows of the entities updated by `update`, none for the facts that only create their entities"""
+        if isinstance(entities_or_facts, Entity):
+            return [{"id": str(entities_or_facts.id), "label": entities_or_facts.label}]
+        if isinstance(entities_or_facts, EntityList):
+            return [{"id": str(ent.id), "label": ent.label} for ent in entities_or_facts.entities]
+        return []
+
+    def _batches(self, rows: List[Any]) -> List[List[Any]]:
+        """Split the rows into batches of at most `batch_size` rows"""
+        return [rows[i:i+self.batch_size] for i in range(0, len(rows), self.batch_size)]
+
+    def _remove_labels_queries(self, changed_labels: List[List[str]]) -> List[Tuple[str, List[str]]]:
+        """
+        Build the batched queries removing the previous labels of the entities as (query, rows) pairs, one per label.
+
+        Parameters:
+            changed_labels (List[List[str]]): The (id, previous label) rows returned by `CHANGED_LABELS_QUERY`.
+
+        Returns:
+            List[Tuple[str, List[str]]]: The `UNWIND` queries and their rows (the entity ids).
+        """
+        ids_by_label: Dict[str, List[str]] = {}
+        for ent_id, label in changed_labels:
+            if label:
+                ids_by_label.setdefault(label, []).append(ent_id)
+        return [
+            ("UNWIND $rows AS id MATCH (e:Entity {id: id}) REMOVE e:"+label, ids)
+            for label, ids in ids_by_label.items()
+        ]
+
+    def _update_queries(self, entities_or_facts: Union[Entity, EntityList, Fact, FactList]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Build the batched queries of `update` as (query, rows) pairs"""
         if not isinstance(entities_or_facts, (Entity, EntityList, Fact, FactList)):
             raise ValueError("Invalid datatype provided must be Entity, EntityList, Fact or FactList")
         if isinstance(entities_or_facts, Entity) or isinstance(entities_or_facts, EntityList):
@@ -76,59 +188,79 @@ class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
                 entities.entities = [entities_or_facts]
             else:
                 entities = entities_or_facts
-            for ent in entities.entities:
-                ent_id = str(ent.id)
-                params = {
-                    "id": ent_id,
-                    "label": ent.label,
-                    "name": ent.name,
-                    "description": ent.description,
-                    "vector": list(ent.vector) if ent.vector is not None else None,
-                    "metadata": json.dumps(ent.metadata),
-                }
-                self._graph.query(
-                    " ".join([
-                    "MERGE (e:"+ent.label+":Entity {id: $id})",
-                    "SET",
-                    "e.name=$name,",
-                    "e.label=$label,",
-                    "e.description=$description,",
-                    "e.metadata=$metadata,",
-                    "e.vector=vecf32($vector)"]),
-                    params = params,
-                )
+            return self._update_entities_queries(entities.entities)
+        if isinstance(entities_or_facts, Fact):
+            facts = FactList()
+            facts.facts = [entities_or_facts]
         else:
-            if isinstance(entities_or_facts, Fact):
-                facts = FactList()
-                facts.facts = [entities_or_facts]
-            else:
-                facts = entities_or_facts
-            for fact in facts.facts:
-                fact_id = str(fact.id)
-                if not self.exist(fact.subj.id):
-                    self.update(fact.subj)
-                if not self.exist(fact.obj.id):
-                    self.update(fact.obj)
-                params = {
-                    "id": fact_id,
-                    "subject_id": str(fact.subj.id),
-                    "object_id": str(fact.obj.id),
-                    "relationship": fact.rel.name,
-                    "vector": list(fact.vector) if fact.vector is not None else None,
-                    "metadata": json.dumps(fact.metadata),
-                }
-                self._graph.query(
-                    " ".join([
-                        "MATCH (s:Entity {id: $subject_id}),",
-                        "(o:Entity {id: $object_id})",
-                        "MERGE (s)-[r:FACT {_id_: $id}]->(o)",
-                        "SET",
-                        "r.relationship=$relationship,",
-                        "r.vector=vecf32($vector),",
-                        "r.metadata=$metadata",
-                    ]),
-                    params=params,
-                )
+            facts = entities_or_facts
+        entities = {}
+        rows = []
+        for fact in facts.facts:
+            entities.setdefault(str(fact.subj.id), fact.subj)
+            entities.setdefault(str(fact.obj.id), fact.obj)
+            rows.append({
+                "id": str(fact.id),
+                "subject_id": str(fact.subj.id),
+                "object_id": str(fact.obj.id),
+                "relationship": fact.rel.name,
+                "vector": list(fact.vector) if fact.vector is not None else None,
+                "metadata": json.dumps(fact.metadata),
+            })
+        queries = self._update_entities_queries(list(entities.values()), only_create=True)
+        queries.append((
+            " ".join([
+                "UNWIND $rows AS row",
+                "MATCH (s:Entity {id: row.subject_id}),",
+                "(o:Entity {id: row.object_id})",
+                "MERGE (s)-[r:FACT {_id_: row.id}]->(o)",
+                "SET",
+                "r.relationship=row.relationship,",
+                "r.vector=vecf32(row.vector),",
+                "r.metadata=row.metadata",
+            ]),
+            rows,
+        ))
+        return queries
+
+    def _update_entities_queries(self, entities: List[Entity], only_create: bool = False) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Build the batched queries writing the entities as (query, rows) pairs, one per label.
+
+        Parameters:
+            entities (List[Entity]): The entities to write.
+            only_create (bool): Whether to leave the existing entities untouched. Defaults to False.
+
+        Returns:
+            List[Tuple[str, List[Dict[str, Any]]]]: The `UNWIND` queries and their rows.
+        """
+        rows_by_label: Dict[str, List[Dict]] = {}
+        for ent in entities:
+            rows_by_label.setdefault(ent.label, []).append({
+                "id": str(ent.id),
+                "label": ent.label,
+                "name": ent.name,
+                "description": ent.description,
+                "vector": list(ent.vector) if ent.vector is not None else None,
+                "metadata": json.dumps(ent.metadata),
+            })
+        queries = []
+        for label, rows in rows_by_label.items():
+            queries.append((
+                " ".join([
+                "UNWIND $rows AS row",
+                # Merge on the id only, an entity whose label changed is updated instead of duplicated
+                "MERGE (e:Entity {id: row.id})",
+                "ON CREATE SET" if only_create else "SET",
+                "e:"+label+",",
+                "e.name=row.name,",
+                "e.label=row.label,",
+                "e.description=row.description,",
+                "e.metadata=row.metadata,",
+                "e.vector=vecf32(row.vector)"]),
+                rows,
+            ))
+        return queries
 
     def remove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
         """
@@ -137,25 +269,20 @@ class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
         Parameters:
             id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single entity or fact id or a list of entity or fact ids to be removed from the memory.
         """
-        if not isinstance(id_or_ids, list):
-            entities_ids = [id_or_ids]
-        else:
-            entities_ids = id_or_ids
-        result = EntityList()
-        ids = [str(i) for i in id_or_ids]
-        self._graph.query(
-            " ".join([
-                "MATCH (e:Entity) WHERE e.id IN $ids",
-                "DETACH DELETE e"]),
-            params={"ids": ids}
-        )
-        self._graph.query(
-            " ".join([
-                "MATCH ()-[r:FACT {id: $id}]->()",
-                "WHERE r.id IN $ids",
-                "DELETE r"]),
-            params={"ids": ids}
-        )
+        ids = self._ids(id_or_ids)
+        for query in REMOVE_QUERIES:
+            self._query_batches(query, ids)
+
+    async def aremove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
+        """
+        Asynchronous version of `remove`.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single entity or fact id or a list of entity or fact ids to be removed from the memory.
+        """
+        ids = self._ids(id_or_ids)
+        for query in REMOVE_QUERIES:
+            await self._aquery_batches(query, ids)
 
     def get_entities(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> EntityList:
         """
@@ -167,44 +294,23 @@ class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
         Returns:
             EntityList: A list of entities that match the input ids.
         """
-        if not isinstance(id_or_ids, list):
-            entities_ids = [id_or_ids]
-        else:
-            entities_ids = id_or_ids
-        result = EntityList()
-        ids = [str(i) for i in id_or_ids]
-        for entity_id in entities_ids:
-            if self.exist(entity_id):
-                query_result = self._graph.query(
-                    " ".join(
-                        [
-                            "MATCH (e:Entity {id: $id})",
-                            "RETURN",
-                            "e.name as name,",
-                            "e.label as label,",
-                            "e.description as description,",
-                            "e.vector as vector",
-                        ]
-                    ),
-                    params={"id": entity_id}
-                )
-                try:
-                    entity_id = UUID(entity_id)
-                except Exception:
-                    pass
-                name = query_result.result_set[0][0]
-                label = query_result.result_set[0][1]
-                description = query_result.result_set[0][2]
-                vector = query_result.result_set[0][3]
-                entity = Entity(
-                    id=entity_id,
-                    name=name,
-                    label=label,
-                    description=description,
-                    vector=vector,
-                )
-                result.entities.append(entity)
-        return result
+        ids = self._ids(id_or_ids)
+        query_result = self._graph.query(GET_ENTITIES_QUERY, params={"ids": ids})
+        return self._to_entities(ids, query_result.result_set)
+
+    async def aget_entities(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> EntityList:
+        """
+        Asynchronous version of `get_entities`.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single entity id or a list of entity ids to be retrieved from the memory.
+
+        Returns:
+            EntityList: A list of entities that match the input ids.
+        """
+        ids = self._ids(id_or_ids)
+        query_result = await self.get_async_graph().query(GET_ENTITIES_QUERY, params={"ids": ids})
+        return self._to_entities(ids, query_result.result_set)
 
     def get_facts(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> FactList:
         """
@@ -216,48 +322,82 @@ class FalkorDBFactMemory(FalkorDBMemory, FactMemory):
         Returns:
             FactList: A list of facts that match the input ids.
         """
-        if not isinstance(id_or_ids, list):
-            facts_ids = [id_or_ids]
-        else:
-            facts_ids = id_or_ids
+        ids = self._ids(id_or_ids)
+        query_result = self._graph.query(GET_FACTS_QUERY, params={"ids": ids})
+        return self._to_facts(ids, query_result.result_set)
+
+    async def aget_facts(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> FactList:
+        """
+        Asynchronous version of `get_facts`.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single fact id or a list of fact ids to be retrieved from the memory.
+
+        Returns:
+            FactList: A list of facts that match the input ids.
+        """
+        ids = self._ids(id_or_ids)
+        query_result = await self.get_async_graph().query(GET_FACTS_QUERY, params={"ids": ids})
+        return self._to_facts(ids, query_result.result_set)
+
+    def _to_entities(self, ids: List[str], rows: List[List[Any]]) -> EntityList:
+        """Build the entities from the rows of `GET_ENTITIES_QUERY`, in the order of the given ids"""
+        entities = {row[0]: self._to_entity(row) for row in rows}
+        result = EntityList()
+        result.entities = [entities[entity_id] for entity_id in ids if entity_id in entities]
+        return result
+
+    def _to_facts(self, ids: List[str], rows: List[List[Any]]) -> FactList:
+        """Build the facts from the rows of `GET_FACTS_QUERY`, in the order of the given ids"""
+        facts = {row[0]: self._to_fact(row) for row in rows}
         result = FactList()
-        for fact_id in facts_ids:
-            fact_id = str(fact_id)
-            if self.exist_fact(fact_id):
-                query_result = self._graph.query(
-                    " ".join(
-                        [
-                            "MATCH (s:Entity)-[r:FACT {_id_:$id}]->(o:Entity)",
-                            "RETURN",
-                            "r.relationship as relationship_name,",
-                            "r.metadata as metadata,",
-                            "r.vector as relation_vector,",
-                            "s.id as subject_id,",
-                            "o.id as object_id",
-                        ]
-                    ),
-                    params={"id": fact_id},
-                )
-                relationship_name = query_result.result_set[0][0]
-                relationship_metadata = query_result.result_set[0][1]
-                relationship_vector = query_result.result_set[0][2]
-                subject_id = query_result.result_set[0][3]
-                object_id = query_result.result_set[0][4]
-                entities = self.get_entities([subject_id, object_id])
-                subject_entity = entities.entities[0]
-                object_entity = entities.entities[1]
-                rel = Relationship(name=relationship_name)
-                try:
-                    fact_id = UUID(fact_id)
-                except Exception:
-                    pass
-                fact = Fact(
-                    id=fact_id,
-                    subj=subject_entity,
-                    rel=rel,
-                    obj=object_entity,
-                    vector=relationship_vector,
-                    metadata=json.loads(relationship_metadata),
-                )
-                result.facts.append(fact)
-        return result
\ No newline at end of file
+        result.facts = [facts[fact_id] for fact_id in ids if fact_id in facts]
+        return result
+
+    def _to_entity(self, row: List[Any]) -> Entity:
+        """
+        Build an entity from a row of the properties returned by `ENTITY_PROPERTIES`.
+
+        Parameters:
+            row (List[Any]): The row (id, name, label, description, metadata, vector).
+
+        Returns:
+            Entity: The corresponding entity.
+        """
+        entity_id, name, label, description, metadata, vector = row[:6]
+        try:
+            entity_id = UUID(entity_id)
+        except Exception:
+            pass
+        return Entity(
+            id=entity_id,
+            name=name,
+            label=label,
+            description=description,
+            vector=vector,
+            metadata=json.loads(metadata) if metadata else {},
+        )
+
+    def _to_fact(self, row: List[Any]) -> Fact:
+        """
+        Build a fact from a row of the properties returned by `FACT_PROPERTIES`.
+
+        Parameters:
+            row (List[Any]): The row (id, relationship, metadata, vector, subject properties, object properties).
+
+        Returns:
+            Fact: The corresponding fact.
+        """
+        fact_id, relationship_name, metadata, vector = row[:4]
+        try:
+            fact_id = UUID(fact_id)
+        except Exception:
+            pass
+        return Fact(
+            id=fact_id,
+            subj=self._to_entity(row[4:10]),
+            rel=Relationship(name=relationship_name),
+            obj=self._to_entity(row[10:16]),
+            vector=vector,
+            metadata=json.loads(metadata) if metadata else {},
+        )
\ No newline at end of file
@@ -1,8 +1,12 @@
 from typing import Union, List, Optional, Dict, Any
 import json
+import asyncio
 from uuid import UUID
 from falkordb import FalkorDB, Graph
+from falkordb.asyncio import FalkorDB as AsyncFalkorDB
+from falkordb.asyncio.graph import AsyncGraph
 from hybridagi.embeddings.embeddings import Embeddings
+from .falkordb_pool import FalkorDBConnectionPool, GraphPipeline
 
 class FalkorDBMemory():
     """
@@ -25,9 +29,16 @@ class FalkorDBMemory():
         graph_index (str): The identifier for the specific graph within the index.
         indexed_label (str): The label used for indexing nodes in the graph.
         wipe_on_start (bool): Whether to clear the memory when initializing.
-        client (FalkorDB): The FalkorDB client instance.
+        batch_size (int): The maximum number of rows sent in one `UNWIND` query by the bulk writes.
+        pool (Optional[FalkorDBConnectionPool]): The connection pool shared with other memories, if any.
+        client (FalkorDB): The FalkorDB client instance (the client of the pool if given).
         _graph (Graph): The graph object representing the selected or created graph.
+        _async_client (Optional[AsyncFalkorDB]): The asyncio FalkorDB client, created on first async use.
+        _async_graph (Optional[AsyncGraph]): The asyncio graph object, created on first async use.
     """
+    _async_client: Optional[AsyncFalkorDB] = None
+    _async_graph: Optional[AsyncGraph] = None
+
     def __init__(
             self,
             index_name: str,
@@ -37,7 +48,11 @@ class FalkorDBMemory():
             username: str = "",
             password: str = "",
             wipe_on_start: bool = False,
+            batch_size: int = 1000,
+            pool: Optional[FalkorDBConnectionPool] = None,
         ):
+        if pool is not None:
+            hostname, port, username, password = pool.hostname, pool.port, pool.username, pool.password
         self.hostname = hostname
         self.port = port
         self.username = username
@@ -45,12 +60,17 @@ class FalkorDBMemory():
         self.index_name = index_name
         self.graph_index = graph_index
         self.wipe_on_start = wipe_on_start
-        self.client = FalkorDB(
-            hostname,
-            port,
-            username = username if username else None,
-            password = password if password else None,
-        )
+        self.batch_size = batch_size
+        self.pool = pool
+        if pool is not None:
+            self.client = pool.client
+        else:
+            self.client = FalkorDB(
+                hostname,
+                port,
+                username = username if username else None,
+                password = password if password else None,
+            )
         self._graph = self.get_graph(self.graph_index)
         if self.wipe_on_start:
             self.clear()
@@ -60,6 +80,99 @@ class FalkorDBMemory():
         result = self._graph.query(query, params={"index": str(index)})
         return len(result.result_set) > 0
 
+    async def aexist(self, index: Union[UUID, str], label:str) -> bool:
+        """Asynchronous version of `exist`"""
+        query = "MATCH (n:"+label+" {id: $index}) RETURN n.id as id"
+        result = await self.get_async_graph().query(query, params={"index": str(index)})
+        return len(result.result_set) > 0
+
+    def _ids(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> List[str]:
+        """Normalize a single id or a list of ids into a list of string ids"""
+        if not isinstance(id_or_ids, list):
+            return [str(id_or_ids)]
+        return [str(index) for index in id_or_ids]
+
+    def get_async_graph(self) -> AsyncGraph:
+        """
+        Get the asyncio version of the memory graph.
+        The asyncio client (or the asyncio client of the pool) is only created on first use.
+
+        Returns:
+            AsyncGraph: The asyncio FalkorDB graph object.
+        """
+        if self._async_graph is None:
+            if self.pool is not None:
+                self._async_client = self.pool.get_async_client()
+            else:
+                self._async_client = AsyncFalkorDB(
+                    self.hostname,
+                    self.port,
+                    username = self.username if self.username else None,
+                    password = self.password if self.password else None,
+                )
+            self._async_graph = self._async_client.select_graph(self.index_name+":"+self.graph_index)
+        return self._async_graph
+
+    def _query_batches(self, query: str, rows: List[Dict[str, Any]]):
+        """
+        Run a parameterized query (usually `UNWIND $rows AS row ...`) over the given rows,
+        sending at most `batch_size` rows per round trip.
+
+        Args:
+            query (str): The Cypher query, using the `$rows` parameter.
+            rows (List[Dict[str, Any]]): The rows to send.
+        """
+        for i in range(0, len(rows), self.batch_size):
+            self._graph.query(query, params={"rows": rows[i:i+self.batch_size]})
+
+    async def _aquery_batches(self, query: str, rows: List[Dict[str, Any]]):
+        """Asynchronous version of `_query_batches`"""
+        graph = self.get_async_graph()
+        for i in range(0, len(rows), self.batch_size):
+            await graph.query(query, params={"rows": rows[i:i+self.batch_size]})
+
+    def _query_many(self, query: str, params_list: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Run the same query with several sets of parameters, pipelined in a single
+        network flush when there is more than one.
+
+        Args:
+            query (str): The Cypher query.
+            params_list (List[Dict[str, Any]]): The parameters of each run.
+
+        Returns:
+            List[QueryResult]: The results of each run, in order.
+        """
+        if len(params_list) == 1:
+            return [self._graph.query(query, params=params_list[0])]
+        pipeline = self.pipeline()
+        for params in params_list:
+            pipeline.query(self._graph, query, params=params)
+        return pipeline.execute()
+
+    async def _aquery_many(self, query: str, params_list: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Asynchronous version of `_query_many`, the runs are sent concurrently.
+
+        Args:
+            query (str): The Cypher query.
+            params_list (List[Dict[str, Any]]): The parameters of each run.
+
+        Returns:
+            List[QueryResult]: The results of each run, in order.
+        """
+        graph = self.get_async_graph()
+        return await asyncio.gather(*[graph.query(query, params=params) for params in params_list])
+
+    def pipeline(self) -> GraphPipeline:
+        """
+        Create a pipeline to send several independent graph queries in a single network flush.
+
+        Returns:
+            GraphPipeline: The pipeline, using the memory client.
+        """
+        return GraphPipeline(self.client)
+
     def get_graph(self, graph_index: str) -> Graph:
         """
         Retrieve or create a graph from the FalkorDB knowledge base.
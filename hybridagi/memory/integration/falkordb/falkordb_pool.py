@@ -0,0 +1,164 @@
+from typing import Any, Dict, List, Optional
+import redis
+import redis.asyncio
+from falkordb import FalkorDB, Graph
+from falkordb.asyncio import FalkorDB as AsyncFalkorDB
+from falkordb.query_result import QueryResult
+from falkordb.helpers import stringify_param_value
+
+def params_header(params: Optional[Dict[str, Any]]) -> str:
+    """
+    Build the parameters header prepended to a Cypher query sent with GRAPH.QUERY.
+
+    Args:
+        params (Optional[Dict[str, Any]]): The query parameters.
+
+    Returns:
+        str: The "CYPHER key=value ..." header, empty without parameters.
+    """
+    if not params:
+        return ""
+    return "CYPHER " + "".join(f"{key}={stringify_param_value(value)} " for key, value in params.items())
+
+class GraphPipeline():
+    """
+    A pipeline of graph queries sent to FalkorDB in a single network flush.
+
+    The queries are queued with `query` and sent together by `execute`, which
+    returns their results in the same order. The queries are not run inside a
+    transaction, they should be independent of each other's results.
+
+    Attributes:
+        client (FalkorDB): The FalkorDB client used to send the queries.
+    """
+    def __init__(self, client: FalkorDB):
+        self.client = client
+        self._pipeline = client.connection.pipeline(transaction=False)
+        self._graphs: List[Graph] = []
+
+    def query(self, graph: Graph, q: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Queue a query.
+
+        Args:
+            graph (Graph): The graph to query.
+            q (str): The Cypher query.
+            params (Optional[Dict[str, Any]]): The query parameters. Defaults to None.
+
+        Returns:
+            int: The position of the query result in the list returned by `execute`.
+        """
+        query = params_header(params) + q
+        self._pipeline.execute_command("GRAPH.QUERY", graph.name, query, "--compact")
+        self._graphs.append(graph)
+        return len(self._graphs) - 1
+
+    def execute(self) -> List[QueryResult]:
+        """
+        Send the queued queries and wait for their results.
+
+        Returns:
+            List[QueryResult]: The results of the queries, in the order they were queued.
+        """
+        if len(self._graphs) == 0:
+            return []
+        responses = self._pipeline.execute()
+        results = [QueryResult(graph, response) for graph, response in zip(self._graphs, responses)]
+        self._graphs = []
+        return results
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def __enter__(self) -> "GraphPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._pipeline.reset()
+        self._graphs = []
+
+class FalkorDBConnectionPool():
+    """
+    A pool of connections to a FalkorDB server shared by the FalkorDB memories.
+
+    Giving the same pool to the document, fact, program and trace memories of
+    an agent (or to the memories of several agents in the same process) makes
+    them share a bounded number of connections instead of opening one client each.
+
+    Attributes:
+        hostname (str): The hostname of the FalkorDB server.
+        port (int): The port number of the FalkorDB server.
+        username (str): The username for authentication (if required).
+        password (str): The password for authentication (if required).
+        max_connections (int): The maximum number of connections opened by the pool.
+        timeout (Optional[float]): The time to wait for a free connection, None to wait indefinitely.
+        connection_pool (redis.BlockingConnectionPool): The underlying Redis connection pool.
+        client (FalkorDB): The FalkorDB client using the pool.
+        async_connection_pool (Optional[redis.asyncio.BlockingConnectionPool]): The asyncio Redis connection pool, created on first async use.
+        async_client (Optional[AsyncFalkorDB]): The asyncio FalkorDB client using the asyncio pool, created on first async use.
+    """
+    def __init__(
+            self,
+            hostname: str = "localhost",
+            port: int = 6379,
+            username: str = "",
+            password: str = "",
+            max_connections: int = 16,
+            timeout: Optional[float] = None,
+        ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.connection_pool = redis.BlockingConnectionPool(
+            host = hostname,
+            port = port,
+            username = username if username else None,
+            password = password if password else None,
+            max_connections = max_connections,
+            timeout = timeout,
+            decode_responses = True,
+        )
+        self.client = FalkorDB(connection_pool=self.connection_pool)
+        self.async_connection_pool = None
+        self.async_client = None
+
+    def get_async_client(self) -> AsyncFalkorDB:
+        """
+        Get the asyncio FalkorDB client, sharing an asyncio pool of at most `max_connections` connections.
+
+        Returns:
+            AsyncFalkorDB: The asyncio FalkorDB client.
+        """
+        if self.async_client is None:
+            self.async_connection_pool = redis.asyncio.BlockingConnectionPool(
+                host = self.hostname,
+                port = self.port,
+                username = self.username if self.username else None,
+                password = self.password if self.password else None,
+                max_connections = self.max_connections,
+                timeout = self.timeout,
+                decode_responses = True,
+            )
+            self.async_client = AsyncFalkorDB(connection_pool=self.async_connection_pool)
+        return self.async_client
+
+    def pipeline(self) -> GraphPipeline:
+        """
+        Create a pipeline to send several graph queries in a single network flush.
+
+        Returns:
+            GraphPipeline: The pipeline.
+        """
+        return GraphPipeline(self.client)
+
+    def close(self):
+        """Close all the connections of the pool"""
+        self.connection_pool.disconnect()
+
+    async def aclose(self):
+        """Close all the connections of the asyncio pool"""
+        if self.async_connection_pool is not None:
+            await self.async_connection_pool.disconnect()
@@ -1,11 +1,21 @@
 import json
-from typing import Union, List, Optional, Dict
-from uuid import UUID
+from typing import Union, List, Optional, Dict, Any, Tuple
+from uuid import UUID, uuid4
 from ....memory.program_memory import ProgramMemory
 from .falkordb_memory import FalkorDBMemory
+from .falkordb_pool import FalkorDBConnectionPool
 from ....core.graph_program import GraphProgram
 from ....core.datatypes import GraphProgramList
 
+# The program properties returned by the read queries (the node is bound to `p`)
+PROGRAM_PROPERTIES = "p.id AS id, p.program AS program, p.metadata AS metadata, p.vector AS vector"
+
+GET_PROGRAMS_QUERY = "MATCH (p:Program) WHERE p.id IN $ids RETURN "+PROGRAM_PROPERTIES
+
+GET_VERSIONS_QUERY = "MATCH (p:Program) WHERE p.id IN $ids RETURN p.id AS id, p.version AS version"
+
+REMOVE_PROGRAMS_QUERY = "UNWIND $rows AS id MATCH (n:Program {id: id}) DETACH DELETE n"
+
 class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
     """
     Manages and stores programs using FalkorDB.
@@ -14,6 +24,9 @@ class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
     providing a solution for storing and managing programs in a graph database.
     It allows for efficient storage, retrieval, and manipulation of programs using
     FalkorDB's graph capabilities.
+
+    Each update stores a new random version on the Program nodes, so the program
+    caches of all the processes sharing the graph see the updates (see `get_versions`).
     """
 
     def __init__(
@@ -25,6 +38,8 @@ class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
         username: str = "",
         password: str = "",
         wipe_on_start: bool = False,
+        batch_size: int = 1000,
+        pool: Optional[FalkorDBConnectionPool] = None,
     ):
         super().__init__(
             index_name=index_name,
@@ -34,6 +49,8 @@ class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
             username=username,
             password=password,
             wipe_on_start=wipe_on_start,
+            batch_size=batch_size,
+            pool=pool,
         )
         if wipe_on_start:
             self.clear()
@@ -56,7 +73,31 @@ class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
             - If a program with the given ID doesn't exist, a new one will be created.
             - For programs with dependencies, a DEPENDS_ON relationship is created or updated.
             - Program metadata is stored as properties on the Program node.
+            - A new version is stored on the Program node, invalidating the cached copies of every process.
+            - The programs and their dependencies are written with batched `UNWIND` queries of at most `batch_size` rows.
+        """
+        queries = self._update_queries(program_or_programs)
+        for query, rows in queries:
+            self._query_batches(query, rows)
+        self._touch_programs([row["id"] for row in queries[0][1]])
+
+    async def aupdate(self, program_or_programs: Union[GraphProgram, GraphProgramList]) -> None:
+        """
+        Asynchronous version of `update`.
+
+        Parameters:
+            program_or_programs (Union[GraphProgram, GraphProgramList]): A single program or a list of programs to be added to the memory.
+
+        Raises:
+            ValueError: If the input is not a GraphProgram or GraphProgramList.
         """
+        queries = self._update_queries(program_or_programs)
+        for query, rows in queries:
+            await self._aquery_batches(query, rows)
+        self._touch_programs([row["id"] for row in queries[0][1]])
+
+    def _update_queries(self, program_or_programs: Union[GraphProgram, GraphProgramList]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Build the batched queries of `update` as (query, rows) pairs"""
         if not isinstance(program_or_programs, (GraphProgram, GraphProgramList)):
             raise ValueError("Invalid datatype provided must be GraphProgram or GraphProgramList")
         if isinstance(program_or_programs, GraphProgram):
@@ -64,39 +105,41 @@ class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
             programs.progs = [program_or_programs]
         else:
             programs = program_or_programs
+        rows = []
+        dependencies = []
+        version = uuid4().hex
         for prog in programs.progs:
             prog_id = str(prog.name)
-            params = {
+            rows.append({
                 "id": prog_id,
                 "program": prog.to_cypher(),
                 "vector": list(prog.vector) if prog.vector is not None else None,
-                "metadata": json.dumps(prog.metadata)
-            }
-            self._graph.query(
-                " ".join([
-                "MERGE (p:Program {id: $id})",
-                "SET p.program=$program,",
-                "p.metadata=$metadata,",
-                "p.vector=vecf32($vector)"]),
-                params = params,
-            )
-            params = {
-                "id": prog_id,
-            }
-            self._graph.query(
-                "MATCH (:Program {id: $id})-[r]->() DELETE r",
-                params=params,
-            )
+                "metadata": json.dumps(prog.metadata),
+                "version": version,
+            })
             for dep in prog.dependencies:
-                params = {
-                    "id": prog_id,
-                    "dep": dep,
-                }
-                self._graph.query(
-                    "MATCH (p:Program {id: $id}) MERGE (p)-[:DEPENDS_ON]->(:Program {id: $dep})",
-                    params = params,
-                )
-                
+                dependencies.append({"id": prog_id, "dep": dep})
+        return [(
+            " ".join([
+            "UNWIND $rows AS row",
+            "MERGE (p:Program {id: row.id})",
+            "SET p.program=row.program,",
+            "p.metadata=row.metadata,",
+            "p.version=row.version,",
+            "p.vector=vecf32(row.vector)"]),
+            rows,
+        ), (
+            "UNWIND $rows AS row MATCH (:Program {id: row.id})-[r]->() DELETE r",
+            rows,
+        ), (
+            " ".join([
+            "UNWIND $rows AS row",
+            "MATCH (p:Program {id: row.id})",
+            "MERGE (d:Program {id: row.dep})",
+            "MERGE (p)-[:DEPENDS_ON]->(d)"]),
+            dependencies,
+        )]
+
     def remove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
         """
         Remove programs from the falkorDB program memory.
@@ -104,17 +147,19 @@ class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
         Parameters:
             id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single program id or a list of program ids to be removed from the memory.
         """
-        if not isinstance(id_or_ids, list):
-            programs_ids = [id_or_ids]
-        else:
-            programs_ids = id_or_ids
-        for prog_id in programs_ids:
-            prog_id = str(prog_id)
-            self._graph.query(
-                "MATCH (n:Program {id: $id}) DETACH DELETE n",
-                params={"id": prog_id}
-            )
-                
+        self._query_batches(REMOVE_PROGRAMS_QUERY, self._ids(id_or_ids))
+        self._touch_programs(self._ids(id_or_ids))
+
+    async def aremove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
+        """
+        Asynchronous version of `remove`.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single program id or a list of program ids to be removed from the memory.
+        """
+        await self._aquery_batches(REMOVE_PROGRAMS_QUERY, self._ids(id_or_ids))
+        self._touch_programs(self._ids(id_or_ids))
+
     def get(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> GraphProgramList:
         """
         Retrieve programs from the falkorDB program memory.
@@ -125,35 +170,79 @@ class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
         Returns:
             GraphProgramList: A list of programs that match the input ids.
         """
-        if not isinstance(id_or_ids, list):
-            programs_ids = [id_or_ids]
-        else:
-            programs_ids = id_or_ids
+        ids = self._ids(id_or_ids)
+        query_result = self._graph.query(GET_PROGRAMS_QUERY, params={"ids": ids})
+        return self._to_programs(ids, query_result.result_set)
+
+    async def aget(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> GraphProgramList:
+        """
+        Asynchronous version of `get`.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single program id or a list of program ids to be retrieved from the memory.
+
+        Returns:
+            GraphProgramList: A list of programs that match the input ids.
+        """
+        ids = self._ids(id_or_ids)
+        query_result = await self.get_async_graph().query(GET_PROGRAMS_QUERY, params={"ids": ids})
+        return self._to_programs(ids, query_result.result_set)
+
+    def get_versions(self, ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get the versions stored on the Program nodes, changed by each update of any process.
+
+        Parameters:
+            ids (List[str]): The program ids.
+
+        Returns:
+            Dict[str, Optional[str]]: The version of each program, None for the missing ones.
+        """
+        query_result = self._graph.query(GET_VERSIONS_QUERY, params={"ids": ids})
+        return self._to_versions(ids, query_result.result_set)
+
+    async def aget_versions(self, ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Asynchronous version of `get_versions`.
+
+        Parameters:
+            ids (List[str]): The program ids.
+
+        Returns:
+            Dict[str, Optional[str]]: The version of each program, None for the missing ones.
+        """
+        query_result = await self.get_async_graph().query(GET_VERSIONS_QUERY, params={"ids": ids})
+        return self._to_versions(ids, query_result.result_set)
+
+    def _to_versions(self, ids: List[str], rows: List[List[Any]]) -> Dict[str, Optional[str]]:
+        """Map the given ids to the versions returned by `GET_VERSIONS_QUERY`"""
+        versions = {row[0]: row[1] for row in rows}
+        return {prog_id: versions.get(prog_id) for prog_id in ids}
+
+    def _to_programs(self, ids: List[str], rows: List[List[Any]]) -> GraphProgramList:
+        """Build the programs from the rows of `GET_PROGRAMS_QUERY`, in the order of the given ids"""
+        programs = {row[0]: self._to_program(row) for row in rows}
         result = GraphProgramList()
-        for prog_id in programs_ids:
-            prog_id = str(prog_id)
-            if self.exist(prog_id):
-                query_result = self._graph.query(
-                    " ".join(
-                        [
-                            "MATCH (p:Program {id: $id})",
-                            "RETURN",
-                            "p.program as program,",
-                            "p.metadata as metadata,",
-                            "p.vector as vector",
-                        ]
-                    ),
-                    params={"id": prog_id}
-                )
-                cypher_program = query_result.result_set[0][0]
-                metadata = query_result.result_set[0][1]
-                prog = GraphProgram(name=prog_id)
-                prog.from_cypher(cypher_program)
-                prog.metadata = json.loads(metadata)
-                prog.vector = query_result.result_set[0][2]
-                result.progs.append(prog)
+        result.progs = [programs[prog_id] for prog_id in ids if prog_id in programs]
         return result
 
+    def _to_program(self, row: List[Any]) -> GraphProgram:
+        """
+        Build a program from a row of the properties returned by `PROGRAM_PROPERTIES`.
+
+        Parameters:
+            row (List[Any]): The row (id, program, metadata, vector).
+
+        Returns:
+            GraphProgram: The corresponding program.
+        """
+        prog_id, cypher_program, metadata, vector = row[:4]
+        prog = GraphProgram(name=prog_id)
+        prog.from_cypher(cypher_program)
+        prog.metadata = json.loads(metadata) if metadata else {}
+        prog.vector = vector
+        return prog
+
     def get_dependencies(self, prog_id: Union[UUID, str]) -> List[str]:
         """
         Get the dependencies of a program.
@@ -196,4 +285,11 @@ class FalkorDBProgramMemory(FalkorDBMemory, ProgramMemory):
         else:
             if self.depends_on("main", program_name):
                 return True
-        return False
\ No newline at end of file
+        return False
+
+    def clear(self):
+        """
+        Clear all data from the program memory, changing the version of all the programs.
+        """
+        super().clear()
+        self._touch_programs()
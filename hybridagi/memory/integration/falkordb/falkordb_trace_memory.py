@@ -1,15 +1,32 @@
 import uuid
 import json
-from typing import Union, List, Optional, Dict
+from typing import Union, List, Optional, Dict, Any, Tuple
+from datetime import datetime
 from uuid import UUID
 from collections import OrderedDict
 from hybridagi.embeddings.embeddings import Embeddings
 from hybridagi.memory.trace_memory import TraceMemory
 from hybridagi.core.datatypes import AgentStep, AgentStepList, AgentStepType
 from .falkordb_memory import FalkorDBMemory
+from .falkordb_pool import FalkorDBConnectionPool
 
 DATETIME_FORMAT = r'%Y-%m-%d %H:%M:%S'
 
+# The agent step properties returned by the read queries (the node is bound to `s`)
+STEP_PROPERTIES = ", ".join([
+    "s.id AS id",
+    "s.parent_id AS parent_id",
+    "s.hop AS hop",
+    "s.step_type AS step_type",
+    "s.inputs AS inputs",
+    "s.outputs AS outputs",
+    "s.vector AS vector",
+    "s.metadata AS metadata",
+    "s.created_at AS created_at",
+])
+
+GET_STEPS_QUERY = "MATCH (s:AgentStep) WHERE s.id IN $ids RETURN "+STEP_PROPERTIES
+
 class FalkorDBTraceMemory(FalkorDBMemory, TraceMemory):
     """
     A class used to manage and store agent steps using FalkorDB.
@@ -28,6 +45,8 @@ class FalkorDBTraceMemory(FalkorDBMemory, TraceMemory):
         username: str = "",
         password: str = "",
         wipe_on_start: bool = False,
+        batch_size: int = 1000,
+        pool: Optional[FalkorDBConnectionPool] = None,
         **kwargs
     ):
         super().__init__(
@@ -38,6 +57,8 @@ class FalkorDBTraceMemory(FalkorDBMemory, TraceMemory):
             username=username,
             password=password,
             wipe_on_start=wipe_on_start,
+            batch_size=batch_size,
+            pool=pool,
             **kwargs
         )
 
@@ -59,6 +80,8 @@ class FalkorDBTraceMemory(FalkorDBMemory, TraceMemory):
 
         This method updates existing agent steps or creates new ones if they don't exist.
         It handles both individual AgentStep objects and AgentStepList objects.
+        The agent steps and their NEXT relationships are written with batched
+        `UNWIND` queries of at most `batch_size` rows.
 
         Args:
             step_or_steps (Union[AgentStep, AgentStepList]): The agent step(s) to update or create.
@@ -66,6 +89,24 @@ class FalkorDBTraceMemory(FalkorDBMemory, TraceMemory):
         Raises:
             ValueError: If the input is neither an AgentStep nor an AgentStepList.
         """
+        for query, rows in self._update_queries(step_or_steps):
+            self._query_batches(query, rows)
+
+    async def aupdate(self, step_or_steps: Union[AgentStep, AgentStepList]) -> None:
+        """
+        Asynchronous version of `update`.
+
+        Args:
+            step_or_steps (Union[AgentStep, AgentStepList]): The agent step(s) to update or create.
+
+        Raises:
+            ValueError: If the input is neither an AgentStep nor an AgentStepList.
+        """
+        for query, rows in self._update_queries(step_or_steps):
+            await self._aquery_batches(query, rows)
+
+    def _update_queries(self, step_or_steps: Union[AgentStep, AgentStepList]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Build the batched queries of `update` as (query, rows) pairs"""
         if not isinstance(step_or_steps, (AgentStep, AgentStepList)):
             raise ValueError("Invalid datatype provided must be AgentStep or AgentStepList")
         if isinstance(step_or_steps, AgentStep):
@@ -73,11 +114,11 @@ class FalkorDBTraceMemory(FalkorDBMemory, TraceMemory):
             steps.steps = [step_or_steps]
         else:
             steps = step_or_steps
+        rows = []
         for step in steps.steps:
-            step_id = str(step.id)
             if step.vector is not None:
-                params = {
-                    "id": step_id,
+                rows.append({
+                    "id": str(step.id),
                     "parent_id": str(step.parent_id) if step.parent_id else None,
                     "hop": step.hop,
                     "step_type": step.step_type.value,
@@ -86,31 +127,28 @@ class FalkorDBTraceMemory(FalkorDBMemory, TraceMemory):
                     "vector": list(step.vector) if step.vector is not None else None,
                     "metadata": json.dumps(step.metadata),
                     "created_at": step.created_at.strftime(DATETIME_FORMAT),
-                }
-                self._graph.query(
-                    " ".join([
-                    "MERGE (s:AgentStep {id: $id})",
-                    "SET",
-                    "s.parent_id=$parent_id,",
-                    "s.hop=$hop,",
-                    "s.step_type=$step_type,",
-                    "s.inputs=$inputs,",
-                    "s.outputs=$outputs,",
-                    "s.vector=vecf32($vector),",
-                    "s.metadata=$metadata,",
-                    "s.created_at=$created_at"]),
-                    params = params,
-                )
-            if step.parent_id is not None:
-                parent_id = str(step.parent_id)
-                params = {
-                    "id": step_id,
-                    "parent_id": parent_id,
-                }
-                self._graph.query(
-                    "MATCH (child:AgentStep {id: $id}), (parent:AgentStep {id: $parent_id}) MERGE (parent)-[:NEXT]->(child)",
-                    params = params,
-                )
+                })
+        return [(
+            " ".join([
+            "UNWIND $rows AS row",
+            "MERGE (s:AgentStep {id: row.id})",
+            "SET",
+            "s.parent_id=row.parent_id,",
+            "s.hop=row.hop,",
+            "s.step_type=row.step_type,",
+            "s.inputs=row.inputs,",
+            "s.outputs=row.outputs,",
+            "s.vector=vecf32(row.vector),",
+            "s.metadata=row.metadata,",
+            "s.created_at=row.created_at"]),
+            rows,
+        ), (
+            " ".join([
+            "UNWIND $rows AS row",
+            "MATCH (child:AgentStep {id: row.id}), (parent:AgentStep {id: row.parent_id})",
+            "MERGE (parent)-[:NEXT]->(child)"]),
+            [{"id": str(step.id), "parent_id": str(step.parent_id)} for step in steps.steps if step.parent_id is not None],
+        )]
 
     def get(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> AgentStepList:
         """
@@ -126,32 +164,61 @@ class FalkorDBTraceMemory(FalkorDBMemory, TraceMemory):
         Returns:
             AgentStepList: A list of AgentStep objects matching the given ID(s).
         """
-        ids = [str(id_or_ids)] if isinstance(id_or_ids, (UUID, str)) else [str(id) for id in id_or_ids]
-        result = self._graph.query(
-            " ".join(
-                [
-                    "MATCH (s:AgentStep)",
-                    "WHERE s.id IN $ids",
-                    "RETURN",
-                    "s.id as id,",
-                    "s.step_type as step_type,",
-                    "s.parent_id as parent_id,",
-                    "s.vector as vector,",
-                    "s.name as name,",
-                    "s.description as description",
-                ]
-            ),
-            params={"ids": ids}
+        ids = self._ids(id_or_ids)
+        result = self._graph.query(GET_STEPS_QUERY, params={"ids": ids})
+        return self._to_steps(ids, result.result_set)
+
+    async def aget(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> AgentStepList:
+        """
+        Asynchronous version of `get`.
+
+        Args:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): The ID(s) of the agent step(s) to retrieve.
+
+        Returns:
+            AgentStepList: A list of AgentStep objects matching the given ID(s).
+        """
+        ids = self._ids(id_or_ids)
+        result = await self.get_async_graph().query(GET_STEPS_QUERY, params={"ids": ids})
+        return self._to_steps(ids, result.result_set)
+
+    def _to_steps(self, ids: List[str], rows: List[List[Any]]) -> AgentStepList:
+        """Build the agent steps from the rows of `GET_STEPS_QUERY`, in the order of the given ids"""
+        steps = {row[0]: self._to_step(row) for row in rows}
+        step_list = AgentStepList()
+        step_list.steps = [steps[step_id] for step_id in ids if step_id in steps]
+        return step_list
+
+    def _to_step(self, row: List[Any]) -> AgentStep:
+        """
+        Build an agent step from a row of the properties returned by `STEP_PROPERTIES`.
+
+        Args:
+            row (List[Any]): The row (id, parent_id, hop, step_type, inputs, outputs, vector, metadata, created_at).
+
+        Returns:
+            AgentStep: The corresponding agent step.
+        """
+        step_id, parent_id, hop, step_type, inputs, outputs, vector, metadata, created_at = row[:9]
+        try:
+            step_id = UUID(step_id)
+        except Exception:
+            pass
+        if parent_id is not None:
+            try:
+                parent_id = UUID(parent_id)
+            except Exception:
+                pass
+        step = AgentStep(
+            id=step_id,
+            parent_id=parent_id,
+            hop=hop if hop is not None else 0,
+            step_type=AgentStepType(step_type),
+            inputs=json.loads(inputs) if inputs else None,
+            outputs=json.loads(outputs) if outputs else None,
+            vector=vector,
+            metadata=json.loads(metadata) if metadata else None,
         )
-        steps = AgentStepList()
-        for row in result.result_set:
-            step = AgentStep(
-                id=UUID(row[0]),
-                step_type=AgentStepType(row[1]),
-                parent_id=UUID(row[2]) if row[2] is not None else None,
-                vector=row[3],
-                name=row[4],
-                description=row[5]
-            )
-            steps.steps.append(step)
-        return steps
\ No newline at end of file
+        if created_at:
+            step.created_at = datetime.strptime(created_at, DATETIME_FORMAT)
+        return step
\ No newline at end of file
@@ -2,10 +2,14 @@ from .local_document_memory import LocalDocumentMemory
 from .local_fact_memory import LocalFactMemory
 from .local_program_memory import LocalProgramMemory
 from .local_trace_memory import LocalTraceMemory
+from .vector_index import VectorIndex
+from .embedding_store import EmbeddingStore
 
 __all__ = [
     LocalDocumentMemory,
     LocalFactMemory,
     LocalProgramMemory,
     LocalTraceMemory,
+    VectorIndex,
+    EmbeddingStore,
 ]
\ No newline at end of file
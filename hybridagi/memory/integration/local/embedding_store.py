@@ -0,0 +1,193 @@
+import os
+import json
+import numpy as np
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+class EmbeddingStore(MutableMapping):
+    """
+    A dictionary of embeddings stored into one contiguous matrix.
+
+    The vectors are stored as the rows of a growable float32 (or float16) matrix,
+    the store maps the IDs to their rows and keeps the ID of each row. Removed
+    vectors are tombstoned and the matrix is compacted once the tombstones exceed
+    `compaction_ratio` of its rows, so iterating over the live vectors stays cheap.
+
+    Note that FAISS keeps its own copy of the vectors it indexes, so a vector held
+    by a store and indexed by a flat (or HNSW) index is resident twice. The memory
+    saved by a store is its own: float16 halves it and a memory-mapped store only
+    costs the pages actually read, while a quantized index shrinks the FAISS side.
+
+    Attributes:
+        dim (Optional[int]): The dimension of the vectors, set by the first vector added.
+        dtype (np.dtype): The type of the stored values, either float32 or float16.
+        compaction_ratio (float): The ratio of tombstones triggering a compaction.
+    """
+    def __init__(
+            self,
+            dim: Optional[int] = None,
+            dtype: str = "float32",
+            capacity: int = 1024,
+            compaction_ratio: float = 0.25,
+        ):
+        """
+        Initialize the embedding store.
+
+        Parameters:
+            dim (Optional[int]): The dimension of the vectors. Defaults to the dimension of the first vector added.
+            dtype (str): The type of the stored values, either "float32" or "float16". Defaults to "float32".
+            capacity (int): The initial number of rows of the matrix. Defaults to 1024.
+            compaction_ratio (float): The ratio of tombstones triggering a compaction. Defaults to 0.25.
+
+        Raises:
+            ValueError: If the dtype is invalid.
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError("Invalid dtype provided, should be float32 or float16")
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.compaction_ratio = compaction_ratio
+        self._capacity = max(capacity, 1)
+        self._matrix: Optional[np.ndarray] = None
+        self._size = 0
+        self._rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._deleted = 0
+        if dim is not None:
+            self._matrix = np.empty((self._capacity, dim), dtype=self.dtype)
+
+    def _reserve(self, size: int):
+        """Make room for `size` rows, doubling the matrix when needed (and copying a read-only memory map)"""
+        if self._matrix is None:
+            self._matrix = np.empty((max(self._capacity, size), self.dim), dtype=self.dtype)
+        elif size > self._matrix.shape[0] or not self._matrix.flags.writeable:
+            capacity = self._matrix.shape[0]
+            while capacity < size:
+                capacity *= 2
+            matrix = np.empty((max(capacity, 1), self.dim), dtype=self.dtype)
+            matrix[:self._size] = self._matrix[:self._size]
+            self._matrix = matrix
+
+    def _prepare(self, vectors: Union[np.ndarray, Iterable[List[float]]]) -> np.ndarray:
+        """Convert the vectors into a 2D matrix, checking their dimension"""
+        vectors = np.array(vectors, dtype=self.dtype, ndmin=2)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Invalid vector dimension {vectors.shape[1]}, should be {self.dim}")
+        return vectors
+
+    def update_many(self, ids: List[str], vectors: Union[np.ndarray, Iterable[List[float]]]):
+        """
+        Add or replace several vectors at once.
+
+        Parameters:
+            ids (List[str]): The IDs of the vectors.
+            vectors (Union[np.ndarray, Iterable[List[float]]]): The vectors, one row per ID.
+        """
+        if len(ids) == 0:
+            return
+        vectors = self._prepare(vectors)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("The number of ids should match the number of vectors")
+        self._reserve(self._size + len(ids))
+        for key, vector in zip(ids, vectors):
+            row = self._rows.get(key)
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._rows[key] = row
+                self._ids.append(key)
+            self._matrix[row] = vector
+
+    def __setitem__(self, key: str, value: Union[np.ndarray, List[float]]):
+        self.update_many([key], [value])
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self._matrix[self._rows[key]]
+
+    def __delitem__(self, key: str):
+        row = self._rows.pop(key)
+        self._ids[row] = None
+        self._deleted += 1
+        if self._deleted > self.compaction_ratio * self._size:
+            self.compact()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self._ids if key is not None)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes used by the live vectors"""
+        return len(self) * (self.dim or 0) * self.dtype.itemsize
+
+    def compact(self):
+        """Remove the tombstoned rows, keeping the order of the live vectors"""
+        if self._deleted == 0:
+            return
+        alive = [row for row, key in enumerate(self._ids) if key is not None]
+        matrix = np.empty((max(len(alive), self._capacity), self.dim), dtype=self.dtype)
+        matrix[:len(alive)] = self._matrix[alive]
+        self._matrix = matrix
+        self._ids = [self._ids[row] for row in alive]
+        self._rows = {key: row for row, key in enumerate(self._ids)}
+        self._size = len(alive)
+        self._deleted = 0
+
+    def to_arrays(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Get the live IDs and vectors.
+
+        Returns:
+            Tuple[List[str], np.ndarray]: The IDs and the matrix of their vectors (a view without tombstones).
+        """
+        self.compact()
+        if self._matrix is None:
+            return [], np.empty((0, self.dim or 0), dtype=self.dtype)
+        return list(self._ids), self._matrix[:self._size]
+
+    def save(self, path: str):
+        """
+        Save the vectors into a contiguous `.npy` matrix and their IDs into a JSON file.
+
+        Parameters:
+            path (str): The path of the files without extension.
+        """
+        ids, matrix = self.to_arrays()
+        with open(path + ".npy.tmp", "wb") as f:
+            np.save(f, matrix)
+        os.replace(path + ".npy.tmp", path + ".npy")
+        with open(path + ".ids.json.tmp", "w") as f:
+            json.dump(ids, f)
+        os.replace(path + ".ids.json.tmp", path + ".ids.json")
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = "r") -> "EmbeddingStore":
+        """
+        Load the vectors saved with `save`.
+
+        The matrix is memory-mapped by default, it is copied in memory only when modified.
+
+        Parameters:
+            path (str): The path of the files without extension.
+            mmap_mode (Optional[str]): The memory map mode of the matrix, None to load it in memory. Defaults to "r".
+
+        Returns:
+            EmbeddingStore: The loaded embedding store.
+        """
+        matrix = np.load(path + ".npy", mmap_mode=mmap_mode)
+        with open(path + ".ids.json", "r") as f:
+            ids = json.load(f)
+        store = cls(dim=matrix.shape[1] if len(ids) > 0 else None, dtype=matrix.dtype.name)
+        if len(ids) > 0:
+            store._matrix = matrix
+            store._size = len(ids)
+            store._ids = ids
+            store._rows = {key: row for row, key in enumerate(ids)}
+        return store
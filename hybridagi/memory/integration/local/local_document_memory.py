@@ -1,11 +1,11 @@
 from typing import Union, List, Dict, Optional
 from uuid import UUID
-from collections import OrderedDict
 from hybridagi.memory.document_memory import DocumentMemory
 from hybridagi.core.datatypes import Document, DocumentList
 import networkx as nx
 
 from .local_memory import LocalMemory
+from .embedding_store import EmbeddingStore
 
 
 class LocalDocumentMemory(LocalMemory, DocumentMemory):
@@ -15,30 +15,37 @@ class LocalDocumentMemory(LocalMemory, DocumentMemory):
     Attributes:
         index_name (str): The name of the index used for document storage.
         wipe_on_start (bool):  Whether to clear the memory when the object is initialized.
+        embeddings_dtype (str): The type of the stored embeddings, either "float32" or "float16".
         _documents (Optional[Dict[str, Document]]): A dictionary to store documents.
             The keys are document IDs and the values are Document objects.
-        _embeddings (Optional[Dict[str, List[float]]]): An ordered dictionary to store document embeddings.
-            The keys are document IDs and the values are lists of floats representing the embeddings.
+        _embeddings (Optional[EmbeddingStore]): A contiguous matrix to store document embeddings.
+            The keys are document IDs and the values are float32 (or float16) vectors.
     """
     index_name: str
     wipe_on_start: bool
     _documents: Optional[Dict[str, Document]] = {}
-    _embeddings: Optional[Dict[str, List[float]]] = OrderedDict()
+    _embeddings: Optional[EmbeddingStore] = EmbeddingStore()
     _graph = nx.DiGraph()
+    _records_attributes = ("_documents",)
+    _vectors_attributes = ("_embeddings",)
     
     def __init__(
             self,
             index_name: str,
             wipe_on_start: bool = True,
+            embeddings_dtype: str = "float32",
         ):
         """
         Initialize the local document memory.
 
         Parameters:
             wipe_on_start (bool): Whether to clear the memory when the object is initialized.
+            embeddings_dtype (str): The type of the stored embeddings, "float32" or "float16" to halve their memory. Defaults to "float32".
         """
         self.index_name = index_name
         self.wipe_on_start = wipe_on_start
+        self.embeddings_dtype = embeddings_dtype
+        self._vector_indexes = {}
         if wipe_on_start:
             self.clear()
             
@@ -67,6 +74,7 @@ class LocalDocumentMemory(LocalMemory, DocumentMemory):
             documents.docs = [doc_or_docs]
         else:
             documents = doc_or_docs
+        indexed_ids, indexed_vectors = [], []
         for doc in documents.docs:
             doc_id = str(doc.id)
             if not self.exist(doc_id):
@@ -81,6 +89,9 @@ class LocalDocumentMemory(LocalMemory, DocumentMemory):
             self._documents[doc_id] = doc
             if doc.vector is not None:
                 self._embeddings[doc_id] = doc.vector
+                indexed_ids.append(doc_id)
+                indexed_vectors.append(doc.vector)
+        self._index_vectors("_embeddings", indexed_ids, indexed_vectors)
             
     def remove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
         """
@@ -93,12 +104,15 @@ class LocalDocumentMemory(LocalMemory, DocumentMemory):
             documents_ids = [id_or_ids]
         else:
             documents_ids = id_or_ids
+        unindexed_ids = []
         for doc_id in documents_ids:
             doc_id = str(doc_id)
             if doc_id in self._documents:
                 del self._documents[doc_id]
             if doc_id in self._embeddings:
                 del self._embeddings[doc_id]
+                unindexed_ids.append(doc_id)
+        self._unindex_vectors("_embeddings", unindexed_ids)
                 
     def get(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> DocumentList:
         """
@@ -152,5 +166,6 @@ class LocalDocumentMemory(LocalMemory, DocumentMemory):
         This method removes all documents, graph, and embeddings from the memory.
         """
         self._documents = {}
-        self._embeddings = {}
-        self._graph = nx.DiGraph()
+        self._embeddings = EmbeddingStore(dtype=self.embeddings_dtype)
+        self._vector_indexes = {}
+        self._graph = nx.DiGraph()
\ No newline at end of file
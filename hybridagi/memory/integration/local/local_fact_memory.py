@@ -1,4 +1,3 @@
-from collections import OrderedDict
 from typing import Union, List, Dict, Optional
 from uuid import UUID
 from hybridagi.memory.fact_memory import FactMemory
@@ -8,6 +7,7 @@ import networkx as nx
 import random
 
 from .local_memory import LocalMemory
+from .embedding_store import EmbeddingStore
 
 
 def random_color():
@@ -22,12 +22,13 @@ class LocalFactMemory(LocalMemory, FactMemory):
     Attributes:
         index_name (str): The name of the index used for fact storage.
         wipe_on_start (bool): Whether to clear the memory when the object is initialized.
+        embeddings_dtype (str): The type of the stored embeddings, either "float32" or "float16".
         _entities (Optional[Dict[str, Entity]]): A dictionary to store entities. The keys are entity IDs and the values are Entity objects.
         _relationships (Optional[Dict[str, Entity]]): A dictionary to store entities. The keys are relationships IDs and the values are Relationship objects.
         _facts (Optional[Dict[str, Fact]]): A dictionary to store facts. The keys are fact IDs and the values are Fact objects.
-        _entities_embeddings (Optional[Dict[str, List[float]]]): An ordered dictionary to store entity embeddings. The keys are entity IDs and the values are lists of floats representing the embeddings.
-        _relationships_embeddings (Optional[Dict[str, List[float]]]): An ordered dictionary to store relationships embeddings. The keys are relationships IDs and the values are lists of floats representing the embeddings.
-        _facts_embeddings (Optional[Dict[str, List[float]]]): An ordered dictionary to store fact embeddings. The keys are fact IDs and the values are lists of floats representing the embeddings.
+        _entities_embeddings (Optional[EmbeddingStore]): A contiguous matrix to store entity embeddings. The keys are entity IDs and the values are float32 (or float16) vectors.
+        _relationships_embeddings (Optional[EmbeddingStore]): A contiguous matrix to store relationships embeddings. The keys are relationships IDs and the values are float32 (or float16) vectors.
+        _facts_embeddings (Optional[EmbeddingStore]): A contiguous matrix to store fact embeddings. The keys are fact IDs and the values are float32 (or float16) vectors.
         _graph (nx.MultiDiGraph): A directed multigraph to store the relationships between entities.
         _labels_colors (Optional[Dict[str, str]]): A dictionary to store the colors associated with each label. The keys are labels and the values are colors.
     """
@@ -37,18 +38,23 @@ class LocalFactMemory(LocalMemory, FactMemory):
     _relationships: Optional[Dict[str, Fact]] = {}
     _facts: Optional[Dict[str, Fact]] = {}
     
-    _entities_embeddings: Optional[Dict[str, List[float]]] = OrderedDict()
-    _relationships_embeddings: Optional[Dict[str, List[float]]] = OrderedDict()
-    _facts_embeddings: Optional[Dict[str, List[float]]] = OrderedDict()
+    _entities_embeddings: Optional[EmbeddingStore] = EmbeddingStore()
+    _relationships_embeddings: Optional[EmbeddingStore] = EmbeddingStore()
+    _facts_embeddings: Optional[EmbeddingStore] = EmbeddingStore()
     
     _graph = nx.MultiDiGraph()
     
     _labels_colors: Optional[Dict[str, str]] = {}
     
+    _records_attributes = ("_entities", "_facts")
+    _vectors_attributes = ("_entities_embeddings", "_facts_embeddings")
+    _state_attributes = ("_graph", "_labels_colors")
+    
     def __init__(
             self,
             index_name: str,
             wipe_on_start: bool=True,
+            embeddings_dtype: str = "float32",
         ):
         """
         Initialize the local fact memory.
@@ -56,8 +62,11 @@ class LocalFactMemory(LocalMemory, FactMemory):
         Parameters:
             index_name (str): The name of the index used for fact storage.
             wipe_on_start (bool): Whether to clear the memory when the object is initialized.
+            embeddings_dtype (str): The type of the stored embeddings, "float32" or "float16" to halve their memory. Defaults to "float32".
         """
         self.index_name = index_name
+        self.embeddings_dtype = embeddings_dtype
+        self._vector_indexes = {}
         if wipe_on_start:
             self.clear()
             
@@ -82,6 +91,7 @@ class LocalFactMemory(LocalMemory, FactMemory):
                 entities.entities = [entities_or_facts]
             else:
                 entities = entities_or_facts
+            indexed_ids, indexed_vectors = [], []
             for ent in entities.entities:
                 ent_id = str(ent.id)
                 if ent_id not in self._entities:
@@ -97,12 +107,16 @@ class LocalFactMemory(LocalMemory, FactMemory):
                     self._graph.node(ent_id)["title"] = ent.label+"("+ent.description+")" if ent.description else ent.label+"("+ent.name+")"
                 if ent.vector is not None:
                     self._entities_embeddings[ent_id] = ent.vector
+                    indexed_ids.append(ent_id)
+                    indexed_vectors.append(ent.vector)
+            self._index_vectors("_entities_embeddings", indexed_ids, indexed_vectors)
         else:
             if isinstance(entities_or_facts, Fact):
                 facts = FactList()
                 facts.facts = [entities_or_facts]
             else:
                 facts = entities_or_facts
+            indexed_ids, indexed_vectors = [], []
             for fact in facts.facts:
                 fact_id = str(fact.id)
                 if fact_id not in self._facts:
@@ -128,6 +142,9 @@ class LocalFactMemory(LocalMemory, FactMemory):
                     self._graph.add_edge(subject_id, object_id, key=fact.rel.name, label=fact.rel.name)
                 if fact.vector is not None:
                     self._facts_embeddings[fact_id] = fact.vector
+                    indexed_ids.append(fact_id)
+                    indexed_vectors.append(fact.vector)
+            self._index_vectors("_facts_embeddings", indexed_ids, indexed_vectors)
     
     def remove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
         """
@@ -150,11 +167,13 @@ class LocalFactMemory(LocalMemory, FactMemory):
                 del self._facts[fact_or_entity_id]
                 if fact_or_entity_id in self._facts_embeddings:
                     del self._facts_embeddings[fact_or_entity_id]
+                    self._unindex_vectors("_facts_embeddings", [fact_or_entity_id])
             elif fact_or_entity_id in self._entities:
                 self._graph.remove_node([fact_or_entity_id])
                 del self._entities[fact_or_entity_id]
                 if fact_or_entity_id in self._entities_embeddings:
                     del self._entities_embeddings[fact_or_entity_id]
+                    self._unindex_vectors("_entities_embeddings", [fact_or_entity_id])
 
     def get_entities(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> EntityList:
         """
@@ -208,6 +227,7 @@ class LocalFactMemory(LocalMemory, FactMemory):
         self._entities = {}
         self._facts = {}
         self._graph = nx.MultiDiGraph()
-        self._entities_embeddings = OrderedDict()
-        self._facts_embeddings = OrderedDict()
+        self._entities_embeddings = EmbeddingStore(dtype=self.embeddings_dtype)
+        self._facts_embeddings = EmbeddingStore(dtype=self.embeddings_dtype)
+        self._vector_indexes = {}
         self._labels_colors = {}
@@ -1,5 +1,15 @@
+import os
+import json
+import pickle
+import hashlib
+import numpy as np
 from urllib.parse import quote
 from uuid import uuid4
+from typing import Any, Dict, List, Optional, Tuple
+
+from .vector_index import VectorIndex, EmbeddingsDistance
+from .storage import RecordStore, save_records
+from .embedding_store import EmbeddingStore
 
 
 def isolate(html_code: str) -> str:
@@ -22,7 +32,191 @@ def isolate(html_code: str) -> str:
     """.format(content=content)
 
 
-class LocalMemory:       
+class LocalMemory:
+    """
+    The base class for the local memories.
+
+    Attributes:
+        embeddings_dtype (str): The type of the stored embeddings, either "float32" or "float16".
+        _vector_indexes (Dict[Tuple[str, str, str, Tuple], VectorIndex]): The vector indexes kept in sync with the embeddings.
+            The keys are (embeddings attribute, distance, index type, index parameters) and the values are the indexes.
+            Set per instance by the subclasses, so the memories never share their indexes.
+        _records_attributes (Tuple[str, ...]): The records dictionaries saved into append-only record files.
+        _vectors_attributes (Tuple[str, ...]): The embedding stores saved into memory-mapped float32 matrices.
+        _state_attributes (Tuple[str, ...]): The other attributes (graph...) saved with pickle.
+    """
+    embeddings_dtype: str = "float32"
+    _vector_indexes: Dict[Tuple[str, str, str, Tuple], VectorIndex]
+    _records_attributes: Tuple[str, ...] = ()
+    _vectors_attributes: Tuple[str, ...] = ()
+    _state_attributes: Tuple[str, ...] = ("_graph",)
+
+    def get_vector_index(
+            self,
+            embeddings: str,
+            distance: str,
+            dim: int,
+            index_type: str = "flat",
+            index_params: Optional[Dict[str, Any]] = None,
+        ) -> VectorIndex:
+        """
+        Get the vector index used to search the given embeddings.
+
+        The index is built once from the stored embeddings, then kept in sync
+        by the memory updates and removals, so searching it never requires a rebuild.
+        The index holds its own (possibly quantized) copy of the vectors next to the
+        stored embeddings, create the memory with `embeddings_dtype="float16"` so that
+        the quantized index types actually reduce the memory footprint.
+
+        Parameters:
+            embeddings (str): The name of the embeddings attribute to index (e.g. "_embeddings").
+            distance (str): The distance metric of the index, should be either "cosine" or "euclidean".
+            dim (int): The dimension of the embeddings.
+            index_type (str): The type of index to use, either "flat", "hnsw", "ivf_flat", "ivf_pq",
+                or one of the quantized "sq_fp16", "sq_int8" and "binary". Defaults to "flat".
+            index_params (Optional[Dict[str, Any]]): The parameters of the index (e.g. nlist, M, train_size, rerank_factor). Defaults to None.
+
+        Returns:
+            VectorIndex: The vector index of the embeddings.
+        """
+        index_params = dict(index_params) if index_params else {}
+        key = (embeddings, EmbeddingsDistance(distance).value, index_type, tuple(sorted(index_params.items())))
+        if key not in self._vector_indexes:
+            train_size = index_params.pop("train_size", None)
+            rerank_factor = index_params.pop("rerank_factor", 10)
+            index = VectorIndex(
+                dim=dim,
+                distance=distance,
+                index_type=index_type,
+                index_params=index_params,
+                train_size=train_size,
+                rerank_factor=rerank_factor,
+            )
+            ids, vectors = getattr(self, embeddings).to_arrays()
+            if len(ids) > 0:
+                index.add(ids, vectors)
+            self._vector_indexes[key] = index
+        # The binary indexes re-rank their candidates with the stored embeddings
+        self._vector_indexes[key].rerank_store = getattr(self, embeddings)
+        return self._vector_indexes[key]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes held in memory by the embeddings and the vector indexes.
+
+        The memory-mapped embeddings (after `load`) are not counted, their pages are
+        owned by the OS page cache. With float16 embeddings and a quantized index
+        ("sq_fp16", "sq_int8" or "binary"), the footprint is half of float32 embeddings
+        with a "flat" index or less.
+        """
+        total = 0
+        for attribute in self._vectors_attributes:
+            store = getattr(self, attribute)
+            if not isinstance(store._matrix, np.memmap):
+                total += store.nbytes
+        return total + sum(index.nbytes for index in self._vector_indexes.values())
+
+    def _index_vectors(self, embeddings: str, ids: List[str], vectors: List[List[float]]):
+        """Add (or replace) vectors in the indexes of the given embeddings"""
+        if not ids:
+            return
+        for key, index in self._vector_indexes.items():
+            if key[0] == embeddings:
+                index.add(ids, vectors)
+
+    def _unindex_vectors(self, embeddings: str, ids: List[str]):
+        """Remove vectors from the indexes of the given embeddings"""
+        if not ids:
+            return
+        for key, index in self._vector_indexes.items():
+            if key[0] == embeddings:
+                index.remove(ids)
+
+    def save(self, path: str):
+        """
+        Save the local memory into a directory.
+
+        The records are written into append-only record files with an offset index,
+        the embeddings into contiguous `.npy` matrices, the approximate and quantized
+        vector indexes into FAISS files and the graph is pickled. The flat indexes are
+        not saved, they are rebuilt from the embeddings on first use. Saving again into
+        the directory the memory was loaded from only appends the new and updated records.
+
+        Parameters:
+            path (str): The directory where to save the memory.
+        """
+        os.makedirs(path, exist_ok=True)
+        for attribute in self._records_attributes:
+            save_records(getattr(self, attribute), os.path.join(path, attribute.strip("_")))
+        for attribute in self._vectors_attributes:
+            getattr(self, attribute).save(os.path.join(path, attribute.strip("_")))
+        state = {attribute: getattr(self, attribute) for attribute in self._state_attributes}
+        state["vector_indexes"] = self._save_vector_indexes(path)
+        with open(os.path.join(path, "state.pkl.tmp"), "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(os.path.join(path, "state.pkl.tmp"), os.path.join(path, "state.pkl"))
+        with open(os.path.join(path, "memory.json"), "w") as f:
+            json.dump({"type": type(self).__name__, "index_name": self.index_name}, f)
+        self._open_storage(path)
+
+    def load(self, path: str, mmap_mode: Optional[str] = "r"):
+        """
+        Load the local memory from a directory created by `save`.
+
+        Only the offset indexes are read, the records are unpickled on first access
+        and the embeddings and vector indexes are memory-mapped, so loading is almost
+        instant whatever the size of the memory, and the processes loading the same
+        directory share the vectors pages through the OS page cache.
+
+        Parameters:
+            path (str): The directory where the memory was saved.
+            mmap_mode (Optional[str]): The memory map mode of the embeddings, None to load them in memory. Defaults to "r".
+
+        Raises:
+            ValueError: If the directory does not contain a memory of the same type.
+        """
+        metadata_path = os.path.join(path, "memory.json")
+        if not os.path.exists(metadata_path):
+            raise ValueError(f"No memory saved at {path}")
+        with open(metadata_path, "r") as f:
+            metadata = json.load(f)
+        if metadata["type"] != type(self).__name__:
+            raise ValueError(f"Invalid memory type {metadata['type']}, should be {type(self).__name__}")
+        self._open_storage(path, mmap_mode=mmap_mode)
+        with open(os.path.join(path, "state.pkl"), "rb") as f:
+            state = pickle.load(f)
+        self._vector_indexes = {}
+        for key, name in state.pop("vector_indexes", []):
+            self._vector_indexes[key] = VectorIndex.load(os.path.join(path, name), mmap=mmap_mode is not None)
+        for attribute, value in state.items():
+            setattr(self, attribute, value)
+
+    def _save_vector_indexes(self, path: str) -> List[Tuple[Tuple[str, str, str, Tuple], str]]:
+        """Save the vector indexes that can not be rebuilt cheaply, removing the files of the previous ones"""
+        saved = []
+        for key, index in self._vector_indexes.items():
+            if index.index_type == "flat":
+                continue
+            name = "vector_index_" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+            index.save(os.path.join(path, name))
+            saved.append((key, name))
+        names = set(name for _, name in saved)
+        for filename in os.listdir(path):
+            if filename.startswith("vector_index_") and filename.split(".")[0] not in names:
+                os.remove(os.path.join(path, filename))
+        return saved
+
+    def _open_storage(self, path: str, mmap_mode: Optional[str] = "r"):
+        """Replace the records and embeddings by the ones saved into the given directory"""
+        for attribute in self._records_attributes:
+            previous = getattr(self, attribute, None)
+            setattr(self, attribute, RecordStore(os.path.join(path, attribute.strip("_"))))
+            if isinstance(previous, RecordStore):
+                previous.close()
+        for attribute in self._vectors_attributes:
+            setattr(self, attribute, EmbeddingStore.load(os.path.join(path, attribute.strip("_")), mmap_mode=mmap_mode))
+
     def show(self, notebook: bool = False, cdn_resources: str = 'in_line') -> None:
         """
         Visualize the local memory as a network graph.
@@ -1,12 +1,12 @@
 from typing import Union, List, Dict, Optional
 from uuid import UUID
-from collections import OrderedDict
 from hybridagi.memory.program_memory import ProgramMemory
 from hybridagi.core.graph_program import GraphProgram
 from hybridagi.core.datatypes import GraphProgramList
 import networkx as nx
 
 from .local_memory import LocalMemory
+from .embedding_store import EmbeddingStore
 
 class LocalProgramMemory(LocalMemory, ProgramMemory):
     """
@@ -15,20 +15,24 @@ class LocalProgramMemory(LocalMemory, ProgramMemory):
     Attributes:
         index_name (str): The name of the index used for program storage.
         wipe_on_start (bool): Whether to clear the memory when the object is initialized.
+        embeddings_dtype (str): The type of the stored embeddings, either "float32" or "float16".
         _programs (Optional[Dict[str, GraphProgram]]): A dictionary to store programs. The keys are program names and the values are GraphProgram objects.
-        _embeddings (Optional[Dict[str, List[float]]]): An ordered dictionary to store program embeddings. The keys are program names and the values are lists of floats representing the embeddings.
+        _embeddings (Optional[EmbeddingStore]): A contiguous matrix to store program embeddings. The keys are program names and the values are float32 (or float16) vectors.
         _graph (nx.DiGraph): A directed graph to store the dependencies between programs.
     """
     index_name: str
     wipe_on_start: bool
     _programs: Optional[Dict[str, GraphProgram]] = {}
-    _embeddings: Optional[Dict[str, List[float]]] = OrderedDict()
+    _embeddings: Optional[EmbeddingStore] = EmbeddingStore()
     _graph: nx.DiGraph()
+    _records_attributes = ("_programs",)
+    _vectors_attributes = ("_embeddings",)
     
     def __init__(
             self,
             index_name: str,
             wipe_on_start: bool=True,
+            embeddings_dtype: str = "float32",
         ):
         """
         Initialize the local program memory.
@@ -36,8 +40,11 @@ class LocalProgramMemory(LocalMemory, ProgramMemory):
         Parameters:
             index_name (str): The name of the index used for program storage.
             wipe_on_start (bool): Whether to clear the memory when the object is initialized.
+            embeddings_dtype (str): The type of the stored embeddings, "float32" or "float16" to halve their memory. Defaults to "float32".
         """
         self.index_name = index_name
+        self.embeddings_dtype = embeddings_dtype
+        self._vector_indexes = {}
         if wipe_on_start:
             self.clear()
             
@@ -61,6 +68,7 @@ class LocalProgramMemory(LocalMemory, ProgramMemory):
             programs.progs = [program_or_programs]
         else:
             programs = program_or_programs
+        indexed_ids, indexed_vectors = [], []
         for prog in programs.progs:
             prog_id = str(prog.name)
             if prog_id not in self._programs:
@@ -70,10 +78,14 @@ class LocalProgramMemory(LocalMemory, ProgramMemory):
             self._programs[prog_id] = prog
             if prog.vector is not None:
                 self._embeddings[prog_id] = prog.vector
+                indexed_ids.append(prog_id)
+                indexed_vectors.append(prog.vector)
             previous_edges = self._graph.out_edges(prog_id)
             self._graph.remove_edges_from(previous_edges)
             for dep in prog.dependencies:
                 self._graph.add_edge(prog_id, dep, label="DEPENDS_ON")
+        self._index_vectors("_embeddings", indexed_ids, indexed_vectors)
+        self._touch_programs([str(prog.name) for prog in programs.progs])
                 
     def remove(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> None:
         """
@@ -86,13 +98,17 @@ class LocalProgramMemory(LocalMemory, ProgramMemory):
             programs_ids = [id_or_ids]
         else:
             programs_ids = id_or_ids
+        unindexed_ids = []
         for prog_id in programs_ids:
             prog_id = str(prog_id)
             if prog_id in self._programs:
                 del self._programs[prog_id]
             if prog_id in self._embeddings:
                 del self._embeddings[prog_id]
+                unindexed_ids.append(prog_id)
             self._graph.remove_node(prog_id)
+        self._unindex_vectors("_embeddings", unindexed_ids)
+        self._touch_programs([str(prog_id) for prog_id in programs_ids])
                 
     def get(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> GraphProgramList:
         """
@@ -159,5 +175,18 @@ class LocalProgramMemory(LocalMemory, ProgramMemory):
         This method removes all programs, graph, and embeddings from the memory.
         """
         self._programs = {}
-        self._embeddings = {}
+        self._embeddings = EmbeddingStore(dtype=self.embeddings_dtype)
+        self._vector_indexes = {}
         self._graph = nx.DiGraph()
+        self._touch_programs()
+
+    def load(self, path: str, mmap_mode: Optional[str] = "r"):
+        """
+        Load the local program memory from a directory created by `save`.
+
+        Parameters:
+            path (str): The directory where the memory was saved.
+            mmap_mode (Optional[str]): The memory map mode of the embeddings, None to load them in memory. Defaults to "r".
+        """
+        super().load(path, mmap_mode=mmap_mode)
+        self._touch_programs()
@@ -1,11 +1,11 @@
 from typing import Union, List, Dict, Optional
 from uuid import UUID
-from collections import OrderedDict
 from hybridagi.memory.trace_memory import TraceMemory
 from hybridagi.core.datatypes import AgentStep, AgentStepList, AgentStepType
 import networkx as nx
 
 from .local_memory import LocalMemory
+from .embedding_store import EmbeddingStore
 
 class LocalTraceMemory(LocalMemory, TraceMemory):
     """
@@ -14,20 +14,24 @@ class LocalTraceMemory(LocalMemory, TraceMemory):
     Attributes:
         index_name (str): The name of the index used for trace storage.
         wipe_on_start (bool): Whether to clear the memory when the object is initialized.
+        embeddings_dtype (str): The type of the stored embeddings, either "float32" or "float16".
         _steps (Optional[Dict[str, AgentStep]]): A dictionary to store agent steps. The keys are step IDs and the values are AgentStep objects.
-        _embeddings (Optional[Dict[str, List[float]]]): An ordered dictionary to store step embeddings. The keys are step IDs and the values are lists of floats representing the embeddings.
+        _embeddings (Optional[EmbeddingStore]): A contiguous matrix to store step embeddings. The keys are step IDs and the values are float32 (or float16) vectors.
         _graph (nx.DiGraph): A directed graph to store the relationships between steps.
     """
     index_name: str
     wipe_on_start: bool
     _steps: Optional[Dict[str, AgentStep]] = {}
-    _embeddings: Optional[Dict[str, List[float]]] = OrderedDict()
+    _embeddings: Optional[EmbeddingStore] = EmbeddingStore()
     _graph: nx.DiGraph()
+    _records_attributes = ("_steps",)
+    _vectors_attributes = ("_embeddings",)
     
     def __init__(
             self,
             index_name: str,
             wipe_on_start: bool = True,
+            embeddings_dtype: str = "float32",
         ):
         """
         Initialize the local trace memory.
@@ -35,9 +39,12 @@ class LocalTraceMemory(LocalMemory, TraceMemory):
         Parameters:
             index_name (str): The name of the index used for trace storage.
             wipe_on_start (bool): Whether to clear the memory when the object is initialized.
+            embeddings_dtype (str): The type of the stored embeddings, "float32" or "float16" to halve their memory. Defaults to "float32".
         """
         self.index_name = index_name
         self.wipe_on_start = wipe_on_start
+        self.embeddings_dtype = embeddings_dtype
+        self._vector_indexes = {}
         if wipe_on_start:
             self.clear()
             
@@ -61,6 +68,7 @@ class LocalTraceMemory(LocalMemory, TraceMemory):
             steps.steps = [step_or_steps]
         else:
             steps = step_or_steps
+        indexed_ids, indexed_vectors = [], []
         for step in steps.steps:
             step_id = str(step.id)
             if step.step_type == AgentStepType.Action:
@@ -81,6 +89,9 @@ class LocalTraceMemory(LocalMemory, TraceMemory):
             self._steps[step_id] = step
             if step.vector is not None:
                 self._embeddings[step_id] = step.vector
+                indexed_ids.append(step_id)
+                indexed_vectors.append(step.vector)
+        self._index_vectors("_embeddings", indexed_ids, indexed_vectors)
 
     def get(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> AgentStepList:
         """
@@ -109,5 +120,6 @@ class LocalTraceMemory(LocalMemory, TraceMemory):
         This method removes all steps, graph, and embeddings from the memory.
         """
         self._steps = {}
-        self._embeddings = OrderedDict()
+        self._embeddings = EmbeddingStore(dtype=self.embeddings_dtype)
+        self._vector_indexes = {}
         self._graph = nx.DiGraph()
@@ -0,0 +1,128 @@
+import os
+import json
+import mmap
+import pickle
+import numpy as np
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Set
+
+def _write_json(path: str, data: Any):
+    """Write a JSON file atomically"""
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+def _write_npy(path: str, array: np.ndarray):
+    """Write a numpy file atomically (the previous file stays valid for its open memory maps)"""
+    with open(path + ".tmp", "wb") as f:
+        np.save(f, array)
+    os.replace(path + ".tmp", path)
+
+class RecordStore(MutableMapping):
+    """
+    A dictionary of records lazily loaded from an append-only record file.
+
+    The records are pickled one after the other into `<path>.records`,
+    the offset index `<path>.offsets.npy` gives the (offset, length) of each record
+    and `<path>.ids.json` the corresponding IDs. Loading the store only reads the
+    offset index, each record is unpickled (and cached) on first access.
+
+    Attributes:
+        path (str): The path of the record files without extension.
+    """
+    def __init__(self, path: str):
+        """
+        Open a record store saved with `save_records`.
+
+        Parameters:
+            path (str): The path of the record files without extension.
+        """
+        self.path = path
+        with open(path + ".ids.json", "r") as f:
+            ids = json.load(f)
+        self._offsets = np.load(path + ".offsets.npy")
+        self._rows: Dict[str, int] = {index: row for row, index in enumerate(ids)}
+        self._loaded: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+        self._file = open(path + ".records", "rb")
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = b""
+
+    def _read(self, row: int) -> Any:
+        """Unpickle the record at the given row of the offset index"""
+        offset, length = self._offsets[row]
+        return pickle.loads(self._data[offset:offset+length])
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._loaded:
+            return self._loaded[key]
+        if key not in self._rows:
+            raise KeyError(key)
+        record = self._read(self._rows[key])
+        self._loaded[key] = record
+        return record
+
+    def __setitem__(self, key: str, value: Any):
+        self._loaded[key] = value
+        self._dirty.add(key)
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._loaded.pop(key, None)
+        self._rows.pop(key, None)
+        self._dirty.discard(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows or key in self._loaded
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._rows
+        for key in self._loaded:
+            if key not in self._rows:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._rows) + sum(1 for key in self._loaded if key not in self._rows)
+
+    def close(self):
+        """Close the record file"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+def save_records(records: Dict[str, Any], path: str):
+    """
+    Save a dictionary of records into an append-only record file.
+
+    When the records come from a `RecordStore` opened at the same path,
+    only the new and updated records are appended to the record file.
+
+    Parameters:
+        records (Dict[str, Any]): The records to save.
+        path (str): The path of the record files without extension.
+    """
+    ids: List[str] = []
+    offsets: List[List[int]] = []
+    if isinstance(records, RecordStore) and records.path == path:
+        mode = "ab"
+        for key, row in records._rows.items():
+            if key not in records._dirty:
+                ids.append(key)
+                offsets.append(records._offsets[row].tolist())
+        pending = [key for key in records if key not in records._rows or key in records._dirty]
+    else:
+        mode = "wb"
+        pending = list(records.keys())
+    with open(path + ".records", mode) as f:
+        offset = f.seek(0, os.SEEK_END)
+        for key in pending:
+            data = pickle.dumps(records[key], protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(data)
+            ids.append(key)
+            offsets.append([offset, len(data)])
+            offset += len(data)
+    _write_npy(path + ".offsets.npy", np.array(offsets, dtype="int64").reshape(-1, 2))
+    _write_json(path + ".ids.json", ids)
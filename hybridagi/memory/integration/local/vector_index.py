@@ -0,0 +1,602 @@
+import os
+import json
+import time
+import faiss
+import numpy as np
+from enum import Enum
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union, Iterable
+
+class EmbeddingsDistance(str, Enum):
+    Cosine = "cosine"
+    Euclidean = "euclidean"
+
+def flat_quantizer(dim: int, metric: int) -> faiss.Index:
+    """Build an exhaustive search index without ID mapping"""
+    if metric == faiss.METRIC_INNER_PRODUCT:
+        return faiss.IndexFlatIP(dim)
+    return faiss.IndexFlatL2(dim)
+
+def flat_index(dim: int, metric: int) -> faiss.Index:
+    """Build an exhaustive search index"""
+    return faiss.IndexIDMap2(flat_quantizer(dim, metric))
+
+def hnsw_index(dim: int, metric: int, M: int = 32, ef_construction: int = 40) -> faiss.Index:
+    """Build a Hierarchical Navigable Small World graph index"""
+    index = faiss.IndexHNSWFlat(dim, M, metric)
+    index.hnsw.efConstruction = ef_construction
+    return faiss.IndexIDMap2(index)
+
+def ivf_flat_index(dim: int, metric: int, nlist: int = 256) -> faiss.Index:
+    """Build an inverted file index storing the full vectors"""
+    return faiss.IndexIVFFlat(flat_quantizer(dim, metric), dim, nlist, metric)
+
+def ivf_pq_index(dim: int, metric: int, nlist: int = 256, m: int = 8, nbits: int = 8) -> faiss.Index:
+    """Build an inverted file index storing product-quantized vectors"""
+    if dim % m != 0:
+        raise ValueError(f"The number of sub-quantizers m={m} should divide the vector dimension {dim}")
+    return faiss.IndexIVFPQ(flat_quantizer(dim, metric), dim, nlist, m, nbits, metric)
+
+def sq_fp16_index(dim: int, metric: int) -> faiss.Index:
+    """Build an exhaustive search index storing float16 vectors"""
+    return faiss.IndexIDMap2(faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, metric))
+
+def sq_int8_index(dim: int, metric: int) -> faiss.Index:
+    """Build an exhaustive search index storing int8 vectors, with a scale per dimension learned at training"""
+    return faiss.IndexIDMap2(faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, metric))
+
+def binary_index(dim: int, metric: int) -> faiss.IndexBinary:
+    """Build an exhaustive Hamming search index storing the sign bits of the vectors"""
+    return faiss.IndexBinaryIDMap2(faiss.IndexBinaryFlat(8 * ((dim + 7) // 8)))
+
+# The available index types, each one is a function building the FAISS index
+# from the vector dimension, the FAISS metric and the optional index parameters
+INDEX_TYPES: Dict[str, Callable[..., faiss.Index]] = {
+    "flat": flat_index,
+    "hnsw": hnsw_index,
+    "ivf_flat": ivf_flat_index,
+    "ivf_pq": ivf_pq_index,
+    "sq_fp16": sq_fp16_index,
+    "sq_int8": sq_int8_index,
+    "binary": binary_index,
+}
+
+# The ratio of deleted vectors after which the indexes that do not support
+# deletions (HNSW) are rebuilt from the remaining vectors
+REBUILD_RATIO = 0.25
+
+class VectorIndex:
+    """
+    An ID-mapped FAISS index shared by the local memories and the FAISS retrievers.
+
+    The index maps the memory IDs (documents, entities, facts, steps or programs)
+    to FAISS labels, so that it can be updated incrementally and searched
+    without rebuilding it or scanning the stored embeddings.
+
+    The approximate index types that need training (IVF) stage the incoming vectors
+    into an exact index until `train_size` vectors are available, then train on a
+    random sample of them. The index types that cannot delete vectors (HNSW) filter
+    out the removed IDs at search time and are rebuilt once too many are removed.
+
+    The IVF indexes visit `nprobe` inverted lists at search time, a quarter of
+    `nlist` (at most 64) by default.
+
+    The quantized index types store float16 ("sq_fp16"), int8 ("sq_int8", with a
+    scale per dimension) or binary codes ("binary", the sign bit of each dimension).
+    The binary index pre-filters `rerank_factor * k` candidates by Hamming distance,
+    then re-ranks them with the float vectors of `rerank_store` (usually the memory
+    embeddings), which it requires. The product-quantized index ("ivf_pq") re-ranks
+    its candidates the same way when a `rerank_store` is given.
+
+    Attributes:
+        dim (int): The dimension of the vectors.
+        distance (EmbeddingsDistance): The distance metric, either "cosine" or "euclidean".
+        index_type (str): The type of index to use, should be one of `INDEX_TYPES`.
+        index_params (Dict[str, Any]): The parameters given to the index builder (e.g. nlist, M).
+        train_size (int): The number of vectors needed to train the IVF indexes.
+        nprobe (Optional[int]): The number of inverted lists visited at search time (IVF only).
+        ef_search (Optional[int]): The size of the dynamic candidate list at search time (HNSW only).
+        rerank_factor (int): The number of candidates re-ranked per result (binary and ivf_pq only).
+        rerank_store (Optional[Mapping[str, np.ndarray]]): The float vectors used to re-rank the binary and ivf_pq candidates.
+    """
+    rerank_store: Optional[Mapping[str, np.ndarray]] = None
+
+    def __init__(
+            self,
+            dim: int,
+            distance: str = "cosine",
+            index_type: str = "flat",
+            index_params: Optional[Dict[str, Any]] = None,
+            train_size: Optional[int] = None,
+            nprobe: Optional[int] = None,
+            ef_search: Optional[int] = None,
+            rerank_factor: int = 10,
+        ):
+        """
+        Initialize the vector index.
+
+        Parameters:
+            dim (int): The dimension of the vectors.
+            distance (str): The distance metric, either "cosine" or "euclidean". Defaults to "cosine".
+            index_type (str): The type of index to use, should be one of `INDEX_TYPES`. Defaults to "flat".
+            index_params (Optional[Dict[str, Any]]): The parameters given to the index builder. Defaults to None.
+            train_size (Optional[int]): The number of vectors needed to train the IVF indexes.
+                Defaults to 40 vectors per inverted list.
+            nprobe (Optional[int]): The number of inverted lists visited at search time (IVF only).
+                Defaults to a quarter of the inverted lists, at most 64.
+            ef_search (Optional[int]): The size of the dynamic candidate list at search time (HNSW only). Defaults to None.
+            rerank_factor (int): The number of candidates re-ranked per result (binary and ivf_pq only). Defaults to 10.
+
+        Raises:
+            ValueError: If the distance or the index type is invalid.
+        """
+        if distance not in (EmbeddingsDistance.Cosine, EmbeddingsDistance.Euclidean):
+            raise ValueError("Invalid distance provided, should be cosine or euclidean")
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Invalid index type provided, should be one of {list(INDEX_TYPES.keys())}")
+        self.dim = dim
+        self.distance = EmbeddingsDistance(distance)
+        self.index_type = index_type
+        self.index_params = dict(index_params) if index_params else {}
+        if train_size is None:
+            if index_type == "sq_int8":
+                train_size = 1000
+            else:
+                train_size = 40 * self.index_params.get("nlist", 256)
+        self.train_size = train_size
+        if nprobe is None and index_type in ("ivf_flat", "ivf_pq"):
+            nprobe = min(max(self.index_params.get("nlist", 256) // 4, 1), 64)
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.rerank_factor = rerank_factor
+        self.clear()
+
+    @property
+    def metric(self) -> int:
+        """The FAISS metric corresponding to the distance"""
+        if self.distance == EmbeddingsDistance.Cosine:
+            return faiss.METRIC_INNER_PRODUCT
+        return faiss.METRIC_L2
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether the index is trained, the vectors are staged into an exact index until then"""
+        return self._index.is_trained
+
+    @property
+    def is_binary(self) -> bool:
+        """Whether the index stores binary codes searched by Hamming distance"""
+        return self.index_type == "binary"
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of the serialized index, an estimate of its memory footprint"""
+        if self.is_binary:
+            return len(faiss.serialize_index_binary(self._index))
+        return len(faiss.serialize_index(self._active_index()))
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, index: str) -> bool:
+        return str(index) in self._labels
+
+    def _prepare(self, vectors: Union[np.ndarray, Iterable[List[float]]]) -> np.ndarray:
+        """Convert the vectors into a contiguous float32 matrix (normalized for the cosine distance)"""
+        # The float32 matrices (e.g. from an EmbeddingStore) are only copied when normalized
+        array = np.ascontiguousarray(np.atleast_2d(np.asarray(vectors, dtype="float32")))
+        if array.shape[1] != self.dim:
+            raise ValueError(f"Invalid vector dimension {array.shape[1]}, should be {self.dim}")
+        if self.distance == EmbeddingsDistance.Cosine:
+            if isinstance(vectors, np.ndarray) and np.may_share_memory(array, vectors):
+                array = array.copy()
+            faiss.normalize_L2(array)
+        return array
+
+    def _to_codes(self, vectors: np.ndarray) -> np.ndarray:
+        """Convert the prepared vectors into binary codes (the sign bit of each dimension)"""
+        return np.packbits(vectors > 0, axis=1)
+
+    def _to_distances(self, scores: np.ndarray) -> np.ndarray:
+        """Convert the raw FAISS scores into distances (lower is closer)"""
+        if self.distance == EmbeddingsDistance.Cosine:
+            return 1.0 - scores
+        return np.sqrt(np.maximum(scores, 0.0))
+
+    def _active_index(self) -> faiss.Index:
+        """The index to search: the staging index until the main index is trained"""
+        return self._index if self.is_trained else self._staging
+
+    def add(self, ids: List[str], vectors: Union[np.ndarray, Iterable[List[float]]]):
+        """
+        Add vectors to the index, replacing the vectors of the already indexed IDs.
+
+        Parameters:
+            ids (List[str]): The IDs of the vectors.
+            vectors (Union[np.ndarray, Iterable[List[float]]]): The vectors to add, one row per ID.
+        """
+        self._ensure_writable()
+        ids = [str(i) for i in ids]
+        if len(ids) == 0:
+            return
+        vectors = self._prepare(vectors)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("The number of ids should match the number of vectors")
+        if len(set(ids)) != len(ids):
+            # Only keep the last vector of each duplicated ID
+            last = {index: row for row, index in enumerate(ids)}
+            rows = sorted(last.values())
+            ids = [ids[row] for row in rows]
+            vectors = vectors[rows]
+        self.remove([i for i in ids if i in self._labels])
+        labels = np.arange(self._next_label, self._next_label + len(ids), dtype="int64")
+        self._next_label += len(ids)
+        for index, label in zip(ids, labels.tolist()):
+            self._labels[index] = label
+            self._ids[label] = index
+        if self.is_binary:
+            self._index.add_with_ids(self._to_codes(vectors), labels)
+        else:
+            self._active_index().add_with_ids(vectors, labels)
+        if not self.is_trained and self._staging.ntotal >= self.train_size:
+            self.train()
+
+    def train(self):
+        """
+        Train the index on a random sample of the staged vectors and move them into it.
+        This is done automatically once `train_size` vectors are staged.
+        """
+        self._ensure_writable()
+        if self.is_trained:
+            return
+        labels, vectors = self._staged_vectors()
+        if len(labels) == 0:
+            raise ValueError("Cannot train the vector index without vectors")
+        if len(labels) > self.train_size:
+            sample = np.random.default_rng(0).choice(len(labels), self.train_size, replace=False)
+            self._index.train(vectors[sample])
+        else:
+            self._index.train(vectors)
+        self._index.add_with_ids(vectors, labels)
+        self._staging.reset()
+
+    def _staged_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the labels and vectors stored into the staging index"""
+        if self._staging.ntotal == 0:
+            return np.empty(0, dtype="int64"), np.empty((0, self.dim), dtype="float32")
+        labels = faiss.vector_to_array(self._staging.id_map)
+        vectors = self._staging.index.reconstruct_n(0, self._staging.ntotal)
+        return labels, vectors
+
+    def remove(self, ids: List[str]):
+        """
+        Remove vectors from the index, the unknown IDs are ignored.
+
+        Parameters:
+            ids (List[str]): The IDs of the vectors to remove.
+        """
+        labels = []
+        for index in ids:
+            label = self._labels.pop(str(index), None)
+            if label is not None:
+                del self._ids[label]
+                labels.append(label)
+        if not labels:
+            return
+        self._ensure_writable()
+        labels = np.array(labels, dtype="int64")
+        if not self.is_trained:
+            self._staging.remove_ids(labels)
+        elif self._supports_remove:
+            try:
+                self._index.remove_ids(labels)
+            except RuntimeError:
+                self._supports_remove = False
+        if self.is_trained and not self._supports_remove:
+            # The removed labels are filtered at search time until the next rebuild
+            self._deleted += len(labels)
+            if self._deleted > REBUILD_RATIO * self._index.ntotal:
+                self._rebuild()
+
+    def _rebuild(self):
+        """Rebuild the index from its remaining vectors, used by the indexes without deletions"""
+        labels = faiss.vector_to_array(self._index.id_map)
+        vectors = self._index.index.reconstruct_n(0, self._index.ntotal)
+        alive = np.array([label in self._ids for label in labels.tolist()], dtype=bool)
+        self._index = INDEX_TYPES[self.index_type](self.dim, self.metric, **self.index_params)
+        self._index.add_with_ids(vectors[alive], labels[alive])
+        self._deleted = 0
+
+    def _set_search_params(self, nprobe: Optional[int], ef_search: Optional[int]):
+        """Apply the search time parameters to the underlying FAISS index"""
+        index = self._active_index()
+        nprobe = nprobe if nprobe is not None else self.nprobe
+        ef_search = ef_search if ef_search is not None else self.ef_search
+        if nprobe is not None and isinstance(index, faiss.IndexIVF):
+            index.nprobe = nprobe
+        if ef_search is not None and isinstance(index, faiss.IndexIDMap2):
+            sub_index = faiss.downcast_index(index.index)
+            if isinstance(sub_index, faiss.IndexHNSW):
+                sub_index.hnsw.efSearch = ef_search
+
+    def search(
+            self,
+            query_vectors: Union[np.ndarray, Iterable[List[float]]],
+            k: int,
+            nprobe: Optional[int] = None,
+            ef_search: Optional[int] = None,
+            rerank_factor: Optional[int] = None,
+        ) -> List[List[Tuple[str, float]]]:
+        """
+        Search the k nearest neighbors of a batch of query vectors with a single FAISS call.
+
+        Parameters:
+            query_vectors (Union[np.ndarray, Iterable[List[float]]]): The query vectors, one row per query.
+            k (int): The number of nearest neighbors to retrieve per query.
+            nprobe (Optional[int]): Overrides the number of inverted lists visited (IVF only). Defaults to None.
+            ef_search (Optional[int]): Overrides the size of the candidate list (HNSW only). Defaults to None.
+            rerank_factor (Optional[int]): Overrides the number of candidates re-ranked per result (binary and ivf_pq only). Defaults to None.
+
+        Returns:
+            List[List[Tuple[str, float]]]: For each query, the (id, distance) pairs sorted by increasing distance.
+
+        Raises:
+            ValueError: If the index is binary and has no `rerank_store`.
+        """
+        query_vectors = self._prepare(query_vectors)
+        k = min(k, len(self))
+        if k <= 0:
+            return [[] for _ in range(query_vectors.shape[0])]
+        rerank_factor = max(rerank_factor or self.rerank_factor, 1)
+        if self.is_binary:
+            if self.rerank_store is None:
+                raise ValueError("The binary index needs a rerank store holding the float vectors to search")
+            return self._search_binary(query_vectors, k, rerank_factor)
+        index = self._active_index()
+        self._set_search_params(nprobe, ef_search)
+        rerank = self.index_type == "ivf_pq" and self.is_trained and self.rerank_store is not None
+        nb_candidates = k * rerank_factor if rerank else k
+        scores, labels = index.search(query_vectors, min(nb_candidates + self._deleted, index.ntotal))
+        distances = self._to_distances(scores)
+        results = []
+        for query_vector, row_distances, row_labels in zip(query_vectors, distances.tolist(), labels.tolist()):
+            candidates = [
+                (self._ids[label], distance)
+                for distance, label in zip(row_distances, row_labels) if label in self._ids
+            ][:nb_candidates]
+            results.append(self._rerank(query_vector, candidates, k) if rerank else candidates[:k])
+        return results
+
+    def _search_binary(self, query_vectors: np.ndarray, k: int, rerank_factor: int) -> List[List[Tuple[str, float]]]:
+        """Pre-filter the candidates by Hamming distance, then re-rank them with the float vectors"""
+        nb_candidates = min(k * rerank_factor + self._deleted, self._index.ntotal)
+        hamming, labels = self._index.search(self._to_codes(query_vectors), nb_candidates)
+        results = []
+        for query_vector, row_hamming, row_labels in zip(query_vectors, hamming.tolist(), labels.tolist()):
+            candidates = [(self._ids[label], h) for h, label in zip(row_hamming, row_labels) if label in self._ids]
+            results.append(self._rerank(query_vector, candidates, k))
+        return results
+
+    def _rerank(self, query_vector: np.ndarray, candidates: List[Tuple[str, float]], k: int) -> List[Tuple[str, float]]:
+        """Re-rank the candidates of a query with their float vectors from the rerank store"""
+        candidates = [(index, score) for index, score in candidates if index in self.rerank_store]
+        if len(candidates) == 0:
+            return []
+        vectors = self._prepare(np.stack([self.rerank_store[index] for index, _ in candidates]))
+        if self.distance == EmbeddingsDistance.Cosine:
+            distances = 1.0 - vectors @ query_vector
+        else:
+            distances = np.linalg.norm(vectors - query_vector, axis=1)
+        order = np.argsort(distances, kind="stable")[:k]
+        return [(candidates[row][0], float(distances[row])) for row in order.tolist()]
+
+    def save(self, path: str):
+        """
+        Save the index into a FAISS file and its metadata (parameters and IDs) into a JSON file.
+
+        Parameters:
+            path (str): The path of the files without extension.
+        """
+        files = [(self._index, path + ".faiss"), (self._staging, path + ".staging.faiss")]
+        for index, filename in files:
+            # Written aside then renamed, the processes mapping the previous file keep reading it
+            if isinstance(index, faiss.IndexBinary):
+                faiss.write_index_binary(index, filename + ".tmp")
+            else:
+                faiss.write_index(index, filename + ".tmp")
+            os.replace(filename + ".tmp", filename)
+        metadata = {
+            "dim": self.dim,
+            "distance": self.distance.value,
+            "index_type": self.index_type,
+            "index_params": self.index_params,
+            "train_size": self.train_size,
+            "nprobe": self.nprobe,
+            "ef_search": self.ef_search,
+            "rerank_factor": self.rerank_factor,
+            "supports_remove": self._supports_remove,
+            "labels": self._labels,
+            "next_label": self._next_label,
+            "deleted": self._deleted,
+        }
+        with open(path + ".json.tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(path + ".json.tmp", path + ".json")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorIndex":
+        """
+        Load an index saved with `save`.
+
+        The FAISS index is memory-mapped by default, so loading it does not read the
+        vectors and the processes loading the same file share its pages through the
+        OS page cache. It is read into memory on the first update.
+
+        Parameters:
+            path (str): The path of the files without extension.
+            mmap (bool): Whether to memory-map the FAISS index. Defaults to True.
+
+        Returns:
+            VectorIndex: The loaded index.
+        """
+        with open(path + ".json", "r") as f:
+            metadata = json.load(f)
+        index = cls(
+            dim=metadata["dim"],
+            distance=metadata["distance"],
+            index_type=metadata["index_type"],
+            index_params=metadata["index_params"],
+            train_size=metadata["train_size"],
+            nprobe=metadata["nprobe"],
+            ef_search=metadata["ef_search"],
+            rerank_factor=metadata["rerank_factor"],
+        )
+        index._supports_remove = metadata["supports_remove"]
+        index._labels = metadata["labels"]
+        index._ids = {label: i for i, label in index._labels.items()}
+        index._next_label = metadata["next_label"]
+        index._deleted = metadata["deleted"]
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) if mmap else 0
+        if index.is_binary:
+            index._index = faiss.read_index_binary(path + ".faiss", flags)
+        else:
+            index._index = faiss.read_index(path + ".faiss", flags)
+        index._staging = faiss.read_index(path + ".staging.faiss", flags)
+        index._mapped = mmap
+        return index
+
+    def _ensure_writable(self):
+        """Copy the memory-mapped FAISS indexes into memory before modifying them"""
+        if self._mapped:
+            if self.is_binary:
+                self._index = faiss.deserialize_index_binary(faiss.serialize_index_binary(self._index))
+            else:
+                self._index = faiss.deserialize_index(faiss.serialize_index(self._index))
+            self._staging = faiss.deserialize_index(faiss.serialize_index(self._staging))
+            self._mapped = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        self._ensure_writable()
+        state = self.__dict__.copy()
+        state.pop("rerank_store", None)
+        if self.is_binary:
+            state["_index"] = faiss.serialize_index_binary(self._index)
+        else:
+            state["_index"] = faiss.serialize_index(self._index)
+        state["_staging"] = faiss.serialize_index(self._staging)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        if state["index_type"] == "binary":
+            state["_index"] = faiss.deserialize_index_binary(state["_index"])
+        else:
+            state["_index"] = faiss.deserialize_index(state["_index"])
+        state["_staging"] = faiss.deserialize_index(state["_staging"])
+        state.setdefault("_mapped", False)
+        self.__dict__.update(state)
+
+    def clear(self):
+        """
+        Clear the vector index.
+        This method removes all vectors and IDs from the index (the index needs to be trained again).
+        """
+        self._index = INDEX_TYPES[self.index_type](self.dim, self.metric, **self.index_params)
+        self._staging = flat_index(self.dim, self.metric)
+        self._supports_remove = self.index_type != "hnsw"
+        self._labels: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._next_label = 0
+        self._deleted = 0
+        self._mapped = False
+
+class FusionMethod(str, Enum):
+    Distance = "distance"
+    RRF = "rrf"
+
+def merge_neighbors(
+        neighbors: List[List[Tuple[str, float]]],
+        k: int,
+        max_distance: float = float("inf"),
+        fusion: str = "distance",
+        rrf_k: int = 60,
+    ) -> List[str]:
+    """
+    Merge the nearest neighbors of several queries into a single ranking without duplicates.
+
+    Parameters:
+        neighbors (List[List[Tuple[str, float]]]): For each query, the (id, distance) pairs sorted by increasing distance.
+        k (int): The maximum number of IDs to return.
+        max_distance (float): The distance above which the neighbors are discarded. Defaults to infinity.
+        fusion (str): The merging method, either "distance" (keep the best distance of each ID)
+            or "rrf" (reciprocal rank fusion). Defaults to "distance".
+        rrf_k (int): The rank offset of the reciprocal rank fusion. Defaults to 60.
+
+    Returns:
+        List[str]: The merged IDs, the most relevant first.
+
+    Raises:
+        ValueError: If the fusion method is invalid.
+    """
+    if fusion not in (FusionMethod.Distance, FusionMethod.RRF):
+        raise ValueError("Invalid fusion provided, should be distance or rrf")
+    scores: Dict[str, float] = {}
+    for query_neighbors in neighbors:
+        rank = 0
+        for index, distance in query_neighbors:
+            if distance >= max_distance:
+                break
+            rank += 1
+            if fusion == FusionMethod.RRF:
+                scores[index] = scores.get(index, 0.0) - 1.0 / (rrf_k + rank)
+            elif index not in scores or distance < scores[index]:
+                scores[index] = distance
+    return sorted(scores, key=scores.get)[:k]
+
+def recall_report(
+        index: VectorIndex,
+        reference: VectorIndex,
+        query_vectors: Union[np.ndarray, Iterable[List[float]]],
+        k: int = 10,
+        search_params: Optional[List[Dict[str, int]]] = None,
+    ) -> List[Dict[str, Any]]:
+    """
+    Measure the recall, latency and memory footprint of an approximate or quantized index against an exact one.
+
+    Parameters:
+        index (VectorIndex): The approximate index to evaluate.
+        reference (VectorIndex): An exact ("flat") index containing the same vectors.
+        query_vectors (Union[np.ndarray, Iterable[List[float]]]): The query vectors, one row per query.
+        k (int): The number of nearest neighbors to retrieve per query. Defaults to 10.
+        search_params (Optional[List[Dict[str, int]]]): The search parameters to evaluate
+            (e.g. [{"nprobe": 1}, {"nprobe": 16}]). Defaults to the index parameters.
+
+    Returns:
+        List[Dict[str, Any]]: One row per search parameters with the recall@k,
+            the latency per query in milliseconds, the speedup against the reference
+            and the number of bytes per vector of both indexes.
+    """
+    query_vectors = np.array(query_vectors, dtype="float32", ndmin=2)
+    nb_queries = query_vectors.shape[0]
+    start = time.perf_counter()
+    expected = reference.search(query_vectors, k)
+    reference_latency = (time.perf_counter() - start) * 1000 / nb_queries
+    rows = []
+    for params in (search_params if search_params else [{}]):
+        start = time.perf_counter()
+        results = index.search(query_vectors, k, **params)
+        latency = (time.perf_counter() - start) * 1000 / nb_queries
+        found, total = 0, 0
+        for result, truth in zip(results, expected):
+            truth_ids = set(i for i, _ in truth)
+            found += len(truth_ids.intersection(i for i, _ in result))
+            total += len(truth_ids)
+        rows.append({
+            "index_type": index.index_type,
+            **params,
+            f"recall@{k}": found / total if total > 0 else 1.0,
+            "latency_ms": latency,
+            "flat_latency_ms": reference_latency,
+            "speedup": reference_latency / latency if latency > 0 else float("inf"),
+            "bytes_per_vector": index.nbytes / len(index) if len(index) > 0 else 0.0,
+            "flat_bytes_per_vector": reference.nbytes / len(reference) if len(reference) > 0 else 0.0,
+        })
+    return rows
@@ -0,0 +1,196 @@
+"""The program cache. Copyright (C) 2024 SynaLinks. License: GPL-3.0"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Union, List, Dict, Optional, Tuple, Hashable
+from uuid import UUID
+from hybridagi.core.graph_program import GraphProgram
+from hybridagi.core.datatypes import GraphProgramList
+from hybridagi.memory.program_memory import ProgramMemory
+
+class ProgramCache():
+    """
+    Read-through cache of the programs of a program memory.
+
+    Each cached program is stored with the version it was read at and the versions
+    are checked in one batched call (see `ProgramMemory.get_versions`) on each read,
+    so the entries are invalidated as soon as the program is updated or removed, or
+    the memory cleared. The memories shared between processes (e.g. FalkorDB) store
+    the versions, so the updates of the other processes are seen too, while the
+    versions of the other memories only change through this process.
+    The cached programs are shared between the agents and must not be modified
+    in place, use `ProgramMemory.update` instead.
+
+    Attributes:
+        program_memory (ProgramMemory): The program memory to read from.
+        max_size (int): The maximum number of cached programs.
+        hits (int): The number of programs found in the cache.
+        misses (int): The number of programs read from the program memory.
+    """
+    _shared = weakref.WeakKeyDictionary()
+    _shared_lock = threading.Lock()
+
+    def __init__(
+            self,
+            program_memory: ProgramMemory,
+            max_size: int = 1024,
+        ):
+        """
+        Initialize the program cache.
+
+        Parameters:
+            program_memory (ProgramMemory): The program memory to read from.
+            max_size (int): The maximum number of cached programs. Defaults to 1024.
+        """
+        if max_size < 1:
+            raise ValueError("Invalid max size provided, should be at least 1")
+        self.program_memory = program_memory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, program_memory: ProgramMemory) -> "ProgramCache":
+        """
+        Get the cache of the given program memory shared by all the agents of the process.
+
+        Parameters:
+            program_memory (ProgramMemory): The program memory to read from.
+
+        Returns:
+            ProgramCache: The shared cache of the program memory.
+        """
+        with cls._shared_lock:
+            cache = cls._shared.get(program_memory)
+            if cache is None:
+                cache = cls(program_memory)
+                cls._shared[program_memory] = cache
+            return cache
+
+    def _lookup(self, ids: List[str], versions: Dict[str, Hashable]) -> Tuple[Dict[str, GraphProgram], List[str]]:
+        """Get the cached programs of the given ids still at the given versions and the ids to read from the program memory"""
+        found, missing = {}, []
+        with self._lock:
+            for prog_id in ids:
+                entry = self._cache.get(prog_id)
+                if entry is not None and entry[0] == versions.get(prog_id):
+                    self._cache.move_to_end(prog_id)
+                    found[prog_id] = entry[1]
+                elif prog_id not in missing:
+                    missing.append(prog_id)
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def _remember(self, programs: List[GraphProgram], versions: Dict[str, Hashable]) -> Dict[str, GraphProgram]:
+        """
+        Cache the programs read from the program memory after the given versions.
+        A program updated in between is cached with its previous version, so it is read again next time.
+        """
+        result = {}
+        with self._lock:
+            for prog in programs:
+                prog_id = str(prog.name)
+                result[prog_id] = prog
+                if versions.get(prog_id) is not None:
+                    self._cache[prog_id] = (versions[prog_id], prog)
+                    self._cache.move_to_end(prog_id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _result(self, ids: List[str], programs: Dict[str, GraphProgram]) -> GraphProgramList:
+        result = GraphProgramList()
+        result.progs = [programs[prog_id] for prog_id in ids if prog_id in programs]
+        return result
+
+    def get(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> GraphProgramList:
+        """
+        Retrieve programs, only reading the ones missing or outdated in the cache from the program memory.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single program id or a list of program ids.
+
+        Returns:
+            GraphProgramList: A list of programs that match the input ids.
+        """
+        ids = [str(prog_id) for prog_id in (id_or_ids if isinstance(id_or_ids, list) else [id_or_ids])]
+        versions = self.program_memory.get_versions(list(dict.fromkeys(ids)))
+        programs, missing = self._lookup(ids, versions)
+        if len(missing) > 0:
+            programs.update(self._remember(self.program_memory.get(missing).progs, versions))
+        return self._result(ids, programs)
+
+    async def aget(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> GraphProgramList:
+        """
+        Asynchronous version of `get`.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single program id or a list of program ids.
+
+        Returns:
+            GraphProgramList: A list of programs that match the input ids.
+        """
+        ids = [str(prog_id) for prog_id in (id_or_ids if isinstance(id_or_ids, list) else [id_or_ids])]
+        versions = await self.program_memory.aget_versions(list(dict.fromkeys(ids)))
+        programs, missing = self._lookup(ids, versions)
+        if len(missing) > 0:
+            programs.update(self._remember((await self.program_memory.aget(missing)).progs, versions))
+        return self._result(ids, programs)
+
+    def preload(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> GraphProgramList:
+        """
+        Load the given programs and all the programs they depend on, reading one level of dependencies at a time.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single program id or a list of program ids.
+
+        Returns:
+            GraphProgramList: The loaded programs.
+        """
+        seen, programs = set(), []
+        level = [str(prog_id) for prog_id in (id_or_ids if isinstance(id_or_ids, list) else [id_or_ids])]
+        while len(level) > 0:
+            seen.update(level)
+            progs = self.get(level).progs
+            programs.extend(progs)
+            level = list(dict.fromkeys(dep for prog in progs for dep in prog.dependencies if dep not in seen))
+        return self._result([str(prog.name) for prog in programs], {str(prog.name): prog for prog in programs})
+
+    async def apreload(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> GraphProgramList:
+        """
+        Asynchronous version of `preload`.
+
+        Parameters:
+            id_or_ids (Union[UUID, str, List[Union[UUID, str]]]): A single program id or a list of program ids.
+
+        Returns:
+            GraphProgramList: The loaded programs.
+        """
+        seen, programs = set(), []
+        level = [str(prog_id) for prog_id in (id_or_ids if isinstance(id_or_ids, list) else [id_or_ids])]
+        while len(level) > 0:
+            seen.update(level)
+            progs = (await self.aget(level)).progs
+            programs.extend(progs)
+            level = list(dict.fromkeys(dep for prog in progs for dep in prog.dependencies if dep not in seen))
+        return self._result([str(prog.name) for prog in programs], {str(prog.name): prog for prog in programs})
+
+    def invalidate(self, id_or_ids: Optional[Union[UUID, str, List[Union[UUID, str]]]] = None):
+        """
+        Remove the given programs from the cache, or all the programs if None.
+
+        Useful when a program memory without stored versions is modified by another process.
+
+        Parameters:
+            id_or_ids (Optional[Union[UUID, str, List[Union[UUID, str]]]]): A single program id or a list of program ids. Defaults to None.
+        """
+        with self._lock:
+            if id_or_ids is None:
+                self._cache.clear()
+                return
+            for prog_id in (id_or_ids if isinstance(id_or_ids, list) else [id_or_ids]):
+                self._cache.pop(str(prog_id), None)
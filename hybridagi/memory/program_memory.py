@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Union, List
+from typing import Union, List, Dict, Optional, Tuple, Hashable
 from uuid import UUID
 from hybridagi.core.graph_program import GraphProgram
 from hybridagi.core.datatypes import GraphProgramList
 
 class ProgramMemory(ABC):
+    _program_versions: Optional[Dict[str, int]] = None
+    _memory_version: int = 0
     
     @abstractmethod
     def exist(self, prog_id: Union[UUID, str]) -> bool:
@@ -29,6 +31,10 @@ class ProgramMemory(ABC):
         raise NotImplementedError(
             f"ProgramMemory {type(self).__name__} is missing the required 'get' method."
         )
+
+    async def aget(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> GraphProgramList:
+        """Asynchronous version of `get`, the memories backed by a server should override it"""
+        return self.get(id_or_ids)
     
     @abstractmethod
     def get_dependencies(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> List[str]:
@@ -42,6 +48,39 @@ class ProgramMemory(ABC):
             f"ProgramMemory {type(self).__name__} is missing the required 'depends_on' method."
         )
         
+    def get_version(self, prog_id: Union[UUID, str]) -> Tuple[int, int]:
+        """
+        Returns the version of the given program in this process, changed each time
+        the program is updated or removed and each time the memory is cleared or loaded
+        """
+        versions = self._program_versions if self._program_versions is not None else {}
+        return (self._memory_version, versions.get(str(prog_id), 0))
+
+    def get_versions(self, ids: List[str]) -> Dict[str, Hashable]:
+        """
+        Returns the versions of the given programs, by default their versions in this
+        process (see `get_version`). The memories shared between processes override it
+        to read the versions they store, so the updates of the other processes are seen
+        """
+        return {prog_id: self.get_version(prog_id) for prog_id in ids}
+
+    async def aget_versions(self, ids: List[str]) -> Dict[str, Hashable]:
+        """Asynchronous version of `get_versions`, the memories backed by a server should override it"""
+        return self.get_versions(ids)
+
+    def _touch_programs(self, id_or_ids: Optional[Union[UUID, str, List[Union[UUID, str]]]] = None):
+        """
+        Changes the version of the given programs, or of the whole memory if None
+        """
+        if id_or_ids is None:
+            self._memory_version += 1
+            return
+        if self._program_versions is None:
+            self._program_versions = {}
+        for prog_id in (id_or_ids if isinstance(id_or_ids, list) else [id_or_ids]):
+            prog_id = str(prog_id)
+            self._program_versions[prog_id] = self._program_versions.get(prog_id, 0) + 1
+
     def is_protected(self, name: str) -> bool:
         """
         Returns True if the main program depends on the given program False otherwise
@@ -17,6 +17,10 @@ class TraceMemory(ABC):
             f"TraceMemory {type(self).__name__} is missing the required 'update' method."
         )
 
+    async def aupdate(self, step_or_steps: Union[AgentStep, AgentStepList]) -> None:
+        """Asynchronous version of `update`, the memories backed by a server should override it"""
+        self.update(step_or_steps)
+
     @abstractmethod
     def get(self, id_or_ids: Union[UUID, str, List[Union[UUID, str]]]) -> AgentStepList:
         raise NotImplementedError(
@@ -0,0 +1,219 @@
+"""The background trace writer. Copyright (C) 2024 SynaLinks. License: GPL-3.0"""
+
+import queue
+import atexit
+import threading
+import weakref
+import numpy as np
+from typing import Optional, List, Tuple, Dict, Hashable
+from hybridagi.core.datatypes import AgentStep, AgentStepList
+from hybridagi.memory.trace_memory import TraceMemory
+from hybridagi.embeddings.embeddings import Embeddings
+
+class TraceWriter():
+    """
+    Background writer taking the step embedding and the trace memory writes
+    out of the critical path of the agent.
+
+    The steps are put into a bounded queue, a worker thread embeds their texts
+    and upserts them into the trace memory in batches. When the queue is full,
+    the back-pressure policy either blocks the agent until there is room ("block")
+    or drops the step ("drop"). The steps are only visible in the trace memory
+    once written, call `flush` to wait for them.
+
+    The steps are put with a key (e.g. one per agent), the steps of each key are
+    written separately and `flush(key)` only waits for the steps and raises the
+    errors of its key, so the agents sharing a writer do not wait for each other.
+
+    Call `close` (or use the writer as a context manager) to write the remaining
+    steps and stop the worker thread. The writers still open are closed at exit.
+
+    Attributes:
+        trace_memory (TraceMemory): The trace memory to write into.
+        embeddings (Optional[Embeddings]): The embeddings used for the step texts.
+        max_queue_size (int): The maximum number of steps waiting to be written.
+        batch_size (int): The maximum number of steps written at once.
+        back_pressure (str): The policy when the queue is full, "block" or "drop".
+        dropped (int): The number of steps dropped because the queue was full.
+    """
+
+    def __init__(
+            self,
+            trace_memory: TraceMemory,
+            embeddings: Optional[Embeddings] = None,
+            max_queue_size: int = 256,
+            batch_size: int = 32,
+            back_pressure: str = "block",
+        ):
+        """
+        Initialize the trace writer.
+
+        Parameters:
+            trace_memory (TraceMemory): The trace memory to write into.
+            embeddings (Optional[Embeddings]): The embeddings used for the step texts. Defaults to None.
+            max_queue_size (int): The maximum number of steps waiting to be written. Defaults to 256.
+            batch_size (int): The maximum number of steps written at once. Defaults to 32.
+            back_pressure (str): The policy when the queue is full, "block" or "drop". Defaults to "block".
+        """
+        if max_queue_size < 1:
+            raise ValueError("Invalid max queue size provided, should be at least 1")
+        if batch_size < 1:
+            raise ValueError("Invalid batch size provided, should be at least 1")
+        if back_pressure not in ("block", "drop"):
+            raise ValueError("Invalid back pressure policy provided, should be 'block' or 'drop'")
+        self.trace_memory = trace_memory
+        self.embeddings = embeddings
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.back_pressure = back_pressure
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = None
+        self._pending: Dict[Hashable, int] = {}
+        self._errors: Dict[Hashable, List[Exception]] = {}
+        self._lock = threading.Lock()
+        self._written = threading.Condition(self._lock)
+        self._closed = False
+        # Taken by `put` and `close`, so no step is queued after the sentinel stopping the worker
+        self._put_lock = threading.Lock()
+
+    def full(self) -> bool:
+        """Whether the queue is full (putting a step would block or drop it)"""
+        return self._queue.full()
+
+    def put(self, agent_step: AgentStep, text: Optional[str] = None, key: Hashable = None):
+        """
+        Queue a step to be written into the trace memory.
+
+        Parameters:
+            agent_step (AgentStep): The step to write.
+            text (Optional[str]): The text to embed as the step vector, None to keep the step vector. Defaults to None.
+            key (Hashable): The key of the writer of the step (e.g. the agent), used by `flush`. Defaults to None.
+        """
+        if text is not None and self.embeddings is None:
+            raise ValueError("An embeddings should be provided to embed the steps")
+        with self._put_lock:
+            if self._closed:
+                raise RuntimeError("The trace writer is closed")
+            self._start()
+            with self._lock:
+                self._pending[key] = self._pending.get(key, 0) + 1
+            if self.back_pressure == "block":
+                self._queue.put((key, agent_step, text))
+            else:
+                try:
+                    self._queue.put_nowait((key, agent_step, text))
+                except queue.Full:
+                    with self._lock:
+                        self.dropped += 1
+                        self._done(key, 1)
+
+    def flush(self, key: Hashable = None):
+        """
+        Wait until the queued steps of the given key are written into the trace memory.
+
+        Parameters:
+            key (Hashable): The key given to `put`, None to wait for all the steps whatever their key. Defaults to None.
+
+        Raises:
+            RuntimeError: If some steps of the key could not be written since its last flush.
+        """
+        with self._written:
+            if key is None:
+                self._written.wait_for(lambda: len(self._pending) == 0)
+                errors = [error for key_errors in self._errors.values() for error in key_errors]
+                self._errors = {}
+            else:
+                self._written.wait_for(lambda: key not in self._pending)
+                errors = self._errors.pop(key, [])
+        if len(errors) > 0:
+            raise RuntimeError(f"Failed to write {len(errors)} batch(es) of steps into the trace memory") from errors[0]
+
+    def close(self):
+        """
+        Write the queued steps and stop the worker thread, the steps can no longer be put afterward.
+
+        Raises:
+            RuntimeError: If some steps could not be written since the last flush.
+        """
+        with self._put_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._worker is not None:
+                self._queue.put(None)
+        if self._worker is not None:
+            self._worker.join()
+        _open_writers.discard(self)
+        self.flush()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _done(self, key: Hashable, count: int):
+        """Count the given number of steps of the key as written (must be called holding the lock)"""
+        self._pending[key] -= count
+        if self._pending[key] == 0:
+            del self._pending[key]
+        self._written.notify_all()
+
+    def _start(self):
+        """Start the worker thread if not already running"""
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+                _open_writers.add(self)
+
+    def _run(self):
+        """The worker loop, writing the queued steps by batches, one write per key, until closed"""
+        closed = False
+        while not closed:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if items[-1] is None:
+                # The steps are all put before the sentinel of `close`
+                items.pop()
+                closed = True
+            groups: Dict[Hashable, List[Tuple[AgentStep, Optional[str]]]] = {}
+            for key, agent_step, text in items:
+                groups.setdefault(key, []).append((agent_step, text))
+            for key, group in groups.items():
+                try:
+                    self._write(group)
+                except Exception as e:
+                    with self._lock:
+                        self._errors.setdefault(key, []).append(e)
+                finally:
+                    with self._lock:
+                        self._done(key, len(group))
+
+    def _write(self, items: List[Tuple[AgentStep, Optional[str]]]):
+        """Embed the texts of the given steps in one call and upsert the steps"""
+        to_embed = [(agent_step, text) for agent_step, text in items if text is not None]
+        if len(to_embed) > 0:
+            vectors = np.asarray(self.embeddings.embed_text([text for _, text in to_embed]))
+            vectors = vectors.reshape(len(to_embed), -1)
+            for (agent_step, _), vector in zip(to_embed, vectors):
+                agent_step.vector = vector
+        steps = AgentStepList()
+        steps.steps = [agent_step for agent_step, _ in items]
+        self.trace_memory.update(steps)
+
+_open_writers = weakref.WeakSet()
+
+@atexit.register
+def _close_open_writers():
+    """Write the steps still queued in the open writers at exit"""
+    for writer in list(_open_writers):
+        try:
+            writer.close()
+        except Exception:
+            pass
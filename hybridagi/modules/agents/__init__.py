@@ -1,5 +1,7 @@
 from .graph_interpreter import GraphInterpreterAgent
+from .decision_engine import EmbeddingDecisionEngine
 
 __all__ = [
-    GraphInterpreterAgent
+    GraphInterpreterAgent,
+    EmbeddingDecisionEngine,
 ]
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""The embedding decision engine. Copyright (C) 2024 SynaLinks. License: GPL-3.0"""
+
+import threading
+import numpy as np
+from collections import deque
+from typing import Optional, List, Dict, Tuple
+from hybridagi.embeddings.embeddings import Embeddings
+
+class EmbeddingDecisionEngine():
+    """
+    Fast path for the decision steps, answering without the LM when confident.
+
+    The engine is a nearest neighbour classifier trained online on the decisions
+    made by the LM: for each decision step, it keeps the embeddings of the
+    contexts (objective, purpose, question and trace) the LM decided on, labeled
+    with the choices. A new context is scored against the examples of each option:
+    the score of an option is its best cosine similarity and the confidence is the
+    softmax of the scores. The fast path is only taken once at least two options
+    have examples, when the best score is above `min_similarity` and the confidence
+    above `threshold`, otherwise the agent falls back to the LM and the engine
+    learns from its decision.
+
+    Every decision is embedded, including the ones answered by the LM since their
+    context is kept as an example, so the decisions falling back to the LM cost an
+    embedding call on top of the LM call.
+
+    Attributes:
+        embeddings (Optional[Embeddings]): The embeddings used for the contexts, the agent ones if None.
+        threshold (float): The minimum confidence of the fast path.
+        min_similarity (float): The minimum similarity with a known example of the fast path.
+        temperature (float): The temperature of the softmax over the option scores.
+        max_examples (int): The maximum number of examples kept per decision step and option.
+        fast_decisions (int): The number of decisions taken by the fast path.
+        llm_decisions (int): The number of decisions taken by the LM.
+    """
+
+    def __init__(
+            self,
+            embeddings: Optional[Embeddings] = None,
+            threshold: float = 0.9,
+            min_similarity: float = 0.9,
+            temperature: float = 0.05,
+            max_examples: int = 100,
+        ):
+        """
+        Initialize the decision engine.
+
+        Parameters:
+            embeddings (Optional[Embeddings]): The embeddings used for the contexts. Defaults to None (the agent ones).
+            threshold (float): The minimum confidence of the fast path. Defaults to 0.9.
+            min_similarity (float): The minimum similarity with a known example of the fast path. Defaults to 0.9.
+            temperature (float): The temperature of the softmax over the option scores. Defaults to 0.05.
+            max_examples (int): The maximum number of examples kept per decision step and option. Defaults to 100.
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("Invalid threshold provided, should be in ]0, 1]")
+        if temperature <= 0.0:
+            raise ValueError("Invalid temperature provided, should be positive")
+        if max_examples < 1:
+            raise ValueError("Invalid max examples provided, should be at least 1")
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.min_similarity = min_similarity
+        self.temperature = temperature
+        self.max_examples = max_examples
+        self.fast_decisions = 0
+        self.llm_decisions = 0
+        self._examples: Dict[str, Dict[str, deque]] = {}
+        self._lock = threading.Lock()
+
+    def context_text(self, objective: str, trace: str, purpose: str = "", question: str = "") -> str:
+        """
+        Format the context of a decision.
+
+        Parameters:
+            objective (str): The objective of the agent.
+            trace (str): The formatted program trace.
+            purpose (str): The purpose of the decision step. Defaults to "".
+            question (str): The question of the decision step. Defaults to "".
+
+        Returns:
+            str: The text embedded for the decision.
+        """
+        return f"Objective: {objective}\nPurpose: {purpose}\nQuestion: {question}\n{trace}"
+
+    def embed(self, objective: str, trace: str, purpose: str = "", question: str = "") -> np.ndarray:
+        """
+        Embed the context of a decision.
+
+        Parameters:
+            objective (str): The objective of the agent.
+            trace (str): The formatted program trace.
+            purpose (str): The purpose of the decision step. Defaults to "".
+            question (str): The question of the decision step. Defaults to "".
+
+        Returns:
+            np.ndarray: The normalized vector of the context.
+        """
+        if self.embeddings is None:
+            raise ValueError("An embeddings should be provided to the decision engine")
+        text = self.context_text(objective, trace, purpose=purpose, question=question)
+        vector = np.asarray(self.embeddings.embed_text(text), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def scores(self, key: str, vector: np.ndarray, choices: List[str]) -> np.ndarray:
+        """
+        Score the options of a decision step.
+
+        Parameters:
+            key (str): The key of the decision step.
+            vector (np.ndarray): The normalized vector of the context.
+            choices (List[str]): The options of the decision.
+
+        Returns:
+            np.ndarray: The best similarity of the context with the examples of each option, NaN without examples.
+        """
+        with self._lock:
+            examples = {choice: list(vectors) for choice, vectors in self._examples.get(key, {}).items()}
+        scores = np.full(len(choices), np.nan, dtype=np.float32)
+        for i, choice in enumerate(choices):
+            if examples.get(choice):
+                scores[i] = float(np.max(np.stack(examples[choice]) @ vector))
+        return scores
+
+    def predict(self, key: str, vector: np.ndarray, choices: List[str]) -> Tuple[Optional[str], float]:
+        """
+        Predict the choice of a decision step.
+
+        Parameters:
+            key (str): The key of the decision step.
+            vector (np.ndarray): The normalized vector of the context.
+            choices (List[str]): The options of the decision.
+
+        Returns:
+            Tuple[Optional[str], float]: The choice, None if not confident enough, and the confidence.
+        """
+        scores = self.scores(key, vector, choices)
+        known = ~np.isnan(scores)
+        # Without counter-examples, the confidence against the unseen options is meaningless
+        if np.count_nonzero(known) < 2:
+            return None, 0.0
+        known_scores = scores[known]
+        logits = (known_scores - known_scores.max()) / self.temperature
+        probabilities = np.exp(logits) / np.sum(np.exp(logits))
+        best = int(np.argmax(known_scores))
+        confidence = float(probabilities[best])
+        if known_scores[best] >= self.min_similarity and confidence >= self.threshold:
+            return [choice for choice, k in zip(choices, known) if k][best], confidence
+        return None, confidence
+
+    def learn(self, key: str, vector: np.ndarray, choice: str):
+        """
+        Add an example to a decision step.
+
+        Parameters:
+            key (str): The key of the decision step.
+            vector (np.ndarray): The normalized vector of the context.
+            choice (str): The choice made.
+        """
+        with self._lock:
+            options = self._examples.setdefault(key, {})
+            options.setdefault(choice, deque(maxlen=self.max_examples)).append(vector)
+
+    def record(self, fast: bool):
+        """Count a decision taken by the fast path or by the LM"""
+        with self._lock:
+            if fast:
+                self.fast_decisions += 1
+            else:
+                self.llm_decisions += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the metrics of the decision paths.
+
+        Returns:
+            Dict[str, float]: The number of decisions taken by each path and the fast path rate.
+        """
+        total = self.fast_decisions + self.llm_decisions
+        return {
+            "fast_decisions": self.fast_decisions,
+            "llm_decisions": self.llm_decisions,
+            "fast_path_rate": self.fast_decisions / total if total > 0 else 0.0,
+        }
+
+    def clear(self):
+        """Remove all the examples and reset the metrics"""
+        with self._lock:
+            self._examples = {}
+            self.fast_decisions = 0
+            self.llm_decisions = 0
@@ -1,8 +1,11 @@
 import dspy
-from typing import Optional, List, Union
+import copy
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Union, Tuple
 from colorama import Fore, Style
-from jinja2 import Template
 import json
+from uuid import uuid4
 
 from hybridagi.core.datatypes import (
     AgentStep,
@@ -11,12 +14,14 @@ from hybridagi.core.datatypes import (
     AgentOutput,
     AgentState,
     FinishReason,
+    GraphProgramList,
     ToolInput,
     Message,
     InteractionSession,
 )
 
 from hybridagi.core.graph_program import (
+    compile_prompt,
     GraphProgram,
     Control,
     ControlType,
@@ -26,12 +31,16 @@ from hybridagi.core.graph_program import (
 )
 
 from hybridagi.modules.agents.tools.tool import Tool
+from hybridagi.modules.agents.decision_engine import EmbeddingDecisionEngine
+from hybridagi.core.concurrency import run_in_thread, bind_settings
 
 from hybridagi.memory.program_memory import ProgramMemory
+from hybridagi.memory.program_cache import ProgramCache
 from hybridagi.memory.trace_memory import TraceMemory
+from hybridagi.memory.trace_writer import TraceWriter
 from hybridagi.embeddings.embeddings import Embeddings
 
-from hybridagi.core.datatypes import Query, QueryWithSession
+from hybridagi.core.datatypes import Query, QueryWithSession, QueryList
 
 from hybridagi.output_parsers import (
     DecisionOutputParser,
@@ -71,14 +80,18 @@ class GraphInterpreterAgent(dspy.Module):
             self,
             program_memory: ProgramMemory,
             agent_state: AgentState,
+            program_cache: Optional[ProgramCache] = None,
+            preload_programs: bool = False,
             embeddings: Optional[Embeddings] = None,
             trace_memory: Optional[TraceMemory] = None,
+            trace_writer: Optional[TraceWriter] = None,
             tools: List[Tool] = [],
             entrypoint: str = "main",
             num_history: int = 5,
             max_iters: int = 20,
             commit_decision_steps: bool = False,
             decision_lm: Optional[dspy.LM] = None,
+            decision_engine: Optional[EmbeddingDecisionEngine] = None,
             verbose: bool = True,
             debug: bool = False,
         ):
@@ -87,19 +100,40 @@ class GraphInterpreterAgent(dspy.Module):
 
         Args:
             program_memory (ProgramMemory): The program memory to use for the agent.
+            program_cache (Optional[ProgramCache], optional): The cache used to read the programs of the program memory,
+                e.g. `ProgramCache.shared(program_memory)` to share it with the other agents of the process. Defaults to None.
+            preload_programs (bool, optional): Whether to load the entrypoint and all its dependencies into the program cache when starting. Defaults to False.
             embeddings (Optional[Embeddings], optional): The embeddings to use for the agent. Defaults to None.
             trace_memory (Optional[TraceMemory], optional): The trace memory to use for the agent. Defaults to None.
+            trace_writer (Optional[TraceWriter], optional): The background writer used to embed and write the steps into its trace memory
+                out of the critical path, flushed at the end of each execution, using the agent embeddings if it has none. Defaults to None (synchronous writes).
             agent_state (Optional[AgentState], optional): The initial state of the agent. Defaults to None.
             tools (List[Tool], optional): The tools that the agent can use. Defaults to an empty list.
             entrypoint (str, optional): The name of the entrypoint program. Defaults to "main".
             num_history (int, optional): The number of previous steps to include in the agent's context. Defaults to 5.
             max_iters (int, optional): The maximum number of iterations of the agent. Defaults to 20.
+            decision_engine (Optional[EmbeddingDecisionEngine], optional): The engine answering the decisions without the LM when confident,
+                using the agent embeddings if it has none. Defaults to None.
             verbose (bool, optional): Whether to print verbose output. Defaults to True.
         """
         super().__init__()
         self.embeddings = embeddings
         self.program_memory = program_memory
+        if program_cache is not None and program_cache.program_memory is not program_memory:
+            raise ValueError("The program cache should read from the program memory of the agent")
+        self.program_cache = program_cache
+        self.preload_programs = preload_programs
+        if trace_writer is not None:
+            if trace_memory is None:
+                trace_memory = trace_writer.trace_memory
+            elif trace_memory is not trace_writer.trace_memory:
+                raise ValueError("The trace writer should write into the trace memory of the agent")
+            if trace_writer.embeddings is None:
+                trace_writer.embeddings = embeddings
         self.trace_memory = trace_memory
+        self.trace_writer = trace_writer
+        self.trace_key = uuid4().hex
+        self.deferred_texts = {}
         self.agent_state = agent_state
         self.entrypoint = entrypoint
         self.num_history = num_history
@@ -108,6 +142,11 @@ class GraphInterpreterAgent(dspy.Module):
         self.prediction_parser = PredictionOutputParser()
         self.commit_decision_steps = commit_decision_steps
         self.decision_lm = decision_lm
+        if decision_engine is not None and decision_engine.embeddings is None:
+            if self.embeddings is None:
+                raise ValueError("An embeddings should be provided when using the decision engine")
+            decision_engine.embeddings = self.embeddings
+        self.decision_engine = decision_engine
         self.verbose = verbose
         self.debug = debug
         self.previous_agent_step = None
@@ -128,41 +167,81 @@ class GraphInterpreterAgent(dspy.Module):
         """
         Runs a single step of the agent's execution.
         """
+        current_step = self._next_step()
+        if isinstance(current_step, Program):
+            agent_step = self.call_program(current_step)
+        elif isinstance(current_step, Action):
+            agent_step = self.act(current_step)
+        elif isinstance(current_step, Decision):
+            agent_step = self.decide(current_step)
+        else:
+            agent_step = self.end_current_program()
+        if self._record_step(current_step, agent_step):
+            self._write_step(agent_step)
+
+    async def arun_step(self):
+        """
+        Asynchronous version of `run_step`, the LM calls, tools, embeddings and memory accesses are awaited.
+        """
+        current_step = self._next_step()
+        if isinstance(current_step, Program):
+            agent_step = await self.acall_program(current_step)
+        elif isinstance(current_step, Action):
+            agent_step = await self.aact(current_step)
+        elif isinstance(current_step, Decision):
+            agent_step = await self.adecide(current_step)
+        else:
+            agent_step = self.end_current_program()
+        if self._record_step(current_step, agent_step):
+            await self._awrite_step(agent_step)
+
+    def _next_step(self) -> Union[Control, Action, Decision, Program]:
+        """
+        Gets the step to execute and increments the current hop.
+
+        Returns:
+            Union[Control, Action, Decision, Program]: The step to execute.
+        """
         current_step = self.agent_state.get_current_step()
-        agent_step = None
         self.agent_state.current_hop += 1
+        if isinstance(current_step, Control):
+            if current_step.id != "end":
+                raise RuntimeError("Invalid control node. Please verify your programs.")
+        elif not isinstance(current_step, (Action, Decision, Program)):
+            raise RuntimeError("Invalid step, should be Control, Action, Decision or Program, please verify your program")
+        return current_step
+
+    def _record_step(self, current_step: Union[Control, Action, Decision, Program], agent_step: AgentStep) -> bool:
+        """
+        Appends the executed step to the program trace, prints it and links it to the previous step.
+
+        Args:
+            current_step (Union[Control, Action, Decision, Program]): The executed step.
+            agent_step (AgentStep): The resulting agent step.
+
+        Returns:
+            bool: True if the agent step should be written into the trace memory, False otherwise.
+        """
         if isinstance(current_step, Program):
-            agent_step = self.call_program(current_step)
             self.agent_state.program_trace.steps.append(str(agent_step))
-            if self.verbose:
-                print(f"{CONTROL_COLOR}{agent_step}{Style.RESET_ALL}")
+            color = CONTROL_COLOR
         elif isinstance(current_step, Action):
-            agent_step = self.act(current_step)
             self.agent_state.program_trace.steps.append(str(agent_step))
-            if self.verbose:
-                print(f"{ACTION_COLOR}{agent_step}{Style.RESET_ALL}")
+            color = ACTION_COLOR
         elif isinstance(current_step, Decision):
-            agent_step = self.decide(current_step)
             if self.commit_decision_steps:
                 self.agent_state.program_trace.steps.append(str(agent_step))
-            if self.verbose:
-                print(f"{DECISION_COLOR}{agent_step}{Style.RESET_ALL}")
-        elif isinstance(current_step, Control):
-            if current_step.id == "end":
-                agent_step = self.end_current_program()
-                # self.agent_state.program_trace.steps.append(str(agent_step))
-                if self.verbose:
-                    print(f"{CONTROL_COLOR}{agent_step}{Style.RESET_ALL}")
-            else:
-                raise RuntimeError("Invalid control node. Please verify your programs.")
+            color = DECISION_COLOR
         else:
-            raise RuntimeError("Invalid step, should be Control, Action, Decision or Program, please verify your program")
-        if self.trace_memory is not None:
-            if agent_step is not None:
-                if self.previous_agent_step is not None:
-                    agent_step.parent_id = self.previous_agent_step.id
-                self.previous_agent_step = agent_step
-                self.trace_memory.update(agent_step)
+            color = CONTROL_COLOR
+        if self.verbose:
+            print(f"{color}{agent_step}{Style.RESET_ALL}")
+        if self.trace_memory is not None and agent_step is not None:
+            if self.previous_agent_step is not None:
+                agent_step.parent_id = self.previous_agent_step.id
+            self.previous_agent_step = agent_step
+            return True
+        return False
     
     def start(self, query_or_query_with_session: Union[Query, QueryWithSession]) -> AgentStep:
         """
@@ -174,6 +253,98 @@ class GraphInterpreterAgent(dspy.Module):
         Returns:
             AgentStep: The initial step of the agent's execution.
         """
+        self._reset(query_or_query_with_session)
+        if self.program_cache is not None and self.preload_programs:
+            self.program_cache.preload(self.entrypoint)
+        agent_step = self._start_program(self._get_programs(self.entrypoint).progs)
+        if self.trace_memory is not None:
+            self._write_step(agent_step)
+        return agent_step
+
+    async def astart(self, query_or_query_with_session: Union[Query, QueryWithSession]) -> AgentStep:
+        """
+        Asynchronous version of `start`.
+
+        Args:
+            query_or_query_with_session (Union[Query, QueryWithSession]): The query or query with session to start the agent's execution with.
+
+        Returns:
+            AgentStep: The initial step of the agent's execution.
+        """
+        self._reset(query_or_query_with_session)
+        if self.program_cache is not None and self.preload_programs:
+            await self.program_cache.apreload(self.entrypoint)
+        agent_step = self._start_program((await self._aget_programs(self.entrypoint)).progs)
+        if self.trace_memory is not None:
+            await self._awrite_step(agent_step)
+        return agent_step
+
+    def _write_step(self, agent_step: AgentStep):
+        """
+        Writes the given step into the trace memory, or queues it when using a trace writer.
+
+        Args:
+            agent_step (AgentStep): The step to write.
+        """
+        if self.trace_writer is not None:
+            self.trace_writer.put(
+                agent_step,
+                self.deferred_texts.pop(str(agent_step.id), None),
+                key = self.trace_key,
+            )
+        else:
+            self.trace_memory.update(agent_step)
+
+    async def _awrite_step(self, agent_step: AgentStep):
+        """
+        Asynchronous version of `_write_step`, waits for room in a worker thread when the writer queue is full.
+
+        Args:
+            agent_step (AgentStep): The step to write.
+        """
+        if self.trace_writer is not None:
+            if self.trace_writer.full():
+                await asyncio.to_thread(self._write_step, agent_step)
+            else:
+                self._write_step(agent_step)
+        else:
+            await self.trace_memory.aupdate(agent_step)
+
+    def _get_programs(self, name: str) -> GraphProgramList:
+        """
+        Reads the given program from the program cache if any, from the program memory otherwise.
+
+        Args:
+            name (str): The name of the program.
+
+        Returns:
+            GraphProgramList: The programs found.
+        """
+        if self.program_cache is not None:
+            return self.program_cache.get(name)
+        return self.program_memory.get(name)
+
+    async def _aget_programs(self, name: str) -> GraphProgramList:
+        """
+        Asynchronous version of `_get_programs`.
+
+        Args:
+            name (str): The name of the program.
+
+        Returns:
+            GraphProgramList: The programs found.
+        """
+        if self.program_cache is not None:
+            return await self.program_cache.aget(name)
+        return await self.program_memory.aget(name)
+
+    def _reset(self, query_or_query_with_session: Union[Query, QueryWithSession]):
+        """
+        Resets the agent state with the given query or query with session.
+
+        Args:
+            query_or_query_with_session (Union[Query, QueryWithSession]): The query or query with session to start the agent's execution with.
+        """
         if isinstance(query_or_query_with_session, Query):
             self.agent_state.objective = query_or_query_with_session
             self.agent_state.session = InteractionSession()
@@ -195,7 +366,17 @@ class GraphInterpreterAgent(dspy.Module):
         self.agent_state.decision_hop = 0
         self.agent_state.final_answer = ""
         self.agent_state.program_trace = AgentStepList()
-        result_progs = self.program_memory.get(self.entrypoint).progs
+
+    def _start_program(self, result_progs: List[GraphProgram]) -> AgentStep:
+        """
+        Calls the entrypoint program and returns the initial step.
+
+        Args:
+            result_progs (List[GraphProgram]): The programs found for the entrypoint.
+
+        Returns:
+            AgentStep: The initial step of the agent's execution.
+        """
         if len(result_progs) == 0:
             raise ValueError(f"No entrypoint detected, please ensure that the {self.entrypoint} program is loaded into memory")
         main_program = result_progs[0]
@@ -210,8 +391,21 @@ class GraphInterpreterAgent(dspy.Module):
         self.agent_state.program_trace.steps.append(str(agent_step))
         if self.trace_memory is not None:
             self.previous_agent_step = agent_step
-            self.trace_memory.update(agent_step)
         return agent_step
+
+    def _trace(self) -> str:
+        """
+        Formats the last steps of the program trace used as context.
+
+        Returns:
+            str: The formatted trace.
+        """
+        if len(self.agent_state.program_trace.steps) > 0:
+            trace = "\n".join([str(s) for s in self.agent_state.program_trace.steps[-self.num_history:]])
+            trace += "\n--- END OF TRACE ---"
+        else:
+            trace = "Nothing done yet"
+        return trace
     
     def act(self, step: Action) -> AgentStep:
         """
@@ -223,14 +417,56 @@ class GraphInterpreterAgent(dspy.Module):
         Returns:
             AgentStep: The executed Action step.
         """
-        if len(self.agent_state.program_trace.steps) > 0:
-            trace = "\n".join([str(s) for s in self.agent_state.program_trace.steps[-self.num_history:]])
-            trace += "\n--- END OF TRACE ---"
-        else:
-            trace = "Nothing done yet"
+        tool_input = self._tool_input(step)
+        tool_output = self.tools[step.tool](
+            tool_input = tool_input,
+        )
+        agent_step, embedded_string = self._action_step(step, tool_input, tool_output)
+        if embedded_string is not None:
+            if self.trace_writer is not None:
+                self.deferred_texts[str(agent_step.id)] = embedded_string
+            else:
+                agent_step.vector = self.embeddings.embed_text(embedded_string)
+        self._end_action(step)
+        return agent_step
+
+    async def aact(self, step: Action) -> AgentStep:
+        """
+        Asynchronous version of `act`.
+
+        Args:
+            step (Action): The action to execute.
+
+        Returns:
+            AgentStep: The executed Action step.
+        """
+        tool_input = self._tool_input(step)
+        tool_output = await self.tools[step.tool].acall(
+            tool_input = tool_input,
+        )
+        agent_step, embedded_string = self._action_step(step, tool_input, tool_output)
+        if embedded_string is not None:
+            if self.trace_writer is not None:
+                self.deferred_texts[str(agent_step.id)] = embedded_string
+            else:
+                agent_step.vector = await self.embeddings.aembed_text(embedded_string)
+        self._end_action(step)
+        return agent_step
+
+    def _tool_input(self, step: Action) -> ToolInput:
+        """
+        Renders the prompt of the given action and builds the input of its tool.
+
+        Args:
+            step (Action): The action to execute.
+
+        Returns:
+            ToolInput: The input of the action tool.
+        """
+        trace = self._trace()
         if step.tool not in self.tools:
             raise ValueError(f"Invalid tool: '{step.tool}' does not exist, should be one of {list(self.tools.keys())}")
-        jinja_template = Template(step.prompt)
+        jinja_template = compile_prompt(step.prompt)
         prompt_kwargs = {}
         for key in step.var_in:
             if key in self.agent_state.variables:
@@ -238,39 +474,57 @@ class GraphInterpreterAgent(dspy.Module):
             else:
                 prompt_kwargs[key] = ""
         rendered_template = jinja_template.render(**prompt_kwargs)
-        tool_input = ToolInput(
+        return ToolInput(
             objective = self.agent_state.objective.query,
             purpose = step.purpose,
             context = trace,
             prompt = rendered_template,
             disable_inference = step.disable_inference,
         )
-        tool_output = self.tools[step.tool](
-            tool_input = tool_input,
-        )
+
+    def _action_step(self, step: Action, tool_input: ToolInput, tool_output: dspy.Prediction) -> Tuple[AgentStep, Optional[str]]:
+        """
+        Stores the output variable of the given action and builds the executed step.
+
+        Args:
+            step (Action): The executed action.
+            tool_input (ToolInput): The input of the action tool.
+            tool_output (dspy.Prediction): The output of the action tool.
+
+        Returns:
+            Tuple[AgentStep, Optional[str]]: The executed Action step and the string to embed, if any.
+        """
         if step.var_out is not None:
             if len(dict(tool_output).keys()) > 1:
-                self.agent_state.variables[output] = tool_output.to_dict()
+                self.agent_state.variables[step.var_out] = tool_output.to_dict()
             else:
-                self.agent_state.variables[output] = tool_output.to_dict()[list(dict(tool_output).keys())[0]]
+                self.agent_state.variables[step.var_out] = tool_output.to_dict()[list(dict(tool_output).keys())[0]]
         agent_step = AgentStep(
             hop = self.agent_state.current_hop,
             step_type = AgentStepType.Action,
             inputs = dict(tool_input),
             outputs = tool_output.to_dict(),
         )
+        embedded_string = None
         if self.embeddings is not None and step.tool != "PastActionSearch":
             if len(dict(agent_step.outputs).keys()) > 1:
                 embedded_string = json.dumps(agent_step.outputs)
             else:
                 embedded_string = tool_output.to_dict()[list(tool_output.to_dict().keys())[0]]
-            agent_step.vector = self.embeddings.embed_text(embedded_string)
+        return agent_step, embedded_string
+
+    def _end_action(self, step: Action):
+        """
+        Moves to the step following the given action (the CallGraphProgram tool sets it itself).
+
+        Args:
+            step (Action): The executed action.
+        """
         if step.tool != "CallGraphProgram":
             current_program = self.agent_state.get_current_program()
             current_step = self.agent_state.get_current_step()
             next_step = current_program.get_next_step(current_step.id)
             self.agent_state.set_current_step(next_step)
-        return agent_step
         
     def decide(self, step: Decision) -> AgentStep:
         """
@@ -282,12 +536,67 @@ class GraphInterpreterAgent(dspy.Module):
         Returns:
             AgentStep: The executed Decision step.
         """
-        if len(self.agent_state.program_trace.steps) > 0:
-            trace = "\n".join([str(s) for s in self.agent_state.program_trace.steps[-self.num_history:]])
-            trace += "\n--- END OF TRACE ---"
-        else:
-            trace = "Nothing done yet"
         choices = self.agent_state.get_current_program().get_decision_choices(step.id)
+        choice = self._decide_choice(step, self._trace(), choices)
+        return self._decision_step(step, choices, choice)
+
+    async def adecide(self, step: Decision) -> AgentStep:
+        """
+        Asynchronous version of `decide`, the LM calls are run without blocking the event loop.
+
+        Args:
+            step (Decision): The decision step to make a decision based on.
+
+        Returns:
+            AgentStep: The executed Decision step.
+        """
+        choices = self.agent_state.get_current_program().get_decision_choices(step.id)
+        choice = await run_in_thread(self._decide_choice, step, self._trace(), choices)
+        return self._decision_step(step, choices, choice)
+
+    def _decide_choice(self, step: Decision, trace: str, choices: List[str]) -> str:
+        """
+        Gets the choice of the given decision step from the decision engine if confident, from the LM otherwise.
+
+        Args:
+            step (Decision): The decision step.
+            trace (str): The formatted program trace.
+            choices (List[str]): The possible choices.
+
+        Returns:
+            str: The choice.
+        """
+        if self.decision_engine is None:
+            return self._choose(step, trace, choices)
+        key = f"{self.agent_state.get_current_program().name}.{step.id}"
+        vector = self.decision_engine.embed(
+            self.agent_state.objective.query,
+            trace,
+            purpose = step.purpose,
+            question = step.question,
+        )
+        choice, confidence = self.decision_engine.predict(key, vector, choices)
+        if choice is not None:
+            self.decision_engine.record(fast=True)
+            return choice
+        choice = self._choose(step, trace, choices)
+        self.decision_engine.record(fast=False)
+        if choice in choices:
+            self.decision_engine.learn(key, vector, choice)
+        return choice
+
+    def _choose(self, step: Decision, trace: str, choices: List[str]) -> str:
+        """
+        Infers the choice of the given decision step.
+
+        Args:
+            step (Decision): The decision step.
+            trace (str): The formatted program trace.
+            choices (List[str]): The possible choices.
+
+        Returns:
+            str: The choice, corrected if it is not one of the possible choices.
+        """
         possible_answers = " or ".join(choices)
         with dspy.context(lm=self.decision_lm if self.decision_lm is not None else dspy.settings.lm):
             pred = self.decisions[self.agent_state.decision_hop](
@@ -309,14 +618,28 @@ class GraphInterpreterAgent(dspy.Module):
                 corrected_pred.choice = self.prediction_parser.parse(corrected_pred.choice, prefix="Choice:", stop=["."])
                 corrected_pred.choice = self.decision_parser.parse(corrected_pred.choice, options=choices)
                 pred.choice = corrected_pred.choice
+        return pred.choice
+
+    def _decision_step(self, step: Decision, choices: List[str], choice: str) -> AgentStep:
+        """
+        Moves to the branch of the given choice and builds the executed step.
+
+        Args:
+            step (Decision): The decision step.
+            choices (List[str]): The possible choices.
+            choice (str): The choice made.
+
+        Returns:
+            AgentStep: The executed Decision step.
+        """
         self.agent_state.decision_hop += 1
         agent_step = AgentStep(
             hop = self.agent_state.current_hop,
             step_type = AgentStepType.Decision,
             inputs = {"purpose": step.purpose, "question": step.question, "options": choices},
-            outputs = {"choice": pred.choice},
+            outputs = {"choice": choice},
         )
-        next_step = self.agent_state.get_current_program().get_decision_next_step(step.id, pred.choice)
+        next_step = self.agent_state.get_current_program().get_decision_next_step(step.id, choice)
         self.agent_state.set_current_step(next_step)
         return agent_step
     
@@ -330,11 +653,45 @@ class GraphInterpreterAgent(dspy.Module):
         Returns:
             AgentStep: The executed ProgramCall step.
         """
+        self._skip_program_step(step)
+        return self._enter_program(step, self._get_programs(step.program).progs)
+
+    async def acall_program(self, step: Program) -> AgentStep:
+        """
+        Asynchronous version of `call_program`.
+
+        Args:
+            step (Program): The program step.
+
+        Returns:
+            AgentStep: The executed ProgramCall step.
+        """
+        self._skip_program_step(step)
+        return self._enter_program(step, (await self._aget_programs(step.program)).progs)
+
+    def _skip_program_step(self, step: Program):
+        """
+        Moves the caller program to the step following the given program step.
+
+        Args:
+            step (Program): The program step.
+        """
         current_program = self.agent_state.get_current_program()
         next_step = current_program.get_next_step(step.id)
         if next_step is not None:
             self.agent_state.set_current_step(next_step)
-        result_progs = self.program_memory.get(step.program).progs
+
+    def _enter_program(self, step: Program, result_progs: List[GraphProgram]) -> AgentStep:
+        """
+        Pushes the called program onto the program stack and builds the executed step.
+
+        Args:
+            step (Program): The program step.
+            result_progs (List[GraphProgram]): The programs found for the called program name.
+
+        Returns:
+            AgentStep: The executed ProgramCall step.
+        """
         if len(result_progs) == 0:
             raise ValueError(f"Program {step.program} does not exist, please ensure that it is loaded into memory")
         graph_program = result_progs[0]
@@ -383,29 +740,216 @@ class GraphInterpreterAgent(dspy.Module):
             AgentOutput: The output of the agent's execution.
         """
         self.start(query_or_query_with_session)
+        finish_reason = FinishReason.MaxIters
         for i in range(self.max_iters):
             if self.debug is False:
                 try:
                     self.run_step()
                 except Exception as e:
-                    return AgentOutput(
-                        finish_reason = FinishReason.Error,
-                        final_answer = "Error occured: "+str(e),
-                        program_trace = self.agent_state.program_trace,
-                        session = self.agent_state.session,
-                    )
+                    return self._flush_trace(self._error_output(e))
             else:
                 self.run_step()
             if self.finished():
-                return AgentOutput(
-                    finish_reason = FinishReason.Finished,
-                    final_answer = self.agent_state.final_answer,
-                    program_trace = self.agent_state.program_trace,
-                    session = self.agent_state.session,
-                )
+                finish_reason = FinishReason.Finished
+                break
+        return self._flush_trace(self._output(finish_reason))
+
+    async def aforward(self, query_or_query_with_session: Union[Query, QueryWithSession]) -> AgentOutput:
+        """
+        Asynchronous version of `forward`, several agents (with their own agent state)
+        can run concurrently in the same event loop.
+
+        Args:
+            query_or_query_with_session (Union[Query, QueryWithSession]): The query or query with session to start the agent's execution with.
+
+        Returns:
+            AgentOutput: The output of the agent's execution.
+        """
+        await self.astart(query_or_query_with_session)
+        finish_reason = FinishReason.MaxIters
+        for i in range(self.max_iters):
+            if self.debug is False:
+                try:
+                    await self.arun_step()
+                except Exception as e:
+                    return await self._aflush_trace(self._error_output(e))
+            else:
+                await self.arun_step()
+            if self.finished():
+                finish_reason = FinishReason.Finished
+                break
+        return await self._aflush_trace(self._output(finish_reason))
+
+    def _flush_trace(self, agent_output: AgentOutput) -> AgentOutput:
+        """
+        Waits for the trace writer to write the steps queued by this agent (not the ones of its forks).
+
+        Args:
+            agent_output (AgentOutput): The output of the agent's execution.
+
+        Returns:
+            AgentOutput: The output of the agent's execution, or an error output if the steps could not be written.
+        """
+        if self.trace_writer is not None:
+            if self.debug is False:
+                try:
+                    self.trace_writer.flush(self.trace_key)
+                except Exception as e:
+                    return self._error_output(e)
+            else:
+                self.trace_writer.flush(self.trace_key)
+        return agent_output
+
+    async def _aflush_trace(self, agent_output: AgentOutput) -> AgentOutput:
+        """
+        Asynchronous version of `_flush_trace`, waits for the trace writer in a worker thread.
+
+        Args:
+            agent_output (AgentOutput): The output of the agent's execution.
+
+        Returns:
+            AgentOutput: The output of the agent's execution, or an error output if the steps could not be written.
+        """
+        if self.trace_writer is not None:
+            return await asyncio.to_thread(self._flush_trace, agent_output)
+        return agent_output
+
+    def _output(self, finish_reason: FinishReason) -> AgentOutput:
+        """
+        Builds the output of the agent's execution.
+
+        Args:
+            finish_reason (FinishReason): The reason why the execution stopped.
+
+        Returns:
+            AgentOutput: The output of the agent's execution.
+        """
         return AgentOutput(
-            finish_reason = FinishReason.MaxIters,
+            finish_reason = finish_reason,
             final_answer = self.agent_state.final_answer,
             program_trace = self.agent_state.program_trace,
             session = self.agent_state.session,
-        )
\ No newline at end of file
+        )
+
+    def _error_output(self, error: Exception) -> AgentOutput:
+        """
+        Builds the output of an execution stopped by an error.
+
+        Args:
+            error (Exception): The error raised.
+
+        Returns:
+            AgentOutput: The output of the agent's execution.
+        """
+        return AgentOutput(
+            finish_reason = FinishReason.Error,
+            final_answer = "Error occured: "+str(error),
+            program_trace = self.agent_state.program_trace,
+            session = self.agent_state.session,
+        )
+
+
+    def close(self):
+        """
+        Closes the trace writer of the agent, writing the queued steps and stopping its worker thread.
+
+        The trace writer is shared with the forks of the agent, close the agent once they are done.
+        """
+        if self.trace_writer is not None:
+            self.trace_writer.close()
+
+    def fork(self, agent_state: Optional[AgentState] = None) -> "GraphInterpreterAgent":
+        """
+        Creates a copy of the agent running with its own agent state.
+
+        The memories, embeddings, trace writer and DSPy modules are shared with the original agent,
+        the tools using the agent state are copied and bound to the new one. The copy writes
+        its steps with its own trace key, so it only waits for its own steps when flushing.
+
+        Args:
+            agent_state (Optional[AgentState], optional): The agent state of the copy. Defaults to a new AgentState.
+
+        Returns:
+            GraphInterpreterAgent: The agent bound to the given agent state.
+        """
+        if agent_state is None:
+            agent_state = AgentState()
+        agent = copy.copy(self)
+        agent.agent_state = agent_state
+        agent.previous_agent_step = None
+        agent.trace_key = uuid4().hex
+        agent.deferred_texts = {}
+        agent.tools = {}
+        for name, tool in self.tools.items():
+            if hasattr(tool, "agent_state"):
+                tool = copy.copy(tool)
+                tool.agent_state = agent_state
+            agent.tools[name] = tool
+        return agent
+
+    def batch(
+            self,
+            queries: Union[QueryList, List[Union[Query, QueryWithSession]]],
+            max_concurrency: int = 8,
+        ) -> List[AgentOutput]:
+        """
+        Runs the agent on several queries concurrently, each query with its own agent state.
+
+        Args:
+            queries (Union[QueryList, List[Union[Query, QueryWithSession]]]): The queries to run.
+            max_concurrency (int, optional): The maximum number of queries running at once. Defaults to 8.
+
+        Returns:
+            List[AgentOutput]: The outputs of the agent, in the order of the given queries.
+        """
+        queries = self._batch_queries(queries, max_concurrency)
+        if len(queries) == 0:
+            return []
+        run = bind_settings(lambda query: self.fork()(query))
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(queries))) as executor:
+            return list(executor.map(run, queries))
+
+    async def abatch(
+            self,
+            queries: Union[QueryList, List[Union[Query, QueryWithSession]]],
+            max_concurrency: int = 8,
+        ) -> List[AgentOutput]:
+        """
+        Asynchronous version of `batch`, the queries are run with `aforward` in the current event loop.
+
+        Args:
+            queries (Union[QueryList, List[Union[Query, QueryWithSession]]]): The queries to run.
+            max_concurrency (int, optional): The maximum number of queries running at once. Defaults to 8.
+
+        Returns:
+            List[AgentOutput]: The outputs of the agent, in the order of the given queries.
+        """
+        queries = self._batch_queries(queries, max_concurrency)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(query: Union[Query, QueryWithSession]) -> AgentOutput:
+            async with semaphore:
+                return await self.fork().aforward(query)
+
+        return list(await asyncio.gather(*[run(query) for query in queries]))
+
+    def _batch_queries(
+            self,
+            queries: Union[QueryList, List[Union[Query, QueryWithSession]]],
+            max_concurrency: int,
+        ) -> List[Union[Query, QueryWithSession]]:
+        """
+        Checks the inputs of a batch execution.
+
+        Args:
+            queries (Union[QueryList, List[Union[Query, QueryWithSession]]]): The queries to run.
+            max_concurrency (int): The maximum number of queries running at once.
+
+        Returns:
+            List[Union[Query, QueryWithSession]]: The list of queries.
+        """
+        if max_concurrency < 1:
+            raise ValueError("Invalid max concurrency provided, should be at least 1")
+        if isinstance(queries, QueryList):
+            queries = queries.queries
+        return list(queries)
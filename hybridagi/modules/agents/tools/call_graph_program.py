@@ -4,6 +4,7 @@ import re
 from .tool import Tool
 from typing import Optional, Callable
 from hybridagi.memory import ProgramMemory
+from hybridagi.memory.program_cache import ProgramCache
 from hybridagi.core.datatypes import (
     ToolInput,
     AgentState,
@@ -32,6 +33,7 @@ class CallGraphProgramTool(Tool):
             name: str = "CallGraphProgram",
             description: str = "Usefull to call sub-routines dynamically (imply that they are searched before hand)",
             lm: Optional[dspy.LM] = None,
+            program_cache: Optional[ProgramCache] = None,
         ):
         super().__init__(
             name = name,
@@ -42,6 +44,7 @@ class CallGraphProgramTool(Tool):
         self.prediction_parser = PredictionOutputParser()
         self.agent_state = agent_state
         self.program_memory = program_memory
+        self.program_cache = program_cache
         
     def call_program(self, program_name: str) -> str:
         if not self.program_memory.exist(program_name):
@@ -51,7 +54,10 @@ class CallGraphProgramTool(Tool):
         current_step = self.agent_state.get_current_step()
         next_step = self.agent_state.get_current_program().get_next_step(current_step.id)
         self.agent_state.set_current_step(next_step)
-        called_program = self.program_memory.get(program_name).progs[0]
+        if self.program_cache is not None:
+            called_program = self.program_cache.get(program_name).progs[0]
+        else:
+            called_program = self.program_memory.get(program_name).progs[0]
         self.agent_state.call_program(called_program)
         return "Successfully called"
         
@@ -92,6 +98,7 @@ class CallGraphProgramTool(Tool):
             agent_state = self.agent_state,
             name = self.name,
             lm = self.lm,
+            program_cache = self.program_cache,
         )
         cpy.predict = copy.deepcopy(self.predict)
         return cpy
\ No newline at end of file
@@ -4,6 +4,7 @@ import copy
 from hybridagi.core.datatypes import ToolInput
 from typing import Optional, Union, Callable, Dict, Any
 from dspy.signatures.signature import ensure_signature
+from hybridagi.core.concurrency import run_in_thread
 
 class Tool(dspy.Module):
 
@@ -23,4 +24,17 @@ class Tool(dspy.Module):
             raise ValueError(f"{type(self).__name__} input must be a ToolInput")
         raise NotImplementedError(
             f"Tool {type(self).__name__} is missing the required 'forward' method."
-        )
\ No newline at end of file
+        )
+
+    async def aforward(self, tool_input: ToolInput) -> dspy.Prediction:
+        """
+        Asynchronous version of `forward`.
+
+        By default `forward` is run in a worker thread, the tools that can await
+        their I/O (LM, memories, external APIs) should override this method.
+        """
+        return await run_in_thread(self, tool_input=tool_input)
+
+    async def acall(self, tool_input: ToolInput) -> dspy.Prediction:
+        """Call the tool asynchronously, the asynchronous version of `__call__`"""
+        return await self.aforward(tool_input=tool_input)
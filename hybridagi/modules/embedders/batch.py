@@ -0,0 +1,33 @@
+import numpy as np
+from tqdm import tqdm
+from typing import List
+from hybridagi.embeddings.embeddings import Embeddings
+
+def embed_texts(
+        embeddings: Embeddings,
+        texts: List[str],
+        batch_size: int = 256,
+        progress: bool = True,
+    ) -> List[np._typing.NDArray]:
+    """
+    Embed a list of texts in batches, embedding each distinct text only once.
+
+    Parameters:
+        embeddings (Embeddings): The embedding model to use.
+        texts (List[str]): The texts to embed.
+        batch_size (int): The number of distinct texts sent to the embedding model at once. Defaults to 256.
+        progress (bool): Whether to show a progress bar over the batches. Defaults to True.
+
+    Returns:
+        List[np.ndarray]: The vector of each text, in the order of the given texts.
+    """
+    if batch_size < 1:
+        raise ValueError("Invalid batch size provided, should be at least 1")
+    unique_texts = list(dict.fromkeys(texts))
+    vectors = {}
+    batches = range(0, len(unique_texts), batch_size)
+    for i in tqdm(batches, disable=not progress):
+        batch = unique_texts[i:i+batch_size]
+        batch_vectors = np.asarray(embeddings.embed_text(batch))
+        vectors.update(zip(batch, batch_vectors.reshape(len(batch), -1)))
+    return [vectors[text] for text in texts]
@@ -1,7 +1,7 @@
 import dspy
-from tqdm import tqdm
 from typing import Union
 from hybridagi.embeddings.embeddings import Embeddings
+from .batch import embed_texts
 from hybridagi.core.datatypes import Document, DocumentList
 
 class DocumentEmbedder(dspy.Module):
@@ -10,18 +10,22 @@ class DocumentEmbedder(dspy.Module):
 
     Attributes:
         embeddings (Embeddings): The pre-trained embedding model to be used for embedding documents.
+        batch_size (int): The number of distinct texts sent to the embedding model at once.
     """    
     def __init__(
             self,
             embeddings: Embeddings,
+            batch_size: int = 256,
         ):
         """
         Initialize the DocumentEmbedder.
 
         Parameters:
             embeddings (Embeddings): The pre-trained embedding model to be used for embedding documents.
+            batch_size (int): The number of distinct texts sent to the embedding model at once. Defaults to 256.
         """
-        self.embeddings = embeddings 
+        self.embeddings = embeddings
+        self.batch_size = batch_size
     
     def forward(self, doc_or_docs: Union[Document, DocumentList]) -> DocumentList:
         """
@@ -43,6 +47,7 @@ class DocumentEmbedder(dspy.Module):
             documents.docs = [doc_or_docs]
         else:
             documents = doc_or_docs
-        for doc in tqdm(documents.docs):
-            doc.vector = self.embeddings.embed_text(doc.text)
+        vectors = embed_texts(self.embeddings, [doc.text for doc in documents.docs], batch_size=self.batch_size)
+        for doc, vector in zip(documents.docs, vectors):
+            doc.vector = vector
         return documents
\ No newline at end of file
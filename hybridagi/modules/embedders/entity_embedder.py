@@ -1,7 +1,7 @@
 import dspy
-from tqdm import tqdm
-from typing import Union
+from typing import Union, List
 from hybridagi.embeddings.embeddings import Embeddings
+from .batch import embed_texts
 from hybridagi.core.datatypes import Fact, FactList
 from hybridagi.core.datatypes import Entity, EntityList
 
@@ -11,18 +11,22 @@ class EntityEmbedder(dspy.Module):
 
     Attributes:
         embeddings (Embeddings): The pre-trained embedding model to use.
+        batch_size (int): The number of distinct texts sent to the embedding model at once.
     """
     def __init__(
             self,
-            embeddings: Embeddings
+            embeddings: Embeddings,
+            batch_size: int = 256,
         ):
         """
         Initializes the EntityEmbedder with an embedding model.
 
         Args:
             embeddings (Embeddings): The embedding model to use for embedding entities.
+            batch_size (int): The number of distinct texts sent to the embedding model at once. Defaults to 256.
         """
         self.embeddings = embeddings
+        self.batch_size = batch_size
     
     def forward(self, facts_or_entities: Union[Entity, EntityList, Fact, FactList]) -> Union[EntityList, FactList]:
         """
@@ -48,25 +52,25 @@ class EntityEmbedder(dspy.Module):
                 facts.facts = [facts_or_entities]
             else:
                 facts = facts_or_entities
-            for fact in tqdm(facts.facts):
-                if fact.subj.description:
-                    fact.subj.vector = self.embeddings.embed_text(fact.subj.description)
-                else:
-                    fact.subj.vector = self.embeddings.embed_text(fact.subj.name)
-                if fact.obj.description:
-                    fact.obj.vector = self.embeddings.embed_text(fact.obj.description)
-                else:
-                    fact.obj.vector = self.embeddings.embed_text(fact.obj.name)
+            self._embed_entities([ent for fact in facts.facts for ent in (fact.subj, fact.obj)])
             return facts
         else:
             if isinstance(facts_or_entities, Entity):
-                entities = EntityList
+                entities = EntityList()
                 entities.entities = [facts_or_entities]
             else:
                 entities = facts_or_entities
-            for ent in tqdm(entities.entities):
-                if ent.description:
-                    ent.vector = self.embeddings.embed_text(ent.description)
-                else:
-                    ent.vector = self.embeddings.embed_text(ent.name)
-            return entities
\ No newline at end of file
+            self._embed_entities(entities.entities)
+            return entities
+
+    def _embed_entities(self, entities: List[Entity]):
+        """
+        Embeds the entities in batches, using their description or their name if they have none.
+
+        Args:
+            entities (List[Entity]): The entities to embed.
+        """
+        texts = [ent.description if ent.description else ent.name for ent in entities]
+        vectors = embed_texts(self.embeddings, texts, batch_size=self.batch_size)
+        for ent, vector in zip(entities, vectors):
+            ent.vector = vector
\ No newline at end of file
@@ -1,7 +1,7 @@
 import dspy
-from tqdm import tqdm
 from typing import Union
 from hybridagi.embeddings.embeddings import Embeddings
+from .batch import embed_texts
 from hybridagi.core.datatypes import Fact, FactList
 
 class FactEmbedder(dspy.Module):
@@ -10,18 +10,22 @@ class FactEmbedder(dspy.Module):
 
     Attributes:
         embeddings (Embeddings): The pre-trained embedding model to be used for embedding facts.
+        batch_size (int): The number of distinct texts sent to the embedding model at once.
     """    
     def __init__(
             self,
-            embeddings: Embeddings
+            embeddings: Embeddings,
+            batch_size: int = 256,
         ):
         """
         Initialize the FactEmbedder.
 
         Parameters:
             embeddings (Embeddings): The pre-trained embedding model to be used for embedding facts.
+            batch_size (int): The number of distinct texts sent to the embedding model at once. Defaults to 256.
         """
-        self.embeddings = embeddings 
+        self.embeddings = embeddings
+        self.batch_size = batch_size
     
     def forward(self, fact_or_facts: Union[Fact, FactList]) -> FactList:
         """
@@ -43,6 +47,11 @@ class FactEmbedder(dspy.Module):
             facts.facts = [fact_or_facts]
         else:
             facts = fact_or_facts
-        for fact in tqdm(facts.facts):
-            fact.vector = self.embeddings.embed_text(fact.subj.name+" "+fact.rel.name+" "+fact.obj.name)
+        vectors = embed_texts(
+            self.embeddings,
+            [fact.subj.name+" "+fact.rel.name+" "+fact.obj.name for fact in facts.facts],
+            batch_size=self.batch_size,
+        )
+        for fact, vector in zip(facts.facts, vectors):
+            fact.vector = vector
         return facts
\ No newline at end of file
@@ -1,7 +1,7 @@
 import dspy
-from tqdm import tqdm
 from typing import Union
 from hybridagi.embeddings.embeddings import Embeddings
+from .batch import embed_texts
 from hybridagi.core.graph_program import GraphProgram
 from hybridagi.core.datatypes import GraphProgramList
 
@@ -11,18 +11,22 @@ class GraphProgramEmbedder(dspy.Module):
 
     Attributes:
         embeddings (Embeddings): The pre-trained embedding model to be used for embedding graph programs.
+        batch_size (int): The number of distinct texts sent to the embedding model at once.
     """    
     def __init__(
             self,
-            embeddings: Embeddings
+            embeddings: Embeddings,
+            batch_size: int = 256,
         ):
         """
         Initialize the GraphProgramEmbedder.
 
         Parameters:
             embeddings (Embeddings): The pre-trained embedding model to be used for embedding graph programs.
+            batch_size (int): The number of distinct texts sent to the embedding model at once. Defaults to 256.
         """
         self.embeddings = embeddings
+        self.batch_size = batch_size
     
     def forward(self, prog_or_progs: Union[GraphProgram, GraphProgramList]) -> GraphProgramList:
         """
@@ -44,6 +48,7 @@ class GraphProgramEmbedder(dspy.Module):
             programs.progs = [prog_or_progs]
         else:
             programs = prog_or_progs
-        for prog in tqdm(programs.progs):
-            prog.vector = self.embeddings.embed_text(prog.description)
+        vectors = embed_texts(self.embeddings, [prog.description for prog in programs.progs], batch_size=self.batch_size)
+        for prog, vector in zip(programs.progs, vectors):
+            prog.vector = vector
         return programs
\ No newline at end of file
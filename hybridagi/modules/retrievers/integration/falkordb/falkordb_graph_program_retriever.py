@@ -2,13 +2,19 @@
 
 import numpy as np
 import dspy
-from typing import Union, Optional, List
+from typing import Union, Optional, List, Dict, Any
 from dsp.utils import dotdict
 from hybridagi.embeddings import Embeddings
 from hybridagi.memory import ProgramMemory
 from hybridagi.modules.retrievers import GraphProgramRetriever
 from hybridagi.core.datatypes import Query, QueryList, QueryWithGraphPrograms
 from hybridagi.core.pipeline import Pipeline
+from hybridagi.memory.integration.falkordb.falkordb_program_memory import PROGRAM_PROPERTIES
+
+SEARCH_QUERY = " ".join([
+    'CALL db.idx.vector.queryNodes("Program", "vector", $k, vecf32($vector)) YIELD node, score',
+    'WITH node AS p, score',
+    'RETURN '+PROGRAM_PROPERTIES+', score'])
 
 class FalkorDBGraphProgramRetriever(GraphProgramRetriever):
     """
@@ -47,7 +53,7 @@ class FalkorDBGraphProgramRetriever(GraphProgramRetriever):
         try:
             params = {"dim": self.embeddings.dim, "distance": self.distance}
             self.program_memory._graph.query(
-                "CREATE VECTOR INDEX FOR (p:GraphProgram) ON (p.vector) OPTIONS {dimension:$dim, similarityFunction:$distance}",
+                "CREATE VECTOR INDEX FOR (p:Program) ON (p.vector) OPTIONS {dimension:$dim, similarityFunction:$distance}",
                 params,
             )
         except Exception:
@@ -63,37 +69,58 @@ class FalkorDBGraphProgramRetriever(GraphProgramRetriever):
         Returns:
             QueryWithGraphPrograms: An instance of QueryWithGraphPrograms class which contains the query text and the retrieved graph programs.
         """
+        queries = self._queries(query_or_queries)
+        query_vectors = self.embeddings.embed_text([q.query for q in queries.queries])
+        params_list = self._search_params(query_vectors)
+        query_results = self.program_memory._query_many(SEARCH_QUERY, params_list)
+        return self._to_result(queries, query_results)
+
+    async def aforward(self, query_or_queries: Union[Query, QueryList]) -> QueryWithGraphPrograms:
+        """
+        Asynchronous version of `forward`, the queries are embedded asynchronously and their vector searches sent concurrently.
+
+        Parameters:
+            query_or_queries (Union[Query, QueryList]): An instance of Query or QueryList class which contains the query text.
+
+        Returns:
+            QueryWithGraphPrograms: The same result as `forward`.
+        """
+        queries = self._queries(query_or_queries)
+        query_vectors = await self.embeddings.aembed_text([q.query for q in queries.queries])
+        params_list = self._search_params(query_vectors)
+        query_results = await self.program_memory._aquery_many(SEARCH_QUERY, params_list)
+        return self._to_result(queries, query_results)
+
+    def _queries(self, query_or_queries: Union[Query, QueryList]) -> QueryList:
+        """Check the input and wrap a single query into a query list"""
         if not isinstance(query_or_queries, (Query, QueryList)):
             raise ValueError(f"{type(self).__name__} input must be a Query or QueryList")
         if isinstance(query_or_queries, Query):
             queries = QueryList()
             queries.queries = [query_or_queries]
-        else:
-            queries = query_or_queries
+            return queries
+        return query_or_queries
+
+    def _search_params(self, query_vectors: Any) -> List[Dict[str, Any]]:
+        """Build the parameters of the vector searches of the embedded queries"""
+        return [{"vector": list(vector), "k": int(2*self.k)} for vector in query_vectors]
+
+    def _to_result(self, queries: QueryList, query_results: List[Any]) -> QueryWithGraphPrograms:
+        """Merge the results of the vector searches of the queries"""
         result = QueryWithGraphPrograms()
         result.queries.queries = queries.queries
-        query_vectors = self.embeddings.embed_text([q.query for q in queries.queries])
         items = []
         indexes = {}
-        for vector in query_vectors:
-            params = {"vector": list(vector), "k": int(2*self.k)}
-            query = " ".join([
-                'CALL db.idx.vector.queryNodes("GraphProgram", "vector", $k, vecf32($vector)) YIELD node, score',
-                'RETURN node.id AS id, score'])
-            query_result = self.program_memory._graph.query(
-                query,
-                params = params,
-            )
+        for query_result in query_results:
             if len(query_result.result_set) > 0:
                 for record in query_result.result_set:
                     if record[0] not in indexes:
                         indexes[record[0]] = True
                     else:
                         continue
-                    programs_list = self.program_memory.get(record[0])
-                    distance = float(record[1])
+                    distance = float(record[-1])
                     if distance < self.max_distance:
-                        items.extend([{"prog": programs_list.progs[0], "distance": distance}])
+                        items.extend([{"prog": self.program_memory._to_program(record), "distance": distance}])
         if len(items) > 0:
             sorted_items = sorted(
                 items,
@@ -1,3 +1,4 @@
+from .faiss_retriever import FAISSRetriever
 from .faiss_document_retriever import FAISSDocumentRetriever
 from .faiss_entity_retriever import FAISSEntityRetriever
 from .faiss_action_retriever import FAISSActionRetriever
@@ -5,6 +6,7 @@ from .faiss_fact_retriever import FAISSFactRetriever
 from .faiss_graph_program_retriever import FAISSGraphProgramRetriever
 
 __all__ = [
+    FAISSRetriever,
     FAISSDocumentRetriever,
     FAISSEntityRetriever,
     FAISSActionRetriever,
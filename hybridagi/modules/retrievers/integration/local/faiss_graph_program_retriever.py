@@ -1,19 +1,13 @@
 import dspy
-import numpy as np
-from enum import Enum
-from typing import Optional, Union
-import faiss
+from typing import Any, Dict, List, Optional
 from hybridagi.memory import ProgramMemory
 from hybridagi.embeddings import Embeddings
-from hybridagi.core.datatypes import Query, QueryList, QueryWithGraphPrograms
+from hybridagi.core.datatypes import QueryWithGraphPrograms
 from hybridagi.modules.retrievers import GraphProgramRetriever
 from hybridagi.core.pipeline import Pipeline
+from .faiss_retriever import FAISSRetriever
 
-class EmbeddingsDistance(str, Enum):
-    Cosine = "cosine"
-    Euclidean = "euclidean"
-
-class FAISSGraphProgramRetriever(GraphProgramRetriever):
+class FAISSGraphProgramRetriever(FAISSRetriever, GraphProgramRetriever):
     """
     A class for retrieving graph programs using FAISS (Facebook AI Similarity Search) and embeddings.
 
@@ -25,8 +19,18 @@ class FAISSGraphProgramRetriever(GraphProgramRetriever):
         k (int, optional): The number of nearest neighbors to retrieve. Defaults to 5.
         reverse (bool, optional): Weither or not to reverse the final result. Default to True.
         reranker (Optional[Pipeline], optional): An instance of Pipeline class which is used to re-rank the retrieved graph programs. Defaults to None.
+        index_type (str, optional): The type of vector index, either "flat" (exact), "hnsw", "ivf_flat" or "ivf_pq" (approximate), or "sq_fp16", "sq_int8" or "binary" (quantized). Defaults to "flat".
+        index_params (Optional[Dict[str, Any]], optional): The parameters of the vector index (e.g. nlist, M, m, train_size, rerank_factor). Defaults to None.
+        nprobe (Optional[int], optional): The number of inverted lists visited at search time for the IVF indexes. Defaults to None.
+        ef_search (Optional[int], optional): The size of the candidate list at search time for the HNSW index. Defaults to None.
+        fusion (str, optional): How the results of multiple queries are merged, either "distance" (best distance per item) or "rrf" (reciprocal rank fusion). Defaults to "distance".
     """
-    
+
+    _memory_attribute = "program_memory"
+    _embeddings_attribute = "_embeddings"
+    _result_type = QueryWithGraphPrograms
+    _result_attribute = "progs"
+
     def __init__(
             self,
             program_memory: ProgramMemory,
@@ -36,64 +40,29 @@ class FAISSGraphProgramRetriever(GraphProgramRetriever):
             k: int = 5,
             reverse: bool = True,
             reranker: Optional[Pipeline] = None,
+            index_type: str = "flat",
+            index_params: Optional[Dict[str, Any]] = None,
+            nprobe: Optional[int] = None,
+            ef_search: Optional[int] = None,
+            fusion: str = "distance",
         ):
         self.program_memory = program_memory
-        self.embeddings = embeddings
-        if distance == EmbeddingsDistance.Cosine:
-            self.distance = EmbeddingsDistance.Cosine
-        elif distance == EmbeddingsDistance.Euclidean:
-            self.distance = EmbeddingsDistance.Euclidean
-        else:
-            raise ValueError("Invalid distance provided, should be cosine or euclidean") 
-        self.max_distance = max_distance
-        self.reranker = reranker
-        self.k = k
-        self.reverse = reverse
-        vector_dim = self.embeddings.dim
-        if self.distance == "euclidean":
-            self.index = faiss.IndexFlatL2(vector_dim)
-        else:
-            self.index = faiss.IndexFlatIP(vector_dim)
-    
-    def forward(self, query_or_queries: Union[Query, QueryList]) -> QueryWithGraphPrograms:
-        """
-        Retrieve graph programs based on the given query.
-
-        Parameters:
-            query_or_queries (Union[Query, QueryList]): An instance of Query class which contains the query text.
+        super().__init__(
+            embeddings = embeddings,
+            distance = distance,
+            max_distance = max_distance,
+            k = k,
+            reverse = reverse,
+            reranker = reranker,
+            index_type = index_type,
+            index_params = index_params,
+            nprobe = nprobe,
+            ef_search = ef_search,
+            fusion = fusion,
+        )
 
-        Returns:
-            QueryWithGraphPrograms: An instance of QueryWithGraphPrograms class which contains the query text and the retrieved graph programs.
-        """
-        if not isinstance(query_or_queries, (Query, QueryList)):
-            raise ValueError(f"{type(self).__name__} input must be a Query or QueryList")
-        if isinstance(query_or_queries, Query):
-            queries = QueryList()
-            queries.queries = [query_or_queries.query]
-        else:
-            queries = query_or_queries
-        result = QueryWithGraphPrograms()
-        result.queries.queries = queries.queries
-        embeddings_map = self.program_memory._embeddings
-        vectors = np.array(list(embeddings_map.values()), dtype="float32")
-        if vectors.shape[0] > 0:
-            self.index.reset()
-            if self.distance == "euclidean":
-                faiss.normalize_L2(vectors)
-            self.index.add(vectors)
-            query_vectors = np.array(self.embeddings.embed_text([q.query for q in queries.queries]), dtype="float32")
-            distances, indexes = self.index.search(query_vectors, min(vectors.shape[0], self.k))
-            for i in range(min(vectors.shape[0], self.k)):
-                if distances[0][i] < self.max_distance:
-                    progran_index = indexes[0][i]
-                    program_id = list(embeddings_map.keys())[progran_index]
-                    if not self.program_memory.is_protected(program_id):
-                        program = self.program_memory.get(program_id).progs[0]
-                        result.progs.append(program)
-                else:
-                    break
-            if self.reranker is not None:
-                result = self.reranker(result)
-            if self.reverse:
-                result.progs.reverse()
-        return result
\ No newline at end of file
+    def _get_outputs(self, ids: List[str]) -> List[Any]:
+        return [
+            self.program_memory.get(program_id).progs[0]
+            for program_id in ids if not self.program_memory.is_protected(program_id)
+        ]
@@ -0,0 +1,116 @@
+from typing import Any, Dict, List, Optional, Union
+from hybridagi.embeddings import Embeddings
+from hybridagi.core.datatypes import Query, QueryList
+from hybridagi.core.pipeline import Pipeline
+from hybridagi.memory.integration.local.vector_index import EmbeddingsDistance, FusionMethod, merge_neighbors
+
+class FAISSRetriever():
+    """
+    The base class of the FAISS retrievers, searching the vector index of a local memory.
+
+    The subclasses only define where the vectors are and how the retrieved IDs become outputs:
+
+    Attributes:
+        _memory_attribute (str): The attribute holding the local memory, e.g. "document_memory".
+        _embeddings_attribute (str): The embeddings of the memory to search, e.g. "_embeddings".
+        _result_type (type): The type of the result, e.g. QueryWithDocuments.
+        _result_attribute (str): The list of the result where the outputs are added, e.g. "docs".
+    """
+    _memory_attribute: str
+    _embeddings_attribute: str = "_embeddings"
+    _result_type: type
+    _result_attribute: str
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            distance: str = "cosine",
+            max_distance: float = 0.7,
+            k: int = 5,
+            reverse: bool = True,
+            reranker: Optional[Pipeline] = None,
+            index_type: str = "flat",
+            index_params: Optional[Dict[str, Any]] = None,
+            nprobe: Optional[int] = None,
+            ef_search: Optional[int] = None,
+            fusion: str = "distance",
+        ):
+        self.embeddings = embeddings
+        if distance == EmbeddingsDistance.Cosine:
+            self.distance = EmbeddingsDistance.Cosine
+        elif distance == EmbeddingsDistance.Euclidean:
+            self.distance = EmbeddingsDistance.Euclidean
+        else:
+            raise ValueError("Invalid distance provided, should be cosine or euclidean")
+        self.max_distance = max_distance
+        self.reranker = reranker
+        self.k = k
+        self.index_type = index_type
+        self.index_params = index_params
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        if fusion not in (FusionMethod.Distance, FusionMethod.RRF):
+            raise ValueError("Invalid fusion provided, should be distance or rrf")
+        self.fusion = FusionMethod(fusion)
+        self.reverse = reverse
+
+    def _get_outputs(self, ids: List[str]) -> List[Any]:
+        """
+        Get the outputs of the retrieved IDs, in the given order.
+
+        Parameters:
+            ids (List[str]): The retrieved IDs, the closest first.
+
+        Returns:
+            List[Any]: The outputs added to the result.
+        """
+        raise NotImplementedError(
+            f"FAISSRetriever {type(self).__name__} is missing the required '_get_outputs' method."
+        )
+
+    def forward(self, query_or_queries: Union[Query, QueryList]):
+        """
+        Retrieve the closest items of the memory to the given queries.
+
+        Parameters:
+            query_or_queries (Union[Query, QueryList]): An instance of Query or QueryList class which contains the query text.
+
+        Returns:
+            The result (see `_result_type`) containing the queries and the retrieved items.
+        """
+        if not isinstance(query_or_queries, (Query, QueryList)):
+            raise ValueError(f"{type(self).__name__} input must be a Query or QueryList")
+        if isinstance(query_or_queries, Query):
+            queries = QueryList()
+            queries.queries = [query_or_queries]
+        else:
+            queries = query_or_queries
+        result = self._result_type()
+        result.queries.queries = queries.queries
+        index = getattr(self, self._memory_attribute).get_vector_index(
+            self._embeddings_attribute,
+            distance = self.distance.value,
+            dim = self.embeddings.dim,
+            index_type = self.index_type,
+            index_params = self.index_params,
+        )
+        if len(index) > 0:
+            query_vectors = self.embeddings.embed_text([q.query for q in queries.queries])
+            neighbors = index.search(
+                query_vectors,
+                self.k,
+                nprobe = self.nprobe,
+                ef_search = self.ef_search,
+            )
+            ids = merge_neighbors(
+                neighbors,
+                self.k,
+                max_distance = self.max_distance,
+                fusion = self.fusion.value,
+            )
+            getattr(result, self._result_attribute).extend(self._get_outputs(ids))
+            if self.reranker is not None:
+                result = self.reranker(result)
+            if self.reverse:
+                getattr(result, self._result_attribute).reverse()
+        return result
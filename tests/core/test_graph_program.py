@@ -1,3 +1,6 @@
+import time
+import pytest
+from pydantic import ValidationError
 import hybridagi.core.graph_program as gp
 
 def test_graph_program_empty():
@@ -140,4 +143,209 @@ CREATE
 (is_objective_unclear)-[:ANSWER]->(answer),
 (clarify)-[:NEXT]->(refine_objective),
 (refine_objective)-[:NEXT]->(answer),
-(answer)-[:NEXT]->(end)"""
\ No newline at end of file
+(answer)-[:NEXT]->(end)"""
+def test_compiled_program():
+    main=gp.GraphProgram(name="main", description="The main program")
+    
+    main.add(gp.Decision(
+        id = "is_objective_unclear",
+        purpose = "Check if the Objective is unclear",
+        question="Is the Objective's question still unclear?",
+    ))
+    
+    main.add(gp.Action(
+        id = "clarify",
+        purpose = "Ask one question to clarify the Objective",
+        tool = "AskUser",
+        prompt = "Pick one question to clarify the Objective's question",
+    ))
+    
+    main.add(gp.Action(
+        id = "answer",
+        purpose = "Answer the Objective's question",
+        tool = "Speak",
+        prompt = "Please answer to the Objective's question",
+    ))
+    
+    main.connect("start", "is_objective_unclear")
+    main.connect("is_objective_unclear", "clarify", label="Clarify")
+    main.connect("is_objective_unclear", "answer", label="Answer")
+    main.connect("clarify", "answer")
+    main.connect("answer", "end")
+    
+    main.build()
+    
+    compiled = main.compiled()
+    assert compiled is main.compiled()
+    assert compiled.name == "main"
+    assert compiled.get_starting_step() == main.get_starting_step()
+    assert compiled.get_decision_choices("is_objective_unclear") == main.get_decision_choices("is_objective_unclear")
+    for step_id in ["start", "clarify", "answer", "end"]:
+        assert compiled.get_next_step(step_id) == main.get_next_step(step_id)
+    for choice in ["CLARIFY", "ANSWER"]:
+        assert compiled.get_decision_next_step("is_objective_unclear", choice) == \
+            main.get_decision_next_step("is_objective_unclear", choice)
+    with pytest.raises(ValueError):
+        compiled.get_next_step("is_objective_unclear")
+    with pytest.raises(ValueError):
+        compiled.get_decision_next_step("is_objective_unclear", "MAYBE")
+    with pytest.raises(ValueError):
+        compiled.get("unknown")
+    with pytest.raises(ValidationError):
+        compiled.name = "other"
+    
+    # Modifying the program invalidates its compiled form
+    main.add(gp.Action(
+        id = "elaborate",
+        purpose = "Elaborate",
+        tool = "Speak",
+        prompt = "Elaborate",
+    ))
+    assert main.compiled() is not compiled
+    assert main.compiled().get("elaborate").id == "elaborate"
+
+def test_build_errors():
+    main = gp.GraphProgram(name="main", description="The main program")
+    
+    main.add(gp.Action(id="answer", purpose="Answer", tool="Speak", prompt="Answer"))
+    main.add(gp.Action(id="orphan", purpose="Orphan", tool="Speak", prompt="Orphan"))
+    main.add(gp.Action(id="dead_end", purpose="Dead end", tool="Speak", prompt="Dead end"))
+    
+    main.connect("start", "answer")
+    main.connect("answer", "end")
+    main.connect("orphan", "end")
+    main.add(gp.Decision(id="is_done", purpose="Check", question="Is it done?"))
+    main.connect("is_done", "dead_end", label="No")
+    
+    with pytest.raises(ValueError) as e:
+        main.build()
+    assert str(e.value).split("\n") == [
+        "There is no path from the Start Step to orphan Step.",
+        "There is no path from the Start Step to dead_end Step.",
+        "There is no path from dead_end Step to the End Step.",
+        "There is no path from the Start Step to is_done Step.",
+        "There is no path from is_done Step to the End Step.",
+    ]
+
+def test_build_large_program():
+    num_steps = 5000
+    main = gp.GraphProgram(name="main", description="A large program")
+    previous_step = "start"
+    for i in range(num_steps):
+        main.add(gp.Action(id=f"step_{i}", purpose=f"Step {i}", tool="Speak", prompt=f"Step {i}"))
+        main.connect(previous_step, f"step_{i}")
+        previous_step = f"step_{i}"
+    main.connect(previous_step, "end")
+    
+    start = time.perf_counter()
+    main.build()
+    elapsed = time.perf_counter() - start
+    # The quadratic validation took tens of seconds for this program
+    assert elapsed < 2.0
+    assert len(main.compiled().steps) == num_steps + 2
+
+def test_from_cypher_special_characters():
+    main = gp.GraphProgram(name="main", description="The main program")
+    
+    main.add(gp.Action(
+        id = "answer",
+        purpose = "Answer the Objective's question",
+        tool = "Speak",
+        prompt = "Answer using {{context}} (see http://example.com/{page}) and \"quote\" it })",
+        var_in = ["context"],
+    ))
+    
+    main.connect("start", "answer")
+    main.connect("answer", "end")
+    
+    main.build()
+    
+    cypher = main.to_cypher()
+    program = gp.GraphProgram(name="main").from_cypher(cypher)
+    assert program.get("answer").prompt == main.get("answer").prompt
+    assert program.to_cypher() == cypher
+
+def test_parse_cypher_cache():
+    cypher = \
+"""// @desc: The cached program
+CREATE
+// Nodes declaration
+(start:Control {id: "start"}),
+(end:Control {id: "end"}),
+(answer:Action {
+  id: "answer",
+  purpose: "Answer the Objective's question",
+  tool: "Speak",
+  prompt: "Please answer to the Objective's question"
+}),
+// Structure declaration
+(start)-[:NEXT]->(answer),
+(answer)-[:NEXT]->(end)"""
+    parsed = gp.parse_cypher(cypher)
+    assert parsed.description == "The cached program"
+    assert [(step_id, step_type) for step_id, step_type, _ in parsed.nodes] == \
+        [("start", "Control"), ("end", "Control"), ("answer", "Action")]
+    assert parsed.relations == (("start", "NEXT", "answer"), ("answer", "NEXT", "end"))
+    hits = gp.parse_cypher.cache_info().hits
+    first = gp.GraphProgram(name="first").from_cypher(cypher)
+    second = gp.GraphProgram(name="second").from_cypher(cypher)
+    assert gp.parse_cypher.cache_info().hits == hits + 2
+    assert first.to_cypher() == second.to_cypher() == cypher
+    # The programs built from the cache are independent
+    second.add(gp.Action(id="other", purpose="Other", tool="Speak", prompt="Other"))
+    assert "other" not in first.steps
+
+def test_compiled_prompts():
+    prompt = "Answer using {{context}}{% if notes %} and {{notes}}{% endif %}"
+    assert gp.compile_prompt(prompt) is gp.compile_prompt(prompt)
+    assert gp.compile_prompt(prompt).render(context="the context") == "Answer using the context"
+    assert gp.prompt_variables(prompt) == frozenset({"context", "notes"})
+
+def test_build_prompt_variables():
+    main = gp.GraphProgram(name="main", description="The main program")
+    
+    main.add(gp.Action(
+        id = "answer",
+        purpose = "Answer the Objective's question",
+        tool = "Speak",
+        prompt = "Answer using {{context}} and {{notes}}",
+        var_in = ["context"],
+    ))
+    main.add(gp.Action(
+        id = "invalid",
+        purpose = "Invalid prompt",
+        tool = "Speak",
+        prompt = "Answer using {{context",
+    ))
+    
+    main.connect("start", "answer")
+    main.connect("answer", "invalid")
+    main.connect("invalid", "end")
+    
+    with pytest.raises(ValueError) as e:
+        main.build(strict=True)
+    errors = str(e.value).split("\n")
+    assert errors[0] == "Action answer prompt uses variables not declared in its var_in: notes."
+    assert errors[1].startswith("Action invalid prompt is not a valid template")
+    # Only warnings when not strict
+    with pytest.warns(UserWarning, match="is not a valid template"):
+        main.build()
+
+def test_build_undeclared_prompt_variables_warns():
+    main = gp.GraphProgram(name="main", description="The main program")
+    
+    main.add(gp.Action(
+        id = "answer",
+        purpose = "Answer the Objective's question",
+        tool = "Speak",
+        prompt = "Answer using {% for doc in documents %}{{loop.index}}. {{doc}} {% endfor %}{{notes}}",
+        var_in = ["documents"],
+    ))
+    
+    main.connect("start", "answer")
+    main.connect("answer", "end")
+    
+    with pytest.warns(UserWarning, match="Action answer prompt uses variables not declared in its var_in: notes."):
+        main.build()
+    main.steps["answer"].var_in = ["documents", "notes"]
+    main.build(strict=True)
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import time
+import dspy
+import pytest
+from dspy.utils.dummies import DummyLM
+from hybridagi.core.lm_cache import CachedLM
+
+class QA(dspy.Signature):
+    """Answer the question"""
+    question = dspy.InputField()
+    answer = dspy.OutputField()
+
+def test_cached_lm_hits():
+    lm = DummyLM(answers={"France": "Paris", "Italy": "Rome"})
+    cached_lm = CachedLM(lm)
+    predict = dspy.Predict(QA)
+    with dspy.context(lm=cached_lm):
+        assert predict(question="What is the capital of France?").answer == "Paris"
+        assert predict(question="What is the capital of France?").answer == "Paris"
+        assert predict(question="What is the capital of Italy?").answer == "Rome"
+    assert cached_lm.hits == 1
+    assert cached_lm.misses == 2
+    assert len(lm.history) == 2
+
+def test_cached_lm_key():
+    cached_lm = CachedLM(DummyLM(answers=["Paris"]))
+    key = cached_lm.cache_key("Question: What is the capital of France?\nAnswer:")
+    assert key == cached_lm.cache_key("Question: What is the capital of France?  \nAnswer: ")
+    assert key != cached_lm.cache_key("Question: What is the capital of France?\nAnswer:", temperature=0.7)
+    assert key != cached_lm.cache_key("Question: What is the capital of Italy?\nAnswer:")
+
+def test_cached_lm_persistence(tmp_path):
+    path = os.path.join(tmp_path, "lm_cache.db")
+    cached_lm = CachedLM(DummyLM(answers=["Paris"]), path=path)
+    assert cached_lm("What is the capital of France?") == ["Paris"]
+    cached_lm.close()
+    lm = DummyLM(answers=["Not Paris"])
+    cached_lm = CachedLM(lm, path=path)
+    assert cached_lm("What is the capital of France?") == ["Paris"]
+    assert cached_lm.hits == 1
+    assert len(lm.history) == 0
+    cached_lm.clear()
+    assert cached_lm("What is the capital of France?") == ["Not Paris"]
+    cached_lm.close()
+
+def test_cached_lm_eviction(tmp_path):
+    path = os.path.join(tmp_path, "lm_cache.db")
+    cached_lm = CachedLM(DummyLM(answers=["A", "B", "C", "D"]), path=path, max_size=2)
+    cached_lm("first")
+    cached_lm("second")
+    cached_lm("third")
+    assert cached_lm._connection.execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 2
+    assert cached_lm("first") == ["D"]
+    cached_lm.close()
+
+def test_cached_lm_ttl():
+    cached_lm = CachedLM(DummyLM(answers=["Paris", "Paris again"]), ttl=0.05)
+    assert cached_lm("What is the capital of France?") == ["Paris"]
+    time.sleep(0.1)
+    assert cached_lm("What is the capital of France?") == ["Paris again"]
+    assert cached_lm.misses == 2
+
+def test_cached_lm_bypass():
+    cached_lm = CachedLM(DummyLM(answers=["Paris", "Paris again"]), bypass=True)
+    assert cached_lm("What is the capital of France?") == ["Paris"]
+    assert cached_lm("What is the capital of France?") == ["Paris again"]
+    assert cached_lm.hits == 0
+
+def test_cached_lm_invalid_parameters():
+    with pytest.raises(ValueError):
+        CachedLM(DummyLM(answers=[]), max_size=0)
+    with pytest.raises(ValueError):
+        CachedLM(DummyLM(answers=[]), ttl=0)
+
+def test_cached_lm_concurrent_counters():
+    cached_lm = CachedLM(DummyLM(answers={"capital": "Paris"}))
+    prompts = [f"What is the capital of country {i % 10}?" for i in range(2000)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(cached_lm, prompts))
+    assert cached_lm.hits + cached_lm.misses == len(prompts)
@@ -0,0 +1,81 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from hybridagi.embeddings import CachedEmbeddings, FakeEmbeddings
+
+class CountingEmbeddings(FakeEmbeddings):
+
+    def __init__(self, dim: int):
+        super().__init__(dim=dim)
+        self.calls = []
+
+    def embed_text(self, query_or_queries):
+        self.calls.append(query_or_queries)
+        return super().embed_text(query_or_queries)
+
+@pytest.fixture
+def backend():
+    return CountingEmbeddings(dim=8)
+
+def test_cached_embeddings_single(backend):
+    embeddings = CachedEmbeddings(backend)
+    first = embeddings.embed_text("Hello")
+    second = embeddings.embed_text("Hello")
+    assert first.shape == (8,)
+    assert np.array_equal(first, second)
+    assert len(backend.calls) == 1
+    assert embeddings.hits == 1 and embeddings.misses == 1
+
+def test_cached_embeddings_only_embed_missing(backend):
+    embeddings = CachedEmbeddings(backend)
+    first = embeddings.embed_text(["a", "b"])
+    result = embeddings.embed_text(["b", "c", "c", "a"])
+    assert result.shape == (4, 8)
+    assert backend.calls[-1] == ["c"]
+    assert np.array_equal(result[0], first[1])
+    assert np.array_equal(result[3], first[0])
+    assert np.array_equal(result[1], result[2])
+
+def test_cached_embeddings_lru_eviction(backend):
+    embeddings = CachedEmbeddings(backend, max_size=2)
+    embeddings.embed_text(["a", "b", "c"])
+    assert len(embeddings._cache) == 2
+    embeddings.embed_text("a")
+    assert backend.calls[-1] == ["a"]
+
+def test_cached_embeddings_on_disk(backend, tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    embeddings = CachedEmbeddings(backend, path=path)
+    vectors = embeddings.embed_text(["a", "b"])
+    embeddings.close()
+    reopened = CachedEmbeddings(backend, path=path)
+    assert np.array_equal(reopened.embed_text(["a", "b"]), vectors)
+    assert len(backend.calls) == 1
+    other_model = CachedEmbeddings(backend, path=path, model_name="other")
+    other_model.embed_text("a")
+    assert len(backend.calls) == 2
+
+def test_cached_embeddings_returns_copies(backend, tmp_path):
+    embeddings = CachedEmbeddings(backend, path=str(tmp_path / "embeddings.db"))
+    expected = embeddings.embed_text("a").copy()
+    embeddings.embed_text("a")[:] = 0
+    embeddings.embed_text(["a", "b"])[0] = 0
+    assert np.array_equal(embeddings.embed_text("a"), expected)
+    embeddings.close()
+    reopened = CachedEmbeddings(backend, path=str(tmp_path / "embeddings.db"))
+    vector = reopened.embed_text("a")
+    assert vector.flags.writeable
+    vector += 1
+    assert np.array_equal(reopened.embed_text("a"), expected)
+
+def test_cached_embeddings_empty_string(backend):
+    embeddings = CachedEmbeddings(backend)
+    with pytest.raises(ValueError):
+        embeddings.embed_text("")
+
+def test_cached_embeddings_concurrent_counters(backend):
+    embeddings = CachedEmbeddings(backend)
+    texts = [f"text {i % 10}" for i in range(2000)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(embeddings.embed_text, texts))
+    assert embeddings.hits + embeddings.misses == len(texts)
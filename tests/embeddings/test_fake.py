@@ -34,3 +34,8 @@ def test_embed_image_multiple(fake_embeddings):
     for emb in embeddings:
         assert emb.shape[0] == fake_embeddings.dim
         assert np.isclose(np.linalg.norm(emb), 1.0, atol=1e-5)
+
+def test_aembed_text(fake_embeddings):
+    import asyncio
+    embeddings = asyncio.run(fake_embeddings.aembed_text(["Hello", "World"]))
+    assert len(embeddings) == 2
@@ -1,5 +1,10 @@
+import json
+import time
+import asyncio
+import threading
 import pytest
 import numpy as np
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import MagicMock
 
 # Assuming that hybridagi.embeddings.ollama.OllamaEmbeddings can be imported without needing the server
@@ -83,4 +88,110 @@ def test_ollama_import_error(monkeypatch):
     
     with pytest.raises(ImportError) as exc_info:
         OllamaEmbeddings()
-    assert "You need to install ollama library" in str(exc_info.value)
\ No newline at end of file
+    assert "You need to install ollama library" in str(exc_info.value)
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """A stub of the Ollama embed endpoint, the vector of "Query i" is [i, 1]"""
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            failing = server.failures > 0
+            if failing:
+                server.failures -= 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(0.05)
+        with server.lock:
+            server.in_flight -= 1
+        if failing:
+            self.send_response(500)
+            self.end_headers()
+            self.wfile.write(b'{"error": "overloaded"}')
+            return
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data = json.dumps({
+            "model": body["model"],
+            "embeddings": [[float(text.split()[-1]), 1.0] for text in texts],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.failures = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def stub_embeddings(server, **kwargs):
+    return OllamaEmbeddings(
+        model_name="stub",
+        dim=2,
+        host=f"http://127.0.0.1:{server.server_address[1]}",
+        retry_delay=0.01,
+        **kwargs,
+    )
+
+def test_concurrent_batches_keep_order(stub_server):
+    embeddings = stub_embeddings(stub_server, batch_size=2, max_concurrency=4)
+    queries = [f"Query {i}" for i in range(15)]
+    result = embeddings.embed_text(queries)
+    assert result.shape == (15, 2)
+    assert result[:, 0].tolist() == list(range(15))
+    assert stub_server.requests == 8
+    assert 1 < stub_server.max_in_flight <= 4
+
+def test_sequential_batches(stub_server):
+    embeddings = stub_embeddings(stub_server, batch_size=2)
+    embeddings.embed_text([f"Query {i}" for i in range(6)])
+    assert stub_server.max_in_flight == 1
+
+def test_retry_on_server_error(stub_server):
+    stub_server.failures = 2
+    embeddings = stub_embeddings(stub_server, max_retries=2)
+    embedding = embeddings.embed_text("Query 7")
+    assert embedding.tolist() == [7.0, 1.0]
+    assert stub_server.requests == 3
+
+def test_retry_gives_up(stub_server):
+    stub_server.failures = 2
+    embeddings = stub_embeddings(stub_server, max_retries=1)
+    with pytest.raises(Exception):
+        embeddings.embed_text("Query 7")
+
+def test_aembed_text(stub_server):
+    stub_server.failures = 1
+    embeddings = stub_embeddings(stub_server, batch_size=3, max_concurrency=2)
+    result = asyncio.run(embeddings.aembed_text([f"Query {i}" for i in range(10)]))
+    assert result[:, 0].tolist() == list(range(10))
+    assert stub_server.max_in_flight <= 2
+    single = asyncio.run(embeddings.aembed_text("Query 3"))
+    assert single.tolist() == [3.0, 1.0]
+
+def test_aembed_text_reuses_async_client(stub_server):
+    embeddings = stub_embeddings(stub_server)
+
+    async def embed_twice():
+        await embeddings.aembed_text("Query 1")
+        client = embeddings._async_client()
+        await embeddings.aembed_text(["Query 2", "Query 3"])
+        assert embeddings._async_client() is client
+        await embeddings.aclose()
+        assert embeddings._async_client() is not client
+
+    asyncio.run(embed_twice())
@@ -29,3 +29,20 @@ def test_embed_image_not_implemented(sentence_transformer_embeddings):
 def test_embed_text_empty_input(sentence_transformer_embeddings):
     with pytest.raises(ValueError):
         sentence_transformer_embeddings.embed_text("")
+
+def test_embed_text_cpu_pool():
+    with SentenceTransformerEmbeddings(
+            model_name_or_path="all-MiniLM-L6-v2",
+            dim=384,
+            batch_size=2,
+            num_workers=2,
+        ) as embeddings:
+        queries = ["Hello", "World", "Foo", "Bar", "Baz"]
+        first = embeddings.embed_text(queries)
+        pool = embeddings.pool
+        second = embeddings.embed_text(queries)
+        assert pool is not None and embeddings.pool is pool
+        assert first.shape == (5, 384)
+        assert np.allclose(first, second, atol=1e-5)
+        assert np.allclose(np.linalg.norm(first, axis=1), 1.0, atol=1e-5)
+    assert embeddings.pool is None
@@ -0,0 +1,55 @@
+import json
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from hybridagi.core.datatypes import Document, DocumentList
+from hybridagi.memory.integration.falkordb import FalkorDBDocumentMemory
+
+@pytest.fixture(autouse=True)
+def falkordb_clients():
+    with patch("hybridagi.memory.integration.falkordb.falkordb_memory.FalkorDB") as client, \
+            patch("hybridagi.memory.integration.falkordb.falkordb_memory.AsyncFalkorDB") as async_client:
+        yield client, async_client
+
+def mock_result(rows):
+    result = MagicMock()
+    result.result_set = rows
+    return result
+
+def test_falkordb_document_memory_async_client_is_lazy(falkordb_clients):
+    _, async_client = falkordb_clients
+    memory = FalkorDBDocumentMemory(index_name="test_async")
+    async_client.assert_not_called()
+    graph = memory.get_async_graph()
+    assert memory.get_async_graph() is graph
+    async_client.assert_called_once()
+    async_client.return_value.select_graph.assert_called_once_with("test_async:"+memory.graph_index)
+
+def test_falkordb_document_memory_aupdate_batches():
+    memory = FalkorDBDocumentMemory(index_name="test_async", batch_size=2)
+    memory._graph = MagicMock()
+    memory._async_graph = MagicMock()
+    memory._async_graph.query = AsyncMock()
+    docs = DocumentList()
+    docs.docs = [Document(text=f"doc {i}") for i in range(3)]
+    asyncio.run(memory.aupdate(docs))
+    memory._graph.query.assert_not_called()
+    # 2 batches for the documents and 2 for the relationships deletion, no parents
+    assert memory._async_graph.query.await_count == 4
+
+def test_falkordb_document_memory_aget():
+    memory = FalkorDBDocumentMemory(index_name="test_async")
+    memory._async_graph = MagicMock()
+    memory._async_graph.query = AsyncMock(return_value=mock_result([
+        ["b", "second", None, json.dumps({}), None],
+        ["a", "first", None, json.dumps({}), None],
+    ]))
+    docs = asyncio.run(memory.aget(["a", "b"])).docs
+    assert [doc.text for doc in docs] == ["first", "second"]
+
+def test_falkordb_document_memory_aquery_many_concurrent():
+    memory = FalkorDBDocumentMemory(index_name="test_async")
+    memory._async_graph = MagicMock()
+    memory._async_graph.query = AsyncMock(side_effect=lambda query, params: mock_result([[params["k"]]]))
+    results = asyncio.run(memory._aquery_many("RETURN $k", [{"k": 1}, {"k": 2}, {"k": 3}]))
+    assert [result.result_set[0][0] for result in results] == [1, 2, 3]
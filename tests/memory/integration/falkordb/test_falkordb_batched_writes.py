@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from hybridagi.memory.integration.falkordb import (
+    FalkorDBDocumentMemory,
+    FalkorDBFactMemory,
+    FalkorDBProgramMemory,
+    FalkorDBTraceMemory,
+)
+from hybridagi.core.datatypes import Document, DocumentList, Entity, FactList, AgentStep, AgentStepList, AgentStepType
+import hybridagi.core.graph_program as gp
+
+@pytest.fixture(autouse=True)
+def falkordb_client():
+    with patch("hybridagi.memory.integration.falkordb.falkordb_memory.FalkorDB") as client:
+        yield client
+
+def mock_graph(memory):
+    memory._graph = MagicMock()
+    return memory._graph
+
+def test_falkordb_document_memory_batched_update():
+    memory = FalkorDBDocumentMemory(index_name="test_batched_docs", batch_size=1000)
+    graph = mock_graph(memory)
+    parent = Document(text="parent")
+    docs = DocumentList()
+    docs.docs = [parent] + [Document(text=f"chunk {i}", parent_id=parent.id) for i in range(2499)]
+    memory.update(docs)
+    queries = [c.args[0] for c in graph.query.call_args_list]
+    assert len(queries) == 9
+    assert all(q.startswith("UNWIND $rows AS row") for q in queries)
+    rows = graph.query.call_args_list[0].kwargs["params"]["rows"]
+    assert len(rows) == 1000
+    assert rows[0]["id"] == str(parent.id)
+    part_of_rows = graph.query.call_args_list[6].kwargs["params"]["rows"]
+    assert all(row["parent_id"] == str(parent.id) for row in part_of_rows)
+
+def test_falkordb_document_memory_batched_remove():
+    memory = FalkorDBDocumentMemory(index_name="test_batched_docs", batch_size=2)
+    graph = mock_graph(memory)
+    memory.remove(["a", "b", "c"])
+    assert graph.query.call_count == 2
+    assert graph.query.call_args_list[1].kwargs["params"]["rows"] == ["c"]
+
+def test_falkordb_fact_memory_batched_update():
+    memory = FalkorDBFactMemory(index_name="test_batched_facts")
+    graph = mock_graph(memory)
+    facts = FactList().from_cypher("\n".join([
+        '(:Person {name:"Bob"})-[:KNOWS]->(:Person {name:"Ann"})',
+        '(:Person {name:"Ann"})-[:LIVES_IN]->(:City {name:"Paris"})',
+    ]))
+    memory.update(facts)
+    queries = [c.args[0] for c in graph.query.call_args_list]
+    assert len(queries) == 3
+    assert "MERGE (e:Entity {id: row.id}) ON CREATE SET e:Person," in queries[0]
+    assert "MERGE (e:Entity {id: row.id}) ON CREATE SET e:City," in queries[1]
+    assert "MERGE (s)-[r:FACT {_id_: row.id}]->(o)" in queries[2]
+    assert len(graph.query.call_args_list[2].kwargs["params"]["rows"]) == 2
+
+def test_falkordb_fact_memory_update_entity_label():
+    memory = FalkorDBFactMemory(index_name="test_batched_facts")
+    graph = mock_graph(memory)
+    entity = Entity(label="Person", name="Paris")
+    graph.query.return_value.result_set = []
+    memory.update(entity)
+    entity.label = "City"
+    graph.query.return_value.result_set = [[str(entity.id), "Person"]]
+    memory.update(entity)
+    queries = [c.args[0] for c in graph.query.call_args_list]
+    # Both updates look for a previous label then merge the same node on its id
+    assert "WHERE e.label <> row.label" in queries[0]
+    assert "MERGE (e:Entity {id: row.id}) SET e:Person," in queries[1]
+    assert "WHERE e.label <> row.label" in queries[2]
+    # The previous label is removed before setting the new one
+    assert queries[3] == "UNWIND $rows AS id MATCH (e:Entity {id: id}) REMOVE e:Person"
+    assert graph.query.call_args_list[3].kwargs["params"]["rows"] == [str(entity.id)]
+    assert "MERGE (e:Entity {id: row.id}) SET e:City," in queries[4]
+
+def test_falkordb_trace_memory_batched_update():
+    memory = FalkorDBTraceMemory(index_name="test_batched_trace")
+    graph = mock_graph(memory)
+    first = AgentStep(step_type=AgentStepType.Action, vector=[1.0, 0.0])
+    second = AgentStep(step_type=AgentStepType.Action, parent_id=first.id, vector=[0.0, 1.0])
+    steps = AgentStepList()
+    steps.steps = [first, second]
+    memory.update(steps)
+    assert graph.query.call_count == 2
+    assert len(graph.query.call_args_list[0].kwargs["params"]["rows"]) == 2
+    assert graph.query.call_args_list[1].kwargs["params"]["rows"] == [{"id": str(second.id), "parent_id": str(first.id)}]
+
+def test_falkordb_program_memory_batched_update():
+    memory = FalkorDBProgramMemory(index_name="test_batched_programs")
+    graph = mock_graph(memory)
+    main = gp.GraphProgram(name="main", description="The main program")
+    main.add(gp.Program(id="call", purpose="Call the subprogram", program="sub"))
+    main.connect("start", "call")
+    main.connect("call", "end")
+    main.build()
+    memory.update(main)
+    assert graph.query.call_count == 3
+    assert graph.query.call_args_list[2].kwargs["params"]["rows"] == [{"id": "main", "dep": "sub"}]
@@ -124,3 +124,17 @@
 #     assert memory.exist(entity1.id) == False
 #     assert memory.exist(entity2.id) == False
 #     assert memory.exist(fact.id) == False
+
+from hybridagi.memory.integration.falkordb.falkordb_fact_memory import FalkorDBFactMemory
+from hybridagi.core.datatypes import Entity
+
+def test_falkordb_fact_memory_update_entity_label_removes_previous_label():
+    memory = FalkorDBFactMemory(index_name="test_entity_label", wipe_on_start=True)
+    entity = Entity(label="Person", name="Paris")
+    memory.update(entity)
+    entity.label = "City"
+    memory.update(entity)
+    params = {"id": str(entity.id)}
+    assert len(memory._graph.query("MATCH (e:Person {id: $id}) RETURN e.id", params=params).result_set) == 0
+    assert len(memory._graph.query("MATCH (e:City {id: $id}) RETURN e.id", params=params).result_set) == 1
+    assert memory.get_entities(entity.id).entities[0].label == "City"
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from hybridagi.memory.integration.falkordb import (
+    FalkorDBConnectionPool,
+    FalkorDBDocumentMemory,
+    FalkorDBFactMemory,
+    GraphPipeline,
+)
+from hybridagi.memory.integration.falkordb.falkordb_pool import params_header
+from falkordb import Graph
+
+@pytest.fixture
+def pool():
+    with patch("hybridagi.memory.integration.falkordb.falkordb_pool.FalkorDB") as client:
+        yield FalkorDBConnectionPool(max_connections=4)
+
+def test_falkordb_memories_share_pool(pool):
+    document_memory = FalkorDBDocumentMemory(index_name="test_pool", pool=pool)
+    fact_memory = FalkorDBFactMemory(index_name="test_pool", pool=pool)
+    assert document_memory.client is pool.client
+    assert fact_memory.client is pool.client
+    assert pool.connection_pool.max_connections == 4
+
+def test_graph_pipeline_single_flush():
+    client = MagicMock()
+    pipe = client.connection.pipeline.return_value
+    # The raw compact responses of the server: statistics only, then header, rows and statistics
+    pipe.execute.return_value = [
+        [["Nodes created: 1", "Query internal execution time: 0.1 milliseconds"]],
+        [
+            [[1, "n"], [1, "name"]],
+            [[[3, 2], [2, "Paris"]]],
+            ["Nodes created: 2", "Query internal execution time: 0.2 milliseconds"],
+        ],
+    ]
+    graph = Graph(client, "test:graph")
+    pipeline = GraphPipeline(client)
+    assert pipeline.query(graph, "CREATE (:A)") == 0
+    assert pipeline.query(graph, "CREATE (:A), (:A) RETURN 2 AS n, $name AS name", params={"name": "Paris", "k": 3}) == 1
+    results = pipeline.execute()
+    pipe.execute.assert_called_once()
+    commands = [c.args for c in pipe.execute_command.call_args_list]
+    assert commands[0] == ("GRAPH.QUERY", "test:graph", "CREATE (:A)", "--compact")
+    assert commands[1][2] == 'CYPHER name="Paris" k=3 CREATE (:A), (:A) RETURN 2 AS n, $name AS name'
+    assert [r.nodes_created for r in results] == [1, 2]
+    assert results[1].result_set == [[2, "Paris"]]
+    assert len(pipeline) == 0
+
+def test_params_header():
+    assert params_header(None) == ""
+    assert params_header({"vector": [0.5, 1.0], "id": None, "label": 'say "hi"'}) == 'CYPHER vector=[0.5,1.0] id=null label="say \\"hi\\"" '
@@ -263,4 +263,31 @@ def test_local_program_memory_protected_prog():
     program_memory.update(clarify_objective)
 
     assert program_memory.is_protected("main")
-    assert program_memory.is_protected("clarify_objective")
\ No newline at end of file
+    assert program_memory.is_protected("clarify_objective")
+def test_falkorDB_program_memory_cache_other_process_update():
+    from hybridagi.memory import ProgramCache
+    program_memory = FalkorDBProgramMemory(index_name="test_cache_versions", wipe_on_start=True)
+    other_program_memory = FalkorDBProgramMemory(index_name="test_cache_versions")
+    
+    def make_main(description: str) -> gp.GraphProgram:
+        main = gp.GraphProgram(name="main", description=description)
+        main.add(gp.Action(
+            id="answer",
+            purpose=description,
+            tool="Speak",
+            prompt="Please answer to the Objective's question",
+        ))
+        main.connect("start", "answer")
+        main.connect("answer", "end")
+        main.build()
+        return main
+    
+    program_memory.update(make_main("Answer the Objective's question"))
+    cache = ProgramCache(program_memory)
+    assert cache.get("main").progs[0].get("answer").purpose == "Answer the Objective's question"
+    assert cache.get("main").progs[0].get("answer").purpose == "Answer the Objective's question"
+    assert cache.misses == 1
+    other_program_memory.update(make_main("Answer the Objective's question in French"))
+    assert cache.get("main").progs[0].get("answer").purpose == "Answer the Objective's question in French"
+    other_program_memory.remove("main")
+    assert cache.get("main").progs == []
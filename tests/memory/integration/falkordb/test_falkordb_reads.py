@@ -0,0 +1,46 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from hybridagi.memory.integration.falkordb import FalkorDBDocumentMemory, FalkorDBFactMemory
+
+@pytest.fixture(autouse=True)
+def falkordb_client():
+    with patch("hybridagi.memory.integration.falkordb.falkordb_memory.FalkorDB") as client:
+        yield client
+
+def mock_result(rows):
+    result = MagicMock()
+    result.result_set = rows
+    return result
+
+def test_falkordb_document_memory_get_single_query():
+    memory = FalkorDBDocumentMemory(index_name="test_reads")
+    memory._graph = MagicMock()
+    memory._graph.query.return_value = mock_result([
+        ["b", "second", None, json.dumps({}), None],
+        ["a", "first", "b", json.dumps({"page": 1}), [1.0, 0.0]],
+    ])
+    docs = memory.get(["a", "unknown", "b"]).docs
+    assert memory._graph.query.call_count == 1
+    assert "WHERE d.id IN $ids" in memory._graph.query.call_args.args[0]
+    assert [doc.text for doc in docs] == ["first", "second"]
+    assert docs[0].parent_id == "b"
+    assert docs[0].metadata == {"page": 1}
+    assert docs[0].vector == [1.0, 0.0]
+
+def test_falkordb_fact_memory_get_facts_single_query():
+    memory = FalkorDBFactMemory(index_name="test_reads")
+    memory._graph = MagicMock()
+    memory._graph.query.return_value = mock_result([
+        [
+            "f", "KNOWS", json.dumps({}), None,
+            "s", "Bob", "Person", None, json.dumps({}), None,
+            "o", "Ann", "Person", None, None, None,
+        ],
+    ])
+    facts = memory.get_facts("f").facts
+    assert memory._graph.query.call_count == 1
+    assert len(facts) == 1
+    assert facts[0].subj.name == "Bob"
+    assert facts[0].rel.name == "KNOWS"
+    assert facts[0].obj.name == "Ann"
@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+from hybridagi.memory.integration.local.embedding_store import EmbeddingStore
+
+def test_embedding_store_empty():
+    store = EmbeddingStore()
+    assert len(store) == 0
+    ids, vectors = store.to_arrays()
+    assert ids == []
+    assert vectors.shape[0] == 0
+
+def test_embedding_store_invalid_dtype():
+    with pytest.raises(ValueError):
+        EmbeddingStore(dtype="int8")
+
+def test_embedding_store_set_and_get():
+    store = EmbeddingStore(capacity=1)
+    store["a"] = [1.0, 0.0]
+    store["b"] = [0.0, 1.0]
+    store["c"] = [1.0, 1.0]
+    assert len(store) == 3
+    assert store.dim == 2
+    assert store["b"].dtype == np.float32
+    assert list(store["c"]) == [1.0, 1.0]
+    store["a"] = [2.0, 2.0]
+    assert len(store) == 3
+    assert list(store["a"]) == [2.0, 2.0]
+    with pytest.raises(ValueError):
+        store["d"] = [1.0, 2.0, 3.0]
+
+def test_embedding_store_remove_and_compact():
+    store = EmbeddingStore(compaction_ratio=0.5)
+    store.update_many(["a", "b", "c", "d"], np.eye(4, 2))
+    del store["b"]
+    assert "b" not in store
+    assert list(store) == ["a", "c", "d"]
+    ids, vectors = store.to_arrays()
+    assert ids == ["a", "c", "d"]
+    assert vectors.shape == (3, 2)
+    assert np.shares_memory(vectors, store["a"])
+
+def test_embedding_store_float16():
+    store = EmbeddingStore(dtype="float16")
+    store["a"] = [0.5, 0.25]
+    assert store["a"].dtype == np.float16
+    assert store.nbytes == 4
+
+def test_embedding_store_save_and_load(tmp_path):
+    store = EmbeddingStore()
+    store.update_many(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    store.save(str(tmp_path / "vectors"))
+    loaded = EmbeddingStore.load(str(tmp_path / "vectors"))
+    assert list(loaded) == ["a", "b"]
+    assert isinstance(loaded.to_arrays()[1], np.memmap)
+    loaded["c"] = [1.0, 1.0]
+    assert list(loaded["c"]) == [1.0, 1.0]
+    assert list(loaded["a"]) == [1.0, 0.0]
+    assert list(EmbeddingStore.load(str(tmp_path / "vectors"))) == ["a", "b"]
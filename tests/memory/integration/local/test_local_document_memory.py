@@ -1,4 +1,6 @@
+import numpy as np
 from hybridagi.memory.integration.local.local_document_memory import LocalDocumentMemory
+from hybridagi.memory.integration.local.local_program_memory import LocalProgramMemory
 import hybridagi.core.datatypes as dt
 
 def test_local_document_memory_empty():
@@ -56,4 +58,97 @@ def test_local_document_memory_get_one_doc():
     assert mem._documents[str(doc.id)] == doc
     res = mem.get(doc.id)
     assert res.docs[0] == doc
-    
\ No newline at end of file
+    
+
+def test_local_document_memory_save_and_load(tmp_path):
+    mem = LocalDocumentMemory(index_name="test")
+    doc_list = dt.DocumentList()
+    doc_list.docs = [
+        dt.Document(text="This is a test text", vector=[1.0, 0.0]),
+        dt.Document(text="This is another test text", vector=[0.0, 1.0]),
+    ]
+    mem.update(doc_list)
+    mem.get_vector_index("_embeddings", "cosine", 2)
+    mem.save(str(tmp_path))
+    loaded = LocalDocumentMemory(index_name="test")
+    loaded.load(str(tmp_path))
+    assert len(loaded._documents) == 2
+    assert loaded.get(doc_list.docs[0].id).docs[0].text == "This is a test text"
+    assert list(loaded._embeddings[str(doc_list.docs[1].id)]) == [0.0, 1.0]
+    index = loaded.get_vector_index("_embeddings", "cosine", 2)
+    assert index.search([[0.1, 0.9]], k=1)[0][0][0] == str(doc_list.docs[1].id)
+
+def test_local_document_memory_save_appends(tmp_path):
+    mem = LocalDocumentMemory(index_name="test")
+    first = dt.Document(text="This is a test text", vector=[1.0, 0.0])
+    mem.update(first)
+    mem.save(str(tmp_path))
+    size = (tmp_path / "documents.records").stat().st_size
+    second = dt.Document(text="This is another test text", vector=[0.0, 1.0])
+    mem.update(second)
+    mem.remove(first.id)
+    mem.save(str(tmp_path))
+    assert (tmp_path / "documents.records").stat().st_size > size
+    loaded = LocalDocumentMemory(index_name="test")
+    loaded.load(str(tmp_path))
+    assert len(loaded._documents) == 1
+    assert loaded.get(second.id).docs[0].text == "This is another test text"
+    assert loaded.get(first.id).docs == []
+
+def test_local_document_memory_vector_indexes_not_shared():
+    mem = LocalDocumentMemory(index_name="test", wipe_on_start=False)
+    other = LocalProgramMemory(index_name="test", wipe_on_start=False)
+    assert mem._vector_indexes is not other._vector_indexes
+    mem = LocalDocumentMemory(index_name="test")
+    index = mem.get_vector_index("_embeddings", "cosine", 2)
+    assert LocalDocumentMemory(index_name="test")._vector_indexes == {}
+    assert mem.get_vector_index("_embeddings", "cosine", 2) is index
+
+def test_local_document_memory_float16_embeddings_footprint():
+    vectors = np.random.default_rng(0).normal(size=(500, 64)).astype("float32")
+    memories = {}
+    for embeddings_dtype, index_type in [("float32", "flat"), ("float16", "sq_fp16"), ("float16", "binary")]:
+        mem = LocalDocumentMemory(index_name="test", embeddings_dtype=embeddings_dtype)
+        doc_list = dt.DocumentList()
+        doc_list.docs = [dt.Document(text=f"Text {i}", vector=list(vector)) for i, vector in enumerate(vectors)]
+        mem.update(doc_list)
+        assert mem._embeddings.dtype == np.dtype(embeddings_dtype)
+        index = mem.get_vector_index("_embeddings", "cosine", 64, index_type=index_type)
+        assert index.search(vectors[:1], k=1)[0][0][0] == str(doc_list.docs[0].id)
+        memories[index_type] = mem.nbytes
+    # The float16 embeddings and codes take half of the float32 embeddings and vectors or less
+    assert memories["sq_fp16"] <= 0.55 * memories["flat"]
+    assert memories["binary"] <= 0.35 * memories["flat"]
+
+def test_local_document_memory_save_vector_indexes(tmp_path):
+    vectors = np.random.default_rng(0).normal(size=(2000, 32)).astype("float32")
+    mem = LocalDocumentMemory(index_name="test")
+    doc_list = dt.DocumentList()
+    doc_list.docs = [dt.Document(text=f"Text {i}", vector=list(vector)) for i, vector in enumerate(vectors)]
+    mem.update(doc_list)
+    mem.save(str(tmp_path))
+    state_size = (tmp_path / "state.pkl").stat().st_size
+    mem.get_vector_index("_embeddings", "cosine", 32)
+    mem.get_vector_index("_embeddings", "cosine", 32, index_type="sq_int8")
+    mem.save(str(tmp_path))
+    # The vectors are only written into the embeddings and the FAISS files, not into the pickled state
+    assert (tmp_path / "state.pkl").stat().st_size < state_size + 1024
+    assert len(list(tmp_path.glob("vector_index_*.faiss"))) == 2
+    loaded = LocalDocumentMemory(index_name="test")
+    loaded.load(str(tmp_path))
+    assert len(loaded._vector_indexes) == 1
+    index = loaded.get_vector_index("_embeddings", "cosine", 32, index_type="sq_int8")
+    assert index._mapped
+    assert index.search(vectors[5:6], k=1)[0][0][0] == str(doc_list.docs[5].id)
+    # The flat index is rebuilt from the memory-mapped embeddings
+    flat = loaded.get_vector_index("_embeddings", "cosine", 32)
+    assert len(flat) == 2000
+    # The memory-mapped index is copied in memory when updated
+    loaded.remove(doc_list.docs[5].id)
+    assert not index._mapped
+    assert all(i != str(doc_list.docs[5].id) for i, _ in index.search(vectors[5:6], k=5)[0])
+    loaded.save(str(tmp_path))
+    reloaded = LocalDocumentMemory(index_name="test")
+    reloaded.load(str(tmp_path))
+    index = reloaded.get_vector_index("_embeddings", "cosine", 32, index_type="sq_int8")
+    assert len(index) == 1999
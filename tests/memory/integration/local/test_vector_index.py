@@ -0,0 +1,168 @@
+import pytest
+import numpy as np
+from hybridagi.memory.integration.local import VectorIndex
+from hybridagi.memory.integration.local.vector_index import merge_neighbors, recall_report
+
+def test_vector_index_empty():
+    index = VectorIndex(dim=3)
+    assert len(index) == 0
+    assert index.search([[1.0, 0.0, 0.0]], k=5) == [[]]
+
+def test_vector_index_invalid_distance():
+    with pytest.raises(ValueError):
+        VectorIndex(dim=3, distance="manhattan")
+
+def test_vector_index_add_and_search():
+    index = VectorIndex(dim=3)
+    index.add(["a", "b", "c"], [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    assert len(index) == 3
+    results = index.search([[0.0, 2.0, 0.0], [0.0, 0.0, 1.0]], k=2)
+    assert len(results) == 2
+    assert results[0][0][0] == "b"
+    assert results[0][0][1] == pytest.approx(0.0, abs=1e-6)
+    assert results[1][0][0] == "c"
+
+def test_vector_index_replace_and_remove():
+    index = VectorIndex(dim=2, distance="euclidean")
+    index.add(["a", "b"], [[0.0, 0.0], [3.0, 4.0]])
+    assert index.search([[3.0, 4.0]], k=1)[0][0] == ("b", 0.0)
+    index.add(["b"], [[10.0, 10.0]])
+    assert len(index) == 2
+    assert index.search([[3.0, 4.0]], k=1)[0][0] == ("a", 5.0)
+    index.remove(["a", "unknown"])
+    assert "a" not in index
+    assert [i for i, _ in index.search([[0.0, 0.0]], k=5)[0]] == ["b"]
+
+def random_vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype("float32")
+
+def test_vector_index_invalid_index_type():
+    with pytest.raises(ValueError):
+        VectorIndex(dim=3, index_type="lsh")
+
+def test_vector_index_ivf_pq_invalid_params():
+    with pytest.raises(ValueError):
+        VectorIndex(dim=10, index_type="ivf_pq", index_params={"m": 4})
+
+def test_vector_index_ivf_trains_after_staging():
+    vectors = random_vectors(300)
+    ids = [str(i) for i in range(300)]
+    index = VectorIndex(dim=16, index_type="ivf_flat", index_params={"nlist": 4}, train_size=200)
+    index.add(ids[:100], vectors[:100])
+    assert not index.is_trained
+    assert index.search(vectors[:1], k=1)[0][0][0] == "0"
+    index.remove(["1"])
+    index.add(ids[100:], vectors[100:])
+    assert index.is_trained
+    assert len(index) == 299
+    results = index.search(vectors[:3], k=3, nprobe=4)
+    assert results[0][0][0] == "0"
+    assert results[2][0][0] == "2"
+    assert all(i != "1" for r in results for i, _ in r)
+
+def test_vector_index_hnsw_remove():
+    vectors = random_vectors(100)
+    index = VectorIndex(dim=16, distance="euclidean", index_type="hnsw", ef_search=64)
+    index.add([str(i) for i in range(100)], vectors)
+    assert index.search(vectors[5:6], k=1)[0][0][0] == "5"
+    index.remove(["5"])
+    assert len(index) == 99
+    assert all(i != "5" for i, _ in index.search(vectors[5:6], k=10)[0])
+    index.remove([str(i) for i in range(50)])
+    assert len(index) == 50
+    assert all(int(i) >= 50 for i, _ in index.search(vectors[:10], k=5)[0])
+
+def test_recall_report():
+    vectors = random_vectors(500)
+    ids = [str(i) for i in range(500)]
+    reference = VectorIndex(dim=16)
+    reference.add(ids, vectors)
+    index = VectorIndex(dim=16, index_type="ivf_flat", index_params={"nlist": 8}, train_size=400)
+    index.add(ids, vectors)
+    rows = recall_report(index, reference, random_vectors(20, seed=1), k=5, search_params=[{"nprobe": 1}, {"nprobe": 8}])
+    assert len(rows) == 2
+    assert rows[0]["recall@5"] <= rows[1]["recall@5"]
+    assert rows[1]["recall@5"] == pytest.approx(1.0)
+
+def test_merge_neighbors():
+    neighbors = [[("a", 0.1), ("b", 0.3), ("c", 0.9)], [("b", 0.2), ("d", 0.4)]]
+    assert merge_neighbors(neighbors, k=5, max_distance=0.5) == ["a", "b", "d"]
+    assert merge_neighbors(neighbors, k=2, max_distance=0.5) == ["a", "b"]
+    assert merge_neighbors(neighbors, k=5, fusion="rrf")[0] == "b"
+    with pytest.raises(ValueError):
+        merge_neighbors(neighbors, k=5, fusion="max")
+
+def quantized_recall(index_type, store=None, **kwargs):
+    vectors = random_vectors(1000, dim=64)
+    ids = [str(i) for i in range(1000)]
+    reference = VectorIndex(dim=64)
+    reference.add(ids, vectors)
+    index = VectorIndex(dim=64, index_type=index_type, **kwargs)
+    index.add(ids, vectors)
+    if store is not None:
+        index.rerank_store = dict(zip(ids, vectors))
+    return recall_report(index, reference, random_vectors(20, dim=64, seed=1), k=10)[0]
+
+def test_vector_index_sq_fp16():
+    row = quantized_recall("sq_fp16")
+    assert row["recall@10"] >= 0.99
+    assert row["bytes_per_vector"] < 0.6 * row["flat_bytes_per_vector"]
+
+def test_vector_index_sq_int8_trains_per_dimension_scales():
+    row = quantized_recall("sq_int8", train_size=500)
+    assert row["recall@10"] >= 0.9
+    assert row["bytes_per_vector"] < 0.35 * row["flat_bytes_per_vector"]
+
+def test_vector_index_binary_rerank():
+    row = quantized_recall("binary", store=True, rerank_factor=20)
+    assert row["recall@10"] >= 0.75
+    assert row["bytes_per_vector"] < 0.1 * row["flat_bytes_per_vector"]
+
+def test_vector_index_binary_requires_rerank_store():
+    vectors = random_vectors(10)
+    index = VectorIndex(dim=16, index_type="binary")
+    index.add([str(i) for i in range(10)], vectors)
+    with pytest.raises(ValueError):
+        index.search(vectors[:1], k=1)
+
+def test_vector_index_binary_remove_and_pickle():
+    import pickle
+    vectors = random_vectors(50)
+    ids = [str(i) for i in range(50)]
+    index = VectorIndex(dim=16, index_type="binary")
+    index.rerank_store = dict(zip(ids, vectors))
+    index.add(ids, vectors)
+    assert index.search(vectors[3:4], k=1)[0][0][0] == "3"
+    index.remove(["3"])
+    assert all(i != "3" for i, _ in index.search(vectors[3:4], k=10)[0])
+    restored = pickle.loads(pickle.dumps(index))
+    assert restored.rerank_store is None
+    assert len(restored) == 49
+    restored.rerank_store = index.rerank_store
+    assert restored.search(vectors[4:5], k=1)[0][0][0] == "4"
+
+def clustered_vectors(n, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(42).standard_normal((50, dim))
+    return (centers[rng.integers(0, 50, n)] + 0.5 * rng.standard_normal((n, dim))).astype("float32")
+
+@pytest.mark.parametrize("index_type, index_params, min_recall", [
+    ("hnsw", {}, 0.95),
+    ("ivf_flat", {"nlist": 64}, 0.95),
+    ("ivf_pq", {"nlist": 64, "m": 8}, 0.95),
+    ("sq_fp16", {}, 0.99),
+    ("sq_int8", {}, 0.95),
+    ("binary", {}, 0.9),
+])
+def test_vector_index_default_recall(index_type, index_params, min_recall):
+    vectors = clustered_vectors(3000)
+    ids = [str(i) for i in range(3000)]
+    reference = VectorIndex(dim=64)
+    index = VectorIndex(dim=64, index_type=index_type, index_params=index_params, train_size=2000)
+    # The ivf_pq and binary indexes re-rank their candidates with the float vectors
+    index.rerank_store = dict(zip(ids, vectors))
+    for vector_index in (reference, index):
+        vector_index.add(ids, vectors)
+        vector_index.remove(ids[:1000])
+    row = recall_report(index, reference, clustered_vectors(100, seed=1), k=10)[0]
+    assert row["recall@10"] >= min_recall
@@ -0,0 +1,96 @@
+import asyncio
+import hybridagi.core.graph_program as gp
+from hybridagi.memory import ProgramCache
+from hybridagi.memory.integration.local import LocalProgramMemory
+
+class CountingProgramMemory(LocalProgramMemory):
+
+    def __init__(self, index_name: str):
+        super().__init__(index_name=index_name)
+        self.reads = 0
+
+    def get(self, id_or_ids):
+        self.reads += 1
+        return super().get(id_or_ids)
+
+def make_program(name: str, description: str, called_program: str = None) -> gp.GraphProgram:
+    program = gp.GraphProgram(name=name, description=description)
+    if called_program is not None:
+        program.add(gp.Program(id="call", purpose=f"Call {called_program}", program=called_program))
+    else:
+        program.add(gp.Action(id="answer", purpose="Answer", tool="Speak", prompt="Answer"))
+    step_id = "call" if called_program is not None else "answer"
+    program.connect("start", step_id)
+    program.connect(step_id, "end")
+    program.build()
+    return program
+
+def test_program_cache_read_through():
+    program_memory = CountingProgramMemory(index_name="test")
+    program_memory.update(make_program("main", "The main program"))
+    cache = ProgramCache(program_memory)
+    first = cache.get("main").progs[0]
+    second = cache.get("main").progs[0]
+    assert first is second
+    assert program_memory.reads == 1
+    assert cache.hits == 1 and cache.misses == 1
+    assert cache.get("unknown").progs == []
+
+def test_program_cache_invalidation():
+    program_memory = CountingProgramMemory(index_name="test")
+    program_memory.update(make_program("main", "The main program"))
+    cache = ProgramCache(program_memory)
+    assert cache.get("main").progs[0].description == "The main program"
+    program_memory.update(make_program("main", "The new main program"))
+    assert cache.get("main").progs[0].description == "The new main program"
+    program_memory.remove("main")
+    assert cache.get("main").progs == []
+    program_memory.update(make_program("main", "The main program"))
+    assert len(cache.get("main").progs) == 1
+    program_memory.clear()
+    assert cache.get("main").progs == []
+
+def test_program_cache_preload():
+    program_memory = CountingProgramMemory(index_name="test")
+    program_memory.update(make_program("main", "The main program", called_program="clarify"))
+    program_memory.update(make_program("clarify", "Clarify the objective", called_program="answer"))
+    program_memory.update(make_program("answer", "Answer the objective"))
+    program_memory.update(make_program("unused", "An unused program"))
+    cache = ProgramCache(program_memory)
+    preloaded = cache.preload("main")
+    assert [prog.name for prog in preloaded.progs] == ["main", "clarify", "answer"]
+    assert program_memory.reads == 3
+    cache.get(["main", "clarify", "answer"])
+    assert program_memory.reads == 3
+    preloaded = asyncio.run(cache.apreload("main"))
+    assert [prog.name for prog in preloaded.progs] == ["main", "clarify", "answer"]
+    assert program_memory.reads == 3
+
+def test_program_cache_shared():
+    program_memory = LocalProgramMemory(index_name="test")
+    assert ProgramCache.shared(program_memory) is ProgramCache.shared(program_memory)
+    assert ProgramCache.shared(program_memory) is not ProgramCache.shared(LocalProgramMemory(index_name="test"))
+
+class StoredVersionsProgramMemory(CountingProgramMemory):
+    """A program memory storing its versions, like the memories shared between processes"""
+
+    def __init__(self, index_name: str):
+        super().__init__(index_name=index_name)
+        self.stored_versions = {}
+
+    def get_versions(self, ids):
+        return {prog_id: self.stored_versions.get(prog_id) for prog_id in ids}
+
+def test_program_cache_stored_versions():
+    program_memory = StoredVersionsProgramMemory(index_name="test")
+    program_memory.update(make_program("main", "The main program"))
+    program_memory.stored_versions["main"] = "v1"
+    cache = ProgramCache(program_memory)
+    assert cache.get("main").progs[0].description == "The main program"
+    assert cache.get("main").progs[0].description == "The main program"
+    assert program_memory.reads == 1
+    # Updated by another process: only the stored version changes
+    program_memory.update(make_program("main", "The new main program"))
+    program_memory.stored_versions["main"] = "v2"
+    assert cache.get("main").progs[0].description == "The new main program"
+    assert program_memory.reads == 2
@@ -0,0 +1,112 @@
+import threading
+import pytest
+from hybridagi.core.datatypes import AgentStep, AgentStepType
+from hybridagi.embeddings import FakeEmbeddings
+from hybridagi.memory import TraceWriter
+from hybridagi.memory.integration.local import LocalTraceMemory
+
+class CountingEmbeddings(FakeEmbeddings):
+
+    def __init__(self, dim: int):
+        super().__init__(dim=dim)
+        self.calls = 0
+
+    def embed_text(self, query_or_queries):
+        self.calls += 1
+        return super().embed_text(query_or_queries)
+
+class BlockingTraceMemory(LocalTraceMemory):
+
+    def __init__(self, index_name: str):
+        super().__init__(index_name=index_name)
+        self.release = threading.Event()
+
+    def update(self, step_or_steps):
+        self.release.wait()
+        super().update(step_or_steps)
+
+class FailingTraceMemory(LocalTraceMemory):
+
+    def update(self, step_or_steps):
+        raise ConnectionError("Trace memory unavailable")
+
+def test_trace_writer_batches_writes():
+    trace_memory = LocalTraceMemory(index_name="test")
+    embeddings = CountingEmbeddings(dim=8)
+    writer = TraceWriter(trace_memory, embeddings=embeddings, batch_size=64)
+    steps = [AgentStep(step_type=AgentStepType.Action, hop=i) for i in range(10)]
+    for i, step in enumerate(steps):
+        writer.put(step, text=f"Output {i}")
+    writer.flush()
+    assert all(trace_memory.exist(str(step.id)) for step in steps)
+    assert all(len(step.vector) == 8 for step in steps)
+    assert embeddings.calls <= 10
+
+def test_trace_writer_keeps_steps_without_text():
+    trace_memory = LocalTraceMemory(index_name="test")
+    writer = TraceWriter(trace_memory)
+    step = AgentStep(step_type=AgentStepType.ProgramCall)
+    writer.put(step)
+    writer.flush()
+    assert trace_memory.exist(str(step.id))
+    assert step.vector is None
+    with pytest.raises(ValueError):
+        writer.put(AgentStep(step_type=AgentStepType.Action), text="Output")
+
+def test_trace_writer_drop_back_pressure():
+    trace_memory = BlockingTraceMemory(index_name="test")
+    writer = TraceWriter(trace_memory, max_queue_size=2, batch_size=1, back_pressure="drop")
+    steps = [AgentStep(step_type=AgentStepType.ProgramCall) for _ in range(10)]
+    for step in steps:
+        writer.put(step)
+    assert writer.dropped > 0
+    trace_memory.release.set()
+    writer.flush()
+    assert sum(trace_memory.exist(str(step.id)) for step in steps) == 10 - writer.dropped
+
+def test_trace_writer_flush_raises_errors():
+    writer = TraceWriter(FailingTraceMemory(index_name="test"))
+    writer.put(AgentStep(step_type=AgentStepType.ProgramCall))
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    # The errors are only raised once
+    writer.flush()
+
+class FailingHopTraceMemory(LocalTraceMemory):
+
+    def update(self, step_or_steps):
+        if any(step.hop < 0 for step in step_or_steps.steps):
+            raise ConnectionError("Trace memory unavailable")
+        super().update(step_or_steps)
+
+def test_trace_writer_flush_key():
+    trace_memory = FailingHopTraceMemory(index_name="test")
+    writer = TraceWriter(trace_memory, batch_size=64)
+    failing_step = AgentStep(step_type=AgentStepType.ProgramCall, hop=-1)
+    step = AgentStep(step_type=AgentStepType.ProgramCall, hop=1)
+    writer.put(failing_step, key="failing")
+    writer.put(step, key="agent")
+    # The steps of each key are written separately and the errors raised to their key only
+    writer.flush("agent")
+    assert trace_memory.exist(str(step.id))
+    with pytest.raises(RuntimeError):
+        writer.flush("failing")
+    writer.flush()
+
+def test_trace_writer_close():
+    trace_memory = LocalTraceMemory(index_name="test")
+    with TraceWriter(trace_memory) as writer:
+        steps = [AgentStep(step_type=AgentStepType.ProgramCall) for _ in range(10)]
+        for step in steps:
+            writer.put(step)
+    assert all(trace_memory.exist(str(step.id)) for step in steps)
+    assert not writer._worker.is_alive()
+    with pytest.raises(RuntimeError):
+        writer.put(AgentStep(step_type=AgentStepType.ProgramCall))
+    writer.close()
+
+def test_trace_writer_invalid_parameters():
+    with pytest.raises(ValueError):
+        TraceWriter(LocalTraceMemory(index_name="test"), back_pressure="wait")
+    with pytest.raises(ValueError):
+        TraceWriter(LocalTraceMemory(index_name="test"), batch_size=0)
@@ -0,0 +1,135 @@
+import dspy
+import numpy as np
+import pytest
+import hybridagi.core.graph_program as gp
+from hybridagi.core.datatypes import AgentState, Query
+from hybridagi.embeddings.embeddings import Embeddings
+from hybridagi.memory.integration.local import LocalProgramMemory
+from hybridagi.modules.agents import GraphInterpreterAgent, EmbeddingDecisionEngine
+from hybridagi.modules.agents.tools import SpeakTool
+from dspy.utils.dummies import DummyLM
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag of words embeddings"""
+
+    def __init__(self, dim: int = 64):
+        super().__init__(dim=dim)
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[sum(map(ord, word)) % self.dim] += 1.0
+        return vector
+
+    def embed_text(self, query_or_queries):
+        if isinstance(query_or_queries, list):
+            return np.stack([self._embed(text) for text in query_or_queries])
+        return self._embed(query_or_queries)
+
+    def embed_image(self, image_or_images):
+        raise NotImplementedError()
+
+def test_decision_engine_predict():
+    engine = EmbeddingDecisionEngine(embeddings=HashingEmbeddings())
+    choices = ["CLARIFY", "ANSWER"]
+    unclear = engine.embed("Tell me about it", "Nothing done yet")
+    clear = engine.embed("What is the capital of France?", "Nothing done yet")
+    assert engine.predict("main.is_unclear", unclear, choices)[0] is None
+    engine.learn("main.is_unclear", unclear, "CLARIFY")
+    # A single known option is not enough to be confident against the other ones
+    assert engine.predict("main.is_unclear", unclear, choices) == (None, 0.0)
+    engine.learn("main.is_unclear", clear, "ANSWER")
+    assert engine.predict("main.is_unclear", unclear, choices)[0] == "CLARIFY"
+    assert engine.predict("main.is_unclear", clear, choices)[0] == "ANSWER"
+    # The examples are kept per decision step
+    assert engine.predict("main.other_decision", clear, choices)[0] is None
+    unrelated = engine.embed("Write a poem about the sea", "Nothing done yet")
+    assert engine.predict("main.is_unclear", unrelated, choices)[0] is None
+
+def test_decision_engine_context_includes_decision():
+    engine = EmbeddingDecisionEngine(embeddings=HashingEmbeddings())
+    text = engine.context_text("Objective", "Trace", purpose="Check the answer", question="Is the answer correct?")
+    assert "Check the answer" in text
+    assert "Is the answer correct?" in text
+    first = engine.embed("Objective", "Trace", question="Is the answer correct?")
+    second = engine.embed("Objective", "Trace", question="Should we search more?")
+    assert not np.allclose(first, second)
+
+def test_decision_engine_invalid_parameters():
+    with pytest.raises(ValueError):
+        EmbeddingDecisionEngine(threshold=0.0)
+    with pytest.raises(ValueError):
+        EmbeddingDecisionEngine(temperature=0.0)
+
+def test_graph_interpreter_decision_engine():
+    answers = [" blabla \nChoice: Answer", "Paris", " blabla \nChoice: Clarify", "Paris"]
+    dspy.settings.configure(lm=DummyLM(answers=answers))
+    
+    main = gp.GraphProgram(
+        name="main",
+        description="The main program",
+    )
+    
+    main.add(gp.Decision(
+        id = "is_objective_unclear",
+        purpose = "Check if the Objective is unclear",
+        question="Is the Objective's question still unclear?",
+    ))
+    
+    main.add(gp.Action(
+        id = "answer",
+        purpose = "Answer the Objective's question",
+        tool = "Speak",
+        prompt = "Please answer to the Objective's question",
+    ))
+    
+    main.connect("start", "is_objective_unclear")
+    main.connect("is_objective_unclear", "end", label="Clarify")
+    main.connect("is_objective_unclear", "answer", label="Answer")
+    main.connect("answer", "end")
+    
+    main.build()
+    
+    program_memory = LocalProgramMemory(index_name="test")
+    
+    program_memory.update(main)
+    
+    agent_state = AgentState()
+    
+    tools = [
+        SpeakTool(
+            agent_state=agent_state
+        ),
+    ]
+    
+    engine = EmbeddingDecisionEngine()
+    
+    agent = GraphInterpreterAgent(
+        program_memory = program_memory,
+        agent_state = agent_state,
+        embeddings = HashingEmbeddings(),
+        decision_engine = engine,
+        tools = tools,
+    )
+    
+    input_query = Query(query="What is the capital of France?")
+    agent_output = agent(input_query)
+    assert agent_output.final_answer == "Paris"
+    assert engine.stats()["llm_decisions"] == 1
+    # With the examples of a single option the LM is still used
+    agent_output = agent(Query(query="Tell me about it"))
+    assert agent_output.final_answer == ""
+    assert engine.stats()["llm_decisions"] == 2
+    # The same decision is now taken without the LM (only two decision answers were given)
+    agent_output = agent(input_query)
+    assert agent_output.final_answer == "Paris"
+    assert agent_output.finish_reason == "finished"
+    assert engine.stats() == {"fast_decisions": 1, "llm_decisions": 2, "fast_path_rate": 1 / 3}
+
+def test_graph_interpreter_decision_engine_requires_embeddings():
+    with pytest.raises(ValueError):
+        GraphInterpreterAgent(
+            program_memory = LocalProgramMemory(index_name="test"),
+            agent_state = AgentState(),
+            decision_engine = EmbeddingDecisionEngine(),
+        )
@@ -1,7 +1,10 @@
+import asyncio
 import dspy
 import hybridagi.core.graph_program as gp
-from hybridagi.core.datatypes import AgentState, Query
-from hybridagi.memory.integration.local import LocalProgramMemory
+from hybridagi.core.datatypes import AgentState, AgentStepType, Query
+from hybridagi.embeddings import FakeEmbeddings
+from hybridagi.memory import TraceWriter, ProgramCache
+from hybridagi.memory.integration.local import LocalProgramMemory, LocalTraceMemory
 from hybridagi.modules.agents.graph_interpreter import GraphInterpreterAgent
 from hybridagi.modules.agents.tools import SpeakTool
 from dspy.utils.dummies import DummyLM
@@ -256,3 +259,372 @@ def test_graph_interpreter_one_program():
     agent_output = agent(input_query)
     assert agent_output.final_answer == "Paris"
     assert agent_output.finish_reason == "finished"
+
+
+def test_graph_interpreter_action_var_out():
+    answers = ["The capital of France is Paris", "Paris"]
+    dspy.settings.configure(lm=DummyLM(answers=answers))
+    
+    main = gp.GraphProgram(
+        name="main",
+        description="The main program",
+    )
+    
+    main.add(gp.Action(
+        id="elaborate",
+        purpose="Elaborate to answer the Objective's question",
+        tool="Speak",
+        prompt="Please elaborate to answer the Objective's question",
+        var_out="elaboration",
+    ))
+        
+    main.add(gp.Action(
+        id="answer",
+        purpose="Answer the Objective's question",
+        tool="Speak",
+        prompt="Please answer to the Objective's question using {{elaboration}}",
+        var_in=["elaboration"],
+    ))
+
+    main.connect("start", "elaborate")
+    main.connect("elaborate", "answer")
+    main.connect("answer", "end")
+    
+    main.build()
+    
+    program_memory = LocalProgramMemory(index_name="test")
+    
+    program_memory.update(main)
+    
+    agent_state = AgentState()
+    
+    tools = [
+        SpeakTool(
+            agent_state=agent_state
+        ),
+    ]
+    
+    agent = GraphInterpreterAgent(
+        program_memory = program_memory,
+        agent_state = agent_state,
+        tools = tools,
+    )
+    
+    input_query = Query(query="What is the capital of France?")
+    agent_output = agent(input_query)
+    assert agent_state.variables["elaboration"] == "The capital of France is Paris"
+    assert agent_output.final_answer == "Paris"
+    assert agent_output.finish_reason == "finished"
+
+def test_graph_interpreter_aforward():
+    answers = [" blabla \nChoice: Answer", "Paris"]
+    dspy.settings.configure(lm=DummyLM(answers=answers))
+    
+    main = gp.GraphProgram(
+        name="main",
+        description="The main program",
+    )
+    
+    main.add(gp.Decision(
+        id = "is_objective_unclear",
+        purpose = "Check if the Objective is unclear",
+        question="Is the Objective's question still unclear?",
+    ))
+    
+    main.add(gp.Action(
+        id = "answer",
+        purpose = "Answer the Objective's question",
+        tool = "Speak",
+        prompt = "Please answer to the Objective's question",
+    ))
+    
+    main.connect("start", "is_objective_unclear")
+    main.connect("is_objective_unclear", "end", label="Clarify")
+    main.connect("is_objective_unclear", "answer", label="Answer")
+    main.connect("answer", "end")
+    
+    main.build()
+    
+    program_memory = LocalProgramMemory(index_name="test")
+    
+    program_memory.update(main)
+    
+    agent_state = AgentState()
+    
+    tools = [
+        SpeakTool(
+            agent_state=agent_state
+        ),
+    ]
+    
+    agent = GraphInterpreterAgent(
+        program_memory = program_memory,
+        agent_state = agent_state,
+        tools = tools,
+    )
+    
+    input_query = Query(query="What is the capital of France?")
+    agent_output = asyncio.run(agent.aforward(input_query))
+    assert agent_output.final_answer == "Paris"
+    assert agent_output.finish_reason == "finished"
+
+def test_graph_interpreter_batch():
+    answers = {
+        "capital of France": "Paris",
+        "capital of Italy": "Rome",
+        "capital of Spain": "Madrid",
+    }
+    dspy.settings.configure(lm=DummyLM(answers=answers))
+    
+    main = gp.GraphProgram(
+        name="main",
+        description="The main program",
+    )
+        
+    main.add(gp.Action(
+        id="answer",
+        purpose="Answer the Objective's question",
+        tool="Speak",
+        prompt="Please answer to the Objective's question",
+    ))
+
+    main.connect("start", "answer")
+    main.connect("answer", "end")
+    
+    main.build()
+    
+    program_memory = LocalProgramMemory(index_name="test")
+    
+    program_memory.update(main)
+    
+    agent_state = AgentState()
+    
+    tools = [
+        SpeakTool(
+            agent_state=agent_state
+        ),
+    ]
+    
+    agent = GraphInterpreterAgent(
+        program_memory = program_memory,
+        agent_state = agent_state,
+        tools = tools,
+        verbose = False,
+    )
+    
+    input_queries = [
+        Query(query="What is the capital of France?"),
+        Query(query="What is the capital of Italy?"),
+        Query(query="What is the capital of Spain?"),
+    ] * 3
+    expected_answers = ["Paris", "Rome", "Madrid"] * 3
+    
+    agent_outputs = agent.batch(input_queries, max_concurrency=4)
+    assert [o.final_answer for o in agent_outputs] == expected_answers
+    assert all(o.finish_reason == "finished" for o in agent_outputs)
+    
+    agent_outputs = asyncio.run(agent.abatch(input_queries, max_concurrency=4))
+    assert [o.final_answer for o in agent_outputs] == expected_answers
+    assert all(o.finish_reason == "finished" for o in agent_outputs)
+    # The agent state given to the constructor is left untouched
+    assert agent_state.final_answer == ""
+
+def test_graph_interpreter_trace_writer():
+    answers = ["The capital of France is Paris", "Paris"]
+    dspy.settings.configure(lm=DummyLM(answers=answers))
+    
+    main = gp.GraphProgram(
+        name="main",
+        description="The main program",
+    )
+    
+    main.add(gp.Action(
+        id="elaborate",
+        purpose="Elaborate to answer the Objective's question",
+        tool="Speak",
+        prompt="Please elaborate to answer the Objective's question",
+    ))
+        
+    main.add(gp.Action(
+        id="answer",
+        purpose="Answer the Objective's question",
+        tool="Speak",
+        prompt="Please answer to the Objective's question",
+    ))
+
+    main.connect("start", "elaborate")
+    main.connect("elaborate", "answer")
+    main.connect("answer", "end")
+    
+    main.build()
+    
+    program_memory = LocalProgramMemory(index_name="test")
+    
+    program_memory.update(main)
+    
+    trace_memory = LocalTraceMemory(index_name="test")
+    
+    agent_state = AgentState()
+    
+    tools = [
+        SpeakTool(
+            agent_state=agent_state
+        ),
+    ]
+    
+    agent = GraphInterpreterAgent(
+        program_memory = program_memory,
+        agent_state = agent_state,
+        embeddings = FakeEmbeddings(dim=8),
+        trace_writer = TraceWriter(trace_memory, embeddings=FakeEmbeddings(dim=8)),
+        tools = tools,
+    )
+    
+    input_query = Query(query="What is the capital of France?")
+    agent_output = agent(input_query)
+    assert agent_output.final_answer == "Paris"
+    assert agent_output.finish_reason == "finished"
+    # The program call, the two actions and the program end are written once the agent returns
+    assert len(trace_memory._steps) == 4
+    actions = [s for s in trace_memory._steps.values() if s.step_type == AgentStepType.Action]
+    assert len(actions) == 2
+    assert all(s.vector is not None for s in actions)
+    # The forks flush their own steps only
+    assert agent.fork().trace_key != agent.trace_key
+    agent.close()
+    assert not agent.trace_writer._worker.is_alive()
+
+def test_graph_interpreter_trace_writer_uses_agent_embeddings():
+    dspy.settings.configure(lm=DummyLM(answers=["Paris"]))
+    
+    main = gp.GraphProgram(
+        name="main",
+        description="The main program",
+    )
+    
+    main.add(gp.Action(
+        id="answer",
+        purpose="Answer the Objective's question",
+        tool="Speak",
+        prompt="Please answer to the Objective's question",
+    ))
+
+    main.connect("start", "answer")
+    main.connect("answer", "end")
+    
+    main.build()
+    
+    program_memory = LocalProgramMemory(index_name="test")
+    
+    program_memory.update(main)
+    
+    trace_memory = LocalTraceMemory(index_name="test")
+    
+    agent_state = AgentState()
+    
+    embeddings = FakeEmbeddings(dim=8)
+    
+    trace_writer = TraceWriter(trace_memory)
+    
+    agent = GraphInterpreterAgent(
+        program_memory = program_memory,
+        agent_state = agent_state,
+        embeddings = embeddings,
+        trace_writer = trace_writer,
+        tools = [SpeakTool(agent_state=agent_state)],
+    )
+    assert trace_writer.embeddings is embeddings
+    
+    input_query = Query(query="What is the capital of France?")
+    agent_output = agent(input_query)
+    assert agent_output.final_answer == "Paris"
+    assert agent_output.finish_reason == "finished"
+    actions = [s for s in trace_memory._steps.values() if s.step_type == AgentStepType.Action]
+    assert len(actions) == 1
+    assert actions[0].vector is not None
+
+def test_graph_interpreter_program_cache():
+    answers = [" blabla \nChoice: Answer", "Paris", " blabla \nChoice: Answer", "Paris"]
+    dspy.settings.configure(lm=DummyLM(answers=answers))
+    
+    clarify_objective = gp.GraphProgram(
+        name = "clarify_objective",
+        description = "Clarify the objective by asking question to the user",
+    )
+
+    clarify_objective.add(gp.Decision(
+        id = "is_anything_unclear",
+        purpose = "Check if the question is unclear",
+        question = "Is the Objective's question still unclear?",
+    ))
+
+    clarify_objective.add(gp.Action(
+        id = "ask_question",
+        purpose = "Ask question to clarify the Objective",
+        tool = "AskUser",
+        prompt = "Pick one question to clarify the Objective's question",
+    ))
+
+    clarify_objective.connect("start", "is_anything_unclear")
+    clarify_objective.connect("is_anything_unclear", "ask_question", label="Clarify")
+    clarify_objective.connect("is_anything_unclear", "end", label="Answer")
+    clarify_objective.connect("ask_question", "end")
+
+    clarify_objective.build()
+
+    main = gp.GraphProgram(
+        name="main",
+        description="The main program",
+    )
+
+    main.add(gp.Program(
+        id = "clarify_objective",
+        purpose = "Clarify the Objective if needed",
+        program = "clarify_objective"
+    ))
+
+    main.add(gp.Action(
+        id = "answer",
+        purpose = "Answer the Objective's question",
+        tool = "Speak",
+        prompt = "Answer the Objective's question",
+    ))
+
+    main.connect("start", "clarify_objective")
+    main.connect("clarify_objective", "answer")
+    main.connect("answer", "end")
+
+    main.build()
+    
+    program_memory = LocalProgramMemory(index_name="test")
+    
+    program_memory.update(clarify_objective)
+    program_memory.update(main)
+    
+    program_cache = ProgramCache(program_memory)
+    
+    agent_state = AgentState()
+    
+    tools = [
+        SpeakTool(
+            agent_state=agent_state,
+        ),
+    ]
+    
+    agent = GraphInterpreterAgent(
+        program_memory = program_memory,
+        program_cache = program_cache,
+        preload_programs = True,
+        agent_state = agent_state,
+        tools = tools,
+    )
+    
+    input_query = Query(query="What is the capital of France?")
+    agent_output = agent(input_query)
+    assert agent_output.final_answer == "Paris"
+    assert agent_output.finish_reason == "finished"
+    # The two programs are preloaded, then read from the cache
+    assert program_cache.misses == 2
+    agent_output = agent(input_query)
+    assert agent_output.final_answer == "Paris"
+    assert program_cache.misses == 2
@@ -0,0 +1,52 @@
+import numpy as np
+from hybridagi.embeddings import FakeEmbeddings
+from hybridagi.core.datatypes import Document, DocumentList, Entity, EntityList, Fact, FactList, Relationship
+from hybridagi.modules.embedders import DocumentEmbedder, EntityEmbedder, FactEmbedder
+
+class CountingEmbeddings(FakeEmbeddings):
+
+    def __init__(self, dim: int):
+        super().__init__(dim=dim)
+        self.calls = []
+
+    def embed_text(self, query_or_queries):
+        self.calls.append(query_or_queries)
+        return super().embed_text(query_or_queries)
+
+def test_document_embedder_batches_and_deduplicates():
+    embeddings = CountingEmbeddings(dim=8)
+    embedder = DocumentEmbedder(embeddings=embeddings, batch_size=2)
+    documents = DocumentList()
+    documents.docs = [Document(text=text) for text in ["a", "b", "a", "c"]]
+    result = embedder(documents)
+    assert embeddings.calls == [["a", "b"], ["c"]]
+    assert all(len(doc.vector) == 8 for doc in result.docs)
+    assert np.array_equal(result.docs[0].vector, result.docs[2].vector)
+
+def test_entity_embedder_facts_single_call():
+    embeddings = CountingEmbeddings(dim=8)
+    embedder = EntityEmbedder(embeddings=embeddings)
+    bob = Entity(name="Bob", label="Person")
+    ann = Entity(name="Ann", label="Person", description="A person named Ann")
+    facts = FactList()
+    facts.facts = [
+        Fact(subj=bob, rel=Relationship(name="KNOWS"), obj=ann),
+        Fact(subj=ann, rel=Relationship(name="KNOWS"), obj=bob),
+    ]
+    embedder(facts)
+    assert embeddings.calls == [["Bob", "A person named Ann"]]
+    assert len(bob.vector) == 8 and len(ann.vector) == 8
+
+def test_entity_embedder_single_entity():
+    embedder = EntityEmbedder(embeddings=FakeEmbeddings(dim=8))
+    entities = embedder(Entity(name="Bob", label="Person"))
+    assert isinstance(entities, EntityList)
+    assert len(entities.entities[0].vector) == 8
+
+def test_fact_embedder_batches():
+    embeddings = CountingEmbeddings(dim=8)
+    embedder = FactEmbedder(embeddings=embeddings)
+    fact = Fact(subj=Entity(name="Bob", label="Person"), rel=Relationship(name="KNOWS"), obj=Entity(name="Ann", label="Person"))
+    facts = embedder(fact)
+    assert embeddings.calls == [["Bob KNOWS Ann"]]
+    assert len(facts.facts[0].vector) == 8
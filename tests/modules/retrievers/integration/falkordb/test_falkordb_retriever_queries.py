@@ -0,0 +1,59 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from hybridagi.core.datatypes import Query, QueryList
+from hybridagi.embeddings import FakeEmbeddings
+from hybridagi.memory.integration.falkordb import FalkorDBDocumentMemory
+from hybridagi.modules.retrievers.integration.falkordb import FalkorDBDocumentRetriever
+
+@pytest.fixture(autouse=True)
+def falkordb_client():
+    with patch("hybridagi.memory.integration.falkordb.falkordb_memory.FalkorDB") as client:
+        yield client
+
+def test_falkordb_document_retriever_one_round_trip():
+    memory = FalkorDBDocumentMemory(index_name="test_retriever_queries")
+    retriever = FalkorDBDocumentRetriever(document_memory=memory, embeddings=FakeEmbeddings(dim=4), reverse=False)
+    memory._graph = MagicMock()
+    result_set = MagicMock()
+    result_set.result_set = [
+        ["a", "first", None, json.dumps({}), None, 0.1],
+        ["b", "second", None, json.dumps({}), None, 0.95],
+    ]
+    memory._graph.query.return_value = result_set
+    result = retriever(Query(query="test"))
+    assert memory._graph.query.call_count == 1
+    assert [doc.text for doc in result.docs] == ["first"]
+
+def test_falkordb_document_retriever_pipelines_queries():
+    memory = FalkorDBDocumentMemory(index_name="test_retriever_queries")
+    retriever = FalkorDBDocumentRetriever(document_memory=memory, embeddings=FakeEmbeddings(dim=4), reverse=False)
+    first, second = MagicMock(), MagicMock()
+    first.result_set = [["a", "first", None, json.dumps({}), None, 0.3]]
+    second.result_set = [["b", "second", None, json.dumps({}), None, 0.1], ["a", "first", None, json.dumps({}), None, 0.2]]
+    pipeline = MagicMock()
+    pipeline.execute.return_value = [first, second]
+    memory.pipeline = MagicMock(return_value=pipeline)
+    queries = QueryList()
+    queries.queries = [Query(query="one"), Query(query="two")]
+    result = retriever(queries)
+    assert pipeline.query.call_count == 2
+    pipeline.execute.assert_called_once()
+    assert [doc.text for doc in result.docs] == ["second", "first"]
+
+def test_falkordb_document_retriever_aforward():
+    memory = FalkorDBDocumentMemory(index_name="test_retriever_queries")
+    retriever = FalkorDBDocumentRetriever(document_memory=memory, embeddings=FakeEmbeddings(dim=4), reverse=False)
+    first, second = MagicMock(), MagicMock()
+    first.result_set = [["a", "first", None, json.dumps({}), None, 0.3]]
+    second.result_set = [["b", "second", None, json.dumps({}), None, 0.1]]
+    memory._async_graph = MagicMock()
+    memory._async_graph.query = AsyncMock(side_effect=[first, second])
+    memory._graph = MagicMock()
+    queries = QueryList()
+    queries.queries = [Query(query="one"), Query(query="two")]
+    result = asyncio.run(retriever.aforward(queries))
+    assert memory._async_graph.query.await_count == 2
+    memory._graph.query.assert_not_called()
+    assert [doc.text for doc in result.docs] == ["second", "first"]
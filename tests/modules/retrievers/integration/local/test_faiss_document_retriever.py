@@ -0,0 +1,91 @@
+import numpy as np
+from typing import Union, List
+from hybridagi.embeddings import Embeddings
+from hybridagi.core.datatypes import Query, QueryList, Document, DocumentList
+from hybridagi.memory.integration.local import LocalDocumentMemory
+from hybridagi.modules.retrievers.integration.local import FAISSDocumentRetriever
+
+class LookupEmbeddings(Embeddings):
+    
+    def __init__(self, vectors):
+        super().__init__(dim=len(list(vectors.values())[0]))
+        self.vectors = vectors
+    
+    def embed_text(self, query_or_queries: Union[str, List[str]]):
+        if isinstance(query_or_queries, list):
+            return [np.array(self.vectors[q], dtype="float32") for q in query_or_queries]
+        return np.array(self.vectors[query_or_queries], dtype="float32")
+    
+    def embed_image(self, image_or_images):
+        raise NotImplementedError()
+
+def build_memory():
+    mem = LocalDocumentMemory(index_name="test")
+    doc_list = DocumentList()
+    doc_list.docs = [
+        Document(text="cats", vector=[1.0, 0.0, 0.0]),
+        Document(text="dogs", vector=[0.0, 1.0, 0.0]),
+        Document(text="birds", vector=[0.0, 0.0, 1.0]),
+    ]
+    mem.update(doc_list)
+    return mem, doc_list
+
+def test_faiss_document_retriever_one_query():
+    mem, doc_list = build_memory()
+    embeddings = LookupEmbeddings({"cats": [0.9, 0.1, 0.0]})
+    retriever = FAISSDocumentRetriever(document_memory=mem, embeddings=embeddings, k=1)
+    result = retriever(Query(query="cats"))
+    assert len(result.docs) == 1
+    assert result.docs[0].text == "cats"
+
+def test_faiss_document_retriever_index_follows_updates():
+    mem, doc_list = build_memory()
+    embeddings = LookupEmbeddings({"fish": [0.0, 0.1, 0.9]})
+    retriever = FAISSDocumentRetriever(document_memory=mem, embeddings=embeddings, k=1)
+    assert retriever(Query(query="fish")).docs[0].text == "birds"
+    index = mem.get_vector_index("_embeddings", "cosine", 3)
+    mem.remove(doc_list.docs[2].id)
+    assert len(index) == 2
+    mem.update(Document(text="fish", vector=[0.0, 0.0, 1.0]))
+    assert len(index) == 3
+    assert mem.get_vector_index("_embeddings", "cosine", 3) is index
+    assert retriever(Query(query="fish")).docs[0].text == "fish"
+
+def test_faiss_document_retriever_replace_vector():
+    mem, doc_list = build_memory()
+    embeddings = LookupEmbeddings({"cats": [1.0, 0.0, 0.0]})
+    retriever = FAISSDocumentRetriever(document_memory=mem, embeddings=embeddings, k=1)
+    assert retriever(Query(query="cats")).docs[0].text == "cats"
+    doc = doc_list.docs[0]
+    doc.vector = [0.0, 1.0, 0.0]
+    mem.update(doc)
+    assert len(mem.get_vector_index("_embeddings", "cosine", 3)) == 3
+    assert len(retriever(Query(query="cats")).docs) == 0
+
+
+def test_faiss_document_retriever_multiple_queries():
+    mem, doc_list = build_memory()
+    embeddings = LookupEmbeddings({"cats": [0.9, 0.1, 0.0], "birds": [0.0, 0.1, 0.9]})
+    retriever = FAISSDocumentRetriever(document_memory=mem, embeddings=embeddings, k=2, max_distance=0.5, reverse=False)
+    queries = QueryList()
+    queries.queries = [Query(query="cats"), Query(query="birds")]
+    result = retriever(queries)
+    assert sorted(doc.text for doc in result.docs) == ["birds", "cats"]
+
+def test_faiss_document_retriever_rrf_fusion():
+    mem, doc_list = build_memory()
+    embeddings = LookupEmbeddings({"pets": [0.7, 0.6, 0.0], "dogs": [0.0, 1.0, 0.0]})
+    retriever = FAISSDocumentRetriever(document_memory=mem, embeddings=embeddings, k=3, fusion="rrf", reverse=False)
+    queries = QueryList()
+    queries.queries = [Query(query="pets"), Query(query="dogs")]
+    result = retriever(queries)
+    assert [doc.text for doc in result.docs] == ["dogs", "cats"]
+
+def test_faiss_document_retriever_binary_index_reranks_with_memory_embeddings():
+    mem, doc_list = build_memory()
+    embeddings = LookupEmbeddings({"cats": [0.9, 0.1, 0.0]})
+    retriever = FAISSDocumentRetriever(document_memory=mem, embeddings=embeddings, k=1, index_type="binary")
+    result = retriever(Query(query="cats"))
+    assert [doc.text for doc in result.docs] == ["cats"]
+    index = mem.get_vector_index("_embeddings", "cosine", 3, index_type="binary")
+    assert index.rerank_store is mem._embeddings